@@ -8,9 +8,9 @@ logging.basicConfig(level=logging.INFO)
 API_KEY = "your_api_key"
 ACCESS_TOKEN = "your_access_token"
 
-# Replace with the instrument token you want to monitor (e.g., NIFTY 50)
+# Replace with the instrument tokens you want to monitor (e.g., NIFTY 50 and NIFTY BANK)
 # You can get instrument tokens using kite.instruments() or kite.ltp()
-INSTRUMENT_TOKEN = 256265 # Example: NIFTY 50
+INSTRUMENT_TOKENS = [256265, 260105] # Example: NIFTY 50, NIFTY BANK
 
 # Replace with your Telegram Bot Token and Chat ID for alerts
 TELEGRAM_BOT_TOKEN = "YOUR_TELEGRAM_BOT_TOKEN"
@@ -24,9 +24,9 @@ async def main():
 
     kws = AsyncKiteTicker(API_KEY, ACCESS_TOKEN)
 
-    # Initialize the real-time data processor with indicator parameters
+    # Initialize the real-time data processor with indicator parameters, one for all the instruments
     processor = RealtimeMarketDataProcessor(
-        instrument_token=INSTRUMENT_TOKEN,
+        instrument_token=INSTRUMENT_TOKENS,
         sma_short_window=5,
         sma_long_window=20,
         rsi_window=14,
@@ -43,13 +43,12 @@ async def main():
     )
 
     async def on_ticks(ws, ticks):
-        for tick in ticks:
-            await processor.process_tick(tick)
+        await processor.process_ticks(ticks)
 
     async def on_connect(ws, response):
-        logging.info("Connected to WebSocket. Subscribing to instrument...")
-        ws.subscribe([INSTRUMENT_TOKEN])
-        ws.set_mode(ws.MODE_FULL, [INSTRUMENT_TOKEN])
+        logging.info("Connected to WebSocket. Subscribing to instruments...")
+        ws.subscribe(INSTRUMENT_TOKENS)
+        ws.set_mode(ws.MODE_FULL, INSTRUMENT_TOKENS)
 
     async def on_close(ws, code, reason):
         logging.info(f"Connection closed: {code} - {reason}")
@@ -108,39 +108,95 @@ it raises aptly named **[exceptions](exceptions.m.html)** that you can catch.
 
 from __future__ import unicode_literals, absolute_import
 
+import importlib
+
 from kiteconnect import exceptions
 from kiteconnect.connect import KiteConnect
-from kiteconnect.ticker import KiteTicker
-from kiteconnect.async_connect import AsyncKiteConnect
-from kiteconnect.async_ticker import AsyncKiteTicker
-from kiteconnect.advanced_orders import place_cover_order, place_bracket_order, place_amo_order, place_iceberg_order
-from kiteconnect.portfolio import get_current_portfolio
-from kiteconnect.risk_management import set_stop_loss, set_target_profit
-from kiteconnect.historical_data_utils import get_historical_data_dataframe
-from kiteconnect.technical_indicators import calculate_sma
-from kiteconnect.charting import plot_candlestick_chart
-from kiteconnect.config_manager import save_config, load_config
-from kiteconnect.error_handling import KiteConnectError, OrderPlacementError, DataFetchError, InvalidRequestError
-from kiteconnect.logging_config import setup_logging
-from kiteconnect.predictive_models import train_price_prediction_model, predict_price
-from kiteconnect.realtime_data import RealtimeMarketDataProcessor
-from kiteconnect.trade_journal import init_db, insert_trade, get_all_trades, get_trades_dataframe, analyze_trades
-from kiteconnect.data_cache import save_historical_data, load_historical_data
-from kiteconnect.backtesting.core import run_backtest
-from kiteconnect.backtesting.metrics import calculate_performance_metrics
-from kiteconnect.backtesting.visualizer import plot_equity_curve
-from kiteconnect.backtesting.optimizer import optimize_strategy_parameters
-from kiteconnect.backtesting.analysis import walk_forward_analysis
-from kiteconnect.risk_management.dashboard import RiskManagementDashboard
-from kiteconnect.risk_management.alerts import PnLAlert
-from kiteconnect.ml import *
-from kiteconnect.notifications import *
+
+# Everything else is imported on first access (PEP 562) so that a plain
+# `from kiteconnect import KiteConnect` doesn't pull in Twisted, aiohttp,
+# pandas, matplotlib or scikit-learn.
+_lazy = {
+    "KiteTicker": "kiteconnect.ticker",
+    "AsyncKiteConnect": "kiteconnect.async_connect",
+    "AsyncKiteTicker": "kiteconnect.async_ticker",
+    "OrderTracker": "kiteconnect.order_tracker",
+    "PositionBook": "kiteconnect.position_book",
+    "place_cover_order": "kiteconnect.advanced_orders",
+    "place_bracket_order": "kiteconnect.advanced_orders",
+    "place_amo_order": "kiteconnect.advanced_orders",
+    "place_iceberg_order": "kiteconnect.advanced_orders",
+    "get_current_portfolio": "kiteconnect.portfolio",
+    "set_stop_loss": "kiteconnect.risk_management",
+    "set_target_profit": "kiteconnect.risk_management",
+    "get_historical_data_dataframe": "kiteconnect.historical_data_utils",
+    "calculate_sma": "kiteconnect.technical_indicators",
+    "calculate_rsi": "kiteconnect.technical_indicators",
+    "calculate_macd": "kiteconnect.technical_indicators",
+    "calculate_bollinger_bands": "kiteconnect.technical_indicators",
+    "calculate_stochastic_oscillator": "kiteconnect.technical_indicators",
+    "calculate_atr": "kiteconnect.technical_indicators",
+    "sma_series": "kiteconnect.technical_indicators",
+    "rsi_series": "kiteconnect.technical_indicators",
+    "macd_series": "kiteconnect.technical_indicators",
+    "bollinger_bands_series": "kiteconnect.technical_indicators",
+    "stochastic_oscillator_series": "kiteconnect.technical_indicators",
+    "atr_series": "kiteconnect.technical_indicators",
+    "plot_candlestick_chart": "kiteconnect.charting",
+    "send_telegram_message": "kiteconnect.notifications",
+    "save_config": "kiteconnect.config_manager",
+    "load_config": "kiteconnect.config_manager",
+    "KiteConnectError": "kiteconnect.error_handling",
+    "OrderPlacementError": "kiteconnect.error_handling",
+    "DataFetchError": "kiteconnect.error_handling",
+    "InvalidRequestError": "kiteconnect.error_handling",
+    "setup_logging": "kiteconnect.logging_config",
+    "train_price_prediction_model": "kiteconnect.predictive_models",
+    "predict_price": "kiteconnect.predictive_models",
+    "RealtimeMarketDataProcessor": "kiteconnect.realtime_data",
+    "init_db": "kiteconnect.trade_journal",
+    "insert_trade": "kiteconnect.trade_journal",
+    "insert_trades": "kiteconnect.trade_journal",
+    "get_all_trades": "kiteconnect.trade_journal",
+    "get_trades_dataframe": "kiteconnect.trade_journal",
+    "analyze_trades": "kiteconnect.trade_journal",
+    "save_historical_data": "kiteconnect.data_cache",
+    "load_historical_data": "kiteconnect.data_cache",
+    "run_backtest": "kiteconnect.backtesting.core",
+    "calculate_performance_metrics": "kiteconnect.backtesting.metrics",
+    "plot_equity_curve": "kiteconnect.backtesting.visualizer",
+    "optimize_strategy_parameters": "kiteconnect.backtesting.optimizer",
+    "walk_forward_analysis": "kiteconnect.backtesting.analysis",
+    "RiskManagementDashboard": "kiteconnect.risk_management.dashboard",
+    "PnLAlert": "kiteconnect.risk_management.alerts",
+    "create_features": "kiteconnect.ml",
+    "PredictiveModel": "kiteconnect.ml",
+    "send_email": "kiteconnect.notifications",
+}
+
+
+def __getattr__(name):
+    module = _lazy.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    value = getattr(importlib.import_module(module), name)
+    # Cache it so that `__getattr__` isn't called again for this name.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy))
+
 
 __all__ = [
     "KiteConnect",
     "KiteTicker",
     "AsyncKiteConnect",
     "AsyncKiteTicker",
+    "OrderTracker",
+    "PositionBook",
     "exceptions",
     "place_cover_order",
     "place_bracket_order",
@@ -157,6 +213,12 @@ __all__ = [
     "calculate_bollinger_bands",
     "calculate_stochastic_oscillator",
     "calculate_atr",
+    "sma_series",
+    "rsi_series",
+    "macd_series",
+    "bollinger_bands_series",
+    "stochastic_oscillator_series",
+    "atr_series",
     "plot_candlestick_chart",
     "send_telegram_message",
     "save_config",
@@ -171,6 +233,7 @@ __all__ = [
     "RealtimeMarketDataProcessor",
     "init_db",
     "insert_trade",
+    "insert_trades",
     "get_all_trades",
     "get_trades_dataframe",
     "analyze_trades",
@@ -1,7 +1,10 @@
+import logging
 from typing import Optional
 from typing import List
 from kiteconnect import KiteConnect
-from kiteconnect.error_handling import InvalidRequestError, OrderPlacementError
+from kiteconnect.error_handling import InvalidRequestError, OrderPlacementError, DataFetchError
+
+log = logging.getLogger(__name__)
 
 def place_cover_order(
     kite: KiteConnect,
@@ -397,20 +400,27 @@ def cancel_all_orders(kite: KiteConnect, order_type: Optional[str] = None) -> Li
     """
     Cancels all pending orders, optionally filtered by order type.
 
+    The orders are cancelled concurrently with `kite.cancel_orders` under the client's order rate limit.
+    Orders which fail to be cancelled are logged and left out of the result.
+
     :param kite: An initialized KiteConnect object.
     :param order_type: Optional filter for order type (e.g., kite.ORDER_TYPE_LIMIT).
     :return: A list of cancelled order IDs.
     """
-    cancelled_order_ids = []
     try:
         orders = kite.orders()
-        for order in orders:
-            if order['status'] == "PENDING" and (order_type is None or order['order_type'] == order_type):
-                try:
-                    cancelled_id = kite.cancel_order(order['variety'], order['order_id'])
-                    cancelled_order_ids.append(cancelled_id)
-                except Exception as e:
-                    print(f"Error cancelling order {order['order_id']}: {e}")
     except Exception as e:
         raise DataFetchError("Failed to fetch orders for bulk cancellation.", original_exception=e)
+
+    pending = [
+        order for order in orders
+        if order['status'] == "PENDING" and (order_type is None or order['order_type'] == order_type)
+    ]
+
+    cancelled_order_ids = []
+    for result in kite.cancel_orders(pending):
+        if result["error"] is not None:
+            log.error("Error cancelling order {}: {}".format(result["params"]["order_id"], result["error"]))
+        else:
+            cancelled_order_ids.append(result["order_id"])
     return cancelled_order_ids
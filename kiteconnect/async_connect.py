@@ -7,12 +7,10 @@
     :copyright: (c) 2021 by Zerodha Technology.
     :license: see LICENSE for details.
 """
-from six import StringIO, PY2
 from six.moves.urllib.parse import urljoin
-import csv
-import json
 import dateutil.parser
 import hashlib
+import time
 import logging
 import datetime
 import aiohttp
@@ -21,6 +19,13 @@ import warnings
 
 from .__version__ import __version__, __title__
 import kiteconnect.exceptions as ex
+from kiteconnect.utils import codec
+from kiteconnect.utils.spread import SpreadOrderResult, spread_phases
+from kiteconnect.utils.bulk import PLACE, MODIFY, CANCEL, bulk_batches, bulk_result
+from kiteconnect.utils.parsing import parse_instruments, parse_mf_instruments, format_historical, row_count
+from kiteconnect.utils.network import (
+    RateLimiter, RetryPolicy, DEFAULT_RETRY_POLICY, NON_IDEMPOTENT_RETRY_POLICY, NO_RETRY_POLICY, exchange_now
+)
 
 log = logging.getLogger(__name__)
 
@@ -166,6 +171,45 @@ class AsyncKiteConnect(object):
         "order.contract_note": "/charges/orders",
     }
 
+    # Retry policies for routes which are not safe to send twice.
+    # All other routes use `_default_retry_policy`.
+    _default_retry_policy = DEFAULT_RETRY_POLICY
+    _retry_policies = {
+        "api.token": NO_RETRY_POLICY,
+        "api.token.renew": NO_RETRY_POLICY,
+        "order.place": NON_IDEMPOTENT_RETRY_POLICY,
+        "portfolio.positions.convert": NON_IDEMPOTENT_RETRY_POLICY,
+        "mf.order.place": NON_IDEMPOTENT_RETRY_POLICY,
+        "mf.sip.place": NON_IDEMPOTENT_RETRY_POLICY,
+        "gtt.place": NON_IDEMPOTENT_RETRY_POLICY,
+    }
+
+    # Transient errors which are retried and the subset which guarantee the request was never sent.
+    _retry_exceptions = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+    _unsent_exceptions = (aiohttp.ClientConnectorError,)
+
+    # Order rate limit (requests per second) and the routes it applies to.
+    _default_order_rate_limit = 10
+    _order_rate_limited_routes = ("order.place", "order.modify", "order.cancel")
+
+    # Default number of concurrent requests for bulk order operations.
+    _default_bulk_workers = 10
+
+    # Default `aiohttp.TCPConnector` settings. DNS lookups are cached for 5 minutes
+    # and idle connections kept open for 30 seconds to avoid new TLS handshakes.
+    _default_pool = {
+        "limit": 100,
+        "limit_per_host": 0,
+        "keepalive_timeout": 30,
+        "ttl_dns_cache": 300,
+    }
+
+    # Responses with at least this many rows (CSV lines or candles) are parsed in
+    # `parse_executor` instead of on the event loop. JSON bodies of at least
+    # `_parse_offload_bytes` are decoded in the loop's default thread pool.
+    _default_parse_offload_rows = 5000
+    _parse_offload_bytes = 1024 * 1024
+
     def __init__(self,
                  api_key,
                  access_token=None,
@@ -174,7 +218,12 @@ class AsyncKiteConnect(object):
                  timeout=None,
                  proxies=None,
                  pool=None,
-                 disable_ssl=False):
+                 disable_ssl=False,
+                 retry_policies=None,
+                 order_rate_limit=_default_order_rate_limit,
+                 connector=None,
+                 parse_executor=None,
+                 parse_offload_rows=_default_parse_offload_rows):
         """
         Initialise a new Kite Connect client instance.
 
@@ -190,12 +239,28 @@ class AsyncKiteConnect(object):
         - `debug`, if set to True, will serialise and print requests
         and responses to stdout.
         - `timeout` is the time (seconds) for which the API client will wait for
-        a request to complete before it fails. Defaults to 7 seconds
+        a request to complete before it fails. Defaults to 7 seconds. Pass an
+        `aiohttp.ClientTimeout` to also limit the connect and read phases separately.
         - `proxies` to set requests proxy.
         Check [python requests documentation](http://docs.python-requests.org/en/master/user/advanced/#proxies) for usage and examples.
-        - `pool` is manages request pools. It takes a dict of params accepted by HTTPAdapter as described here in [python requests documentation](http://docs.python-requests.org/en/master/api/#requests.adapters.HTTPAdapter)
+        - `pool` tunes the connection pool. It takes a dict of params accepted by
+        [aiohttp.TCPConnector](https://docs.aiohttp.org/en/stable/client_reference.html#aiohttp.TCPConnector),
+        eg: `limit`, `limit_per_host`, `keepalive_timeout` and `ttl_dns_cache`, which are
+        merged with `_default_pool`. `pool_maxsize` as accepted by `KiteConnect` is used as `limit_per_host`.
+        - `connector` is an `aiohttp.BaseConnector` to share one connection pool between
+        many clients, eg: one made with `AsyncKiteConnect.create_connector()`. `pool` is
+        ignored and closing the client doesn't close a shared connector.
         - `disable_ssl` disables the SSL verification while making a request.
         If set requests won't throw SSLError if its set to custom `root` url without SSL.
+        - `retry_policies` is a dict of route name to `RetryPolicy` which overrides the default
+        retry behaviour for those routes. Use the route name `default` to override it for all other routes.
+        - `order_rate_limit` is the maximum number of order place, modify and cancel requests per second
+        sent by this client. Defaults to 10. Set it to None to disable client side rate limiting.
+        - `parse_executor` is the `concurrent.futures.Executor` large instruments and historical
+        data responses are parsed in, so that the event loop stays responsive. Defaults to the
+        loop's default thread pool. A `ProcessPoolExecutor` also frees the GIL for the loop.
+        - `parse_offload_rows` is the number of rows (CSV lines or candles) from which a response
+        is parsed in `parse_executor`. Set it to None to always parse on the event loop.
         """
         self.debug = debug
         self.api_key = api_key
@@ -205,10 +270,27 @@ class AsyncKiteConnect(object):
         self.proxies = proxies if proxies else {}
 
         self.root = root or self._default_root_uri
-        self.timeout = timeout or self._default_timeout
+        if isinstance(timeout, aiohttp.ClientTimeout):
+            self.client_timeout = timeout
+        else:
+            self.client_timeout = aiohttp.ClientTimeout(total=timeout or self._default_timeout)
+        self.timeout = self.client_timeout.total
+
+        self.retry_policies = dict(self._retry_policies)
+        for route, policy in (retry_policies or {}).items():
+            self.set_retry_policy(route, policy)
+
+        self.order_rate_limiter = RateLimiter(order_rate_limit) if order_rate_limit else None
 
-        # Create aiohttp client session
-        self.session = aiohttp.ClientSession()
+        # The aiohttp session is created on first use in the running event loop, see `session`.
+        self.pool = self._pool_options(pool)
+        self.connector = connector
+        self._session = None
+        self._session_loop = None
+        self._session_owned = True
+
+        self.parse_executor = parse_executor
+        self.parse_offload_rows = parse_offload_rows
 
         # Disable SSL warnings only when verification is turned off
         if disable_ssl:
@@ -216,8 +298,82 @@ class AsyncKiteConnect(object):
 
     async def close(self):
         """Close the underlying HTTP session."""
-        if getattr(self, "session", None) is not None:
-            await self.session.close()
+        session, self._session = getattr(self, "_session", None), None
+        self._session_owned = True
+        if session is not None:
+            await session.close()
+
+    @classmethod
+    def create_connector(cls, pool=None):
+        """
+        Create an `aiohttp.TCPConnector` with the `pool` settings, to be shared by
+        many clients with the `connector` param. Call it with the event loop the
+        clients will run in running, and close it after the clients are done.
+        """
+        return aiohttp.TCPConnector(**cls._pool_options(pool))
+
+    @classmethod
+    def _pool_options(cls, pool=None):
+        """`aiohttp.TCPConnector` kwargs for the `pool` param."""
+        options = dict(cls._default_pool)
+        pool = dict(pool or {})
+        if "pool_maxsize" in pool:
+            options["limit_per_host"] = pool.pop("pool_maxsize")
+        options.update(pool)
+        return options
+
+    @property
+    def session(self):
+        """
+        The `aiohttp.ClientSession` used for requests.
+
+        It's created on first use, bound to the running event loop. A new one is created
+        if it's closed or the client is used from another event loop, eg: successive
+        `asyncio.run()` calls. Close the client with `await kite.close()` before its
+        event loop ends so the connections are released. A session assigned to this
+        attribute is always used as is.
+        """
+        if self._session is not None and not self._session_owned:
+            return self._session
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            if self._session is not None and not self._session.closed:
+                # Left open in another event loop, its connections can't be used from this one.
+                self._close_session_of(self._session, self._session_loop)
+
+            self._session = self._new_session()
+            self._session_loop = loop
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+        self._session_loop = None
+        self._session_owned = session is None
+
+    def _new_session(self):
+        """A new `aiohttp.ClientSession` with the connector or pool of the client, in the running event loop."""
+        if self.connector is not None:
+            connector = self.connector
+        else:
+            connector = aiohttp.TCPConnector(**self.pool)
+
+        return aiohttp.ClientSession(
+            connector=connector,
+            connector_owner=self.connector is None,
+            timeout=self.client_timeout,
+        )
+
+    @staticmethod
+    def _close_session_of(session, loop):
+        """Close a session of another event loop on that loop, if it is still running."""
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            log.warning("Replacing an HTTP session left open in an event loop that is no longer running, "
+                        "its connections are leaked. Close the client with `await kite.close()` before "
+                        "its event loop ends.")
 
     # ----------------------------------------------------------------
     # Context manager support
@@ -256,6 +412,31 @@ class AsyncKiteConnect(object):
 
         self.session_expiry_hook = method
 
+    def set_retry_policy(self, route, policy):
+        """
+        Set the retry policy for a route.
+
+        - `route` is a route name from `_routes`, eg: `order.place`, or `default` for all unlisted routes.
+        - `policy` is a `kiteconnect.utils.network.RetryPolicy`.
+
+        Orders are never retried by default since a timed out order may still have been placed.
+        To retry them safely, tag your orders and enable the tag based dedup check:
+
+            kite.set_retry_policy("order.place", RetryPolicy(idempotent=False, dedup_by_tag=True, deadline=5))
+        """
+        if not isinstance(policy, RetryPolicy):
+            raise TypeError("Invalid input type. Only RetryPolicy instances are accepted.")
+
+        if route == "default":
+            self._default_retry_policy = policy
+        elif route in self._routes:
+            self.retry_policies[route] = policy
+        else:
+            raise ex.InputException("Unknown route `{}`".format(route))
+
+    def _retry_policy(self, route):
+        return self.retry_policies.get(route, self._default_retry_policy)
+
     async def set_access_token(self, access_token):
         """Set the `access_token` received after a successful authentication."""
         self.access_token = access_token
@@ -378,9 +559,9 @@ class AsyncKiteConnect(object):
             if params[k] is None:
                 del (params[k])
 
-        return await self._post("order.place",
-                          url_args={"variety": variety},
-                          params=params)["order_id"]
+        return (await self._post("order.place",
+                                 url_args={"variety": variety},
+                                 params=params))["order_id"]
 
     async def modify_order(self,
                      variety,
@@ -400,46 +581,148 @@ class AsyncKiteConnect(object):
             if params[k] is None:
                 del (params[k])
 
-        return await self._put("order.modify",
-                         url_args={"variety": variety, "order_id": order_id},
-                         params=params)["order_id"]
+        return (await self._put("order.modify",
+                                url_args={"variety": variety, "order_id": order_id},
+                                params=params))["order_id"]
 
     async def cancel_order(self, variety, order_id, parent_order_id=None):
         """Cancel an order."""
-        return await self._delete("order.cancel",
-                            url_args={"variety": variety, "order_id": order_id},
-                            params={"parent_order_id": parent_order_id})["order_id"]
+        return (await self._delete("order.cancel",
+                                   url_args={"variety": variety, "order_id": order_id},
+                                   params={"parent_order_id": parent_order_id}))["order_id"]
 
     async def exit_order(self, variety, order_id, parent_order_id=None):
         """Exit a CO order."""
-        return self.cancel_order(variety, order_id, parent_order_id=parent_order_id)
+        return await self.cancel_order(variety, order_id, parent_order_id=parent_order_id)
 
-    async def place_spread_order(self, legs, cancel_on_failure=True):
-        """Place multiple legs of a spread sequentially.
+    async def place_spread_order(self, legs, cancel_on_failure=True, concurrent=False, phases=None, hedge_first=False):
+        """Place multiple legs of a spread.
 
         Each leg in ``legs`` should be a dictionary of the same parameters that
-        :py:meth:`place_order` accepts. If ``cancel_on_failure`` is ``True`` and
-        any leg fails to be placed, all previously placed legs are cancelled
-        before the exception is propagated.
+        :py:meth:`place_order` accepts. By default legs are placed sequentially.
+
+        - ``concurrent`` places all the legs in parallel.
+        - ``phases`` is a list of lists of leg indices. Legs in a phase are placed
+          in parallel and each phase waits for the previous one to complete.
+        - ``hedge_first`` places the BUY legs in parallel first and then the SELL
+          legs in parallel, so that hedges reduce the margin for the short legs.
+
+        If ``cancel_on_failure`` is ``True`` and any leg fails to be placed, all
+        the legs which were placed are cancelled in parallel before the first
+        exception is propagated.
 
-        Returns a list of order ids corresponding to each successfully placed
-        leg.
+        Returns a list of order ids corresponding to each leg. The list also has
+        a ``timings`` attribute with per-leg round trip timings and a ``skew``
+        property to measure the delay between the legs.
         """
+        legs = list(legs)
+        started = time.perf_counter()
+        order_ids = {}
+        timings = []
+
+        async def place(phase_idx, idx):
+            leg_started = time.perf_counter()
+            order_id = await self.place_order(**legs[idx])
+            leg_finished = time.perf_counter()
+            timings.append({
+                "leg": idx,
+                "phase": phase_idx,
+                "order_id": order_id,
+                "started": leg_started - started,
+                "finished": leg_finished - started,
+                "elapsed": leg_finished - leg_started,
+            })
+            return order_id
 
-        order_ids = []
-        for idx, leg in enumerate(legs):
-            try:
-                order_ids.append(self.place_order(**leg))
-            except Exception:
+        for phase_idx, phase in enumerate(spread_phases(legs, concurrent, phases, hedge_first)):
+            results = await asyncio.gather(*[place(phase_idx, idx) for idx in phase], return_exceptions=True)
+
+            errors = []
+            for idx, result in zip(phase, results):
+                if isinstance(result, BaseException):
+                    errors.append(result)
+                else:
+                    order_ids[idx] = result
+
+            if errors:
                 if cancel_on_failure and order_ids:
-                    for oid, prev_leg in zip(order_ids, legs[:idx]):
-                        try:
-                            self.cancel_order(prev_leg.get("variety"), oid)
-                        except Exception as e:
-                            log.exception("Failed to cancel order %s: %s", oid, e)
-                raise
+                    await self._cancel_spread_legs(legs, order_ids)
+                raise errors[0]
+
+        timings.sort(key=lambda t: t["leg"])
+        return SpreadOrderResult([order_ids[i] for i in range(len(legs))], timings)
+
+    async def _cancel_spread_legs(self, legs, order_ids):
+        """Cancel the placed legs of a failed spread in parallel."""
+        async def cancel(idx):
+            try:
+                await self.cancel_order(legs[idx].get("variety"), order_ids[idx])
+            except Exception as e:
+                log.exception("Failed to cancel order %s: %s", order_ids[idx], e)
+
+        await asyncio.gather(*[cancel(idx) for idx in sorted(order_ids)])
+
+    async def place_orders(self, orders, max_workers=None):
+        """
+        Place many orders concurrently.
+
+        Each item in `orders` is a dict of the params accepted by `place_order`.
+        Returns a result dict for each order, in the same order, with the keys
+        `op`, `params`, `status`, `order_id` and `error`. Failures are reported in
+        the results instead of being raised.
+        """
+        return (await self.bulk_orders(place=orders, max_workers=max_workers))[PLACE]
 
-        return order_ids
+    async def modify_orders(self, orders, max_workers=None):
+        """
+        Modify many open orders concurrently.
+
+        Each item in `orders` is a dict of the params accepted by `modify_order`.
+        Returns a result dict for each order as described in `place_orders`.
+        """
+        return (await self.bulk_orders(modify=orders, max_workers=max_workers))[MODIFY]
+
+    async def cancel_orders(self, orders, max_workers=None):
+        """
+        Cancel many orders concurrently.
+
+        Each item in `orders` is a dict with `variety`, `order_id` and optionally
+        `parent_order_id`. Rows from `orders()` can be passed as is.
+        Returns a result dict for each order as described in `place_orders`.
+        """
+        return (await self.bulk_orders(cancel=orders, max_workers=max_workers))[CANCEL]
+
+    async def bulk_orders(self, place=(), modify=(), cancel=(), prioritize_cancels=True, max_workers=None):
+        """
+        Run a mix of order placements, modifications and cancellations concurrently.
+
+        - `max_workers` is the maximum number of requests in flight. Requests are
+        additionally throttled by the client's order rate limit.
+        - `prioritize_cancels` runs all cancellations before any modification or
+        new order, eg: to free up margin when rebalancing a basket.
+
+        Returns a dict with the keys `place`, `modify` and `cancel`, each holding the
+        results of the corresponding items in input order as described in `place_orders`.
+        """
+        items, batches = bulk_batches(place, modify, cancel, prioritize_cancels)
+        results = {op: [None] * len(items[op]) for op in items}
+        calls = {PLACE: self.place_order, MODIFY: self.modify_order, CANCEL: self.cancel_order}
+        semaphore = asyncio.Semaphore(max_workers or self._default_bulk_workers)
+
+        async def run(op, params):
+            async with semaphore:
+                try:
+                    return bulk_result(op, params, order_id=await calls[op](**params))
+                except Exception as e:
+                    log.warning("Bulk {} failed for {}: {}".format(op, params, e))
+                    return bulk_result(op, params, error=e)
+
+        for batch in batches:
+            batch_results = await asyncio.gather(*[run(op, params) for op, _, params in batch])
+            for (op, idx, _), result in zip(batch, batch_results):
+                results[op][idx] = result
+
+        return results
 
     def _format_response(self, data):
         """Parse and format responses."""
@@ -598,7 +881,7 @@ class AsyncKiteConnect(object):
 
     async def mf_instruments(self):
         """Get list of mutual fund instruments."""
-        return self._parse_mf_instruments(await self._get("mf.instruments"))
+        return await self._parse(parse_mf_instruments, await self._get("mf.instruments"))
 
     async def instruments(self, exchange=None):
         """
@@ -610,9 +893,9 @@ class AsyncKiteConnect(object):
         - `exchange` is specific exchange to fetch (Optional)
         """
         if exchange:
-            return self._parse_instruments(await self._get("market.instruments", url_args={"exchange": exchange}))
+            return await self._parse(parse_instruments, await self._get("market.instruments", url_args={"exchange": exchange}))
         else:
-            return self._parse_instruments(await self._get("market.instruments.all"))
+            return await self._parse(parse_instruments, await self._get("market.instruments.all"))
 
     async def quote(self, *instruments):
         """
@@ -686,24 +969,10 @@ class AsyncKiteConnect(object):
                              "oi": 1 if oi else 0
                          })
 
-        return self._format_historical(data)
+        return await self._format_historical(data)
 
     async def _format_historical(self, data):
-        records = []
-        for d in data["candles"]:
-            record = {
-                "date": dateutil.parser.parse(d[0]),
-                "open": d[1],
-                "high": d[2],
-                "low": d[3],
-                "close": d[4],
-                "volume": d[5],
-            }
-            if len(d) == 7:
-                record["oi"] = d[6]
-            records.append(record)
-
-        return records
+        return await self._parse(format_historical, data)
 
     async def trigger_range(self, transaction_type, *instruments):
         """Retrieve the buy/sell trigger range for Cover Orders."""
@@ -787,8 +1056,8 @@ class AsyncKiteConnect(object):
         condition, gtt_orders = self._get_gtt_payload(trigger_type, tradingsymbol, exchange, trigger_values, last_price, orders)
 
         return await self._post("gtt.place", params={
-            "condition": json.dumps(condition),
-            "orders": json.dumps(gtt_orders),
+            "condition": codec.dumps(condition),
+            "orders": codec.dumps(gtt_orders),
             "type": trigger_type})
 
     async def modify_gtt(
@@ -812,8 +1081,8 @@ class AsyncKiteConnect(object):
         return await self._put("gtt.modify",
                          url_args={"trigger_id": trigger_id},
                          params={
-                             "condition": json.dumps(condition),
-                             "orders": json.dumps(gtt_orders),
+                             "condition": codec.dumps(condition),
+                             "orders": codec.dumps(gtt_orders),
                              "type": trigger_type})
 
     async def delete_gtt(self, trigger_id):
@@ -856,77 +1125,104 @@ class AsyncKiteConnect(object):
         warnings.warn(message, DeprecationWarning)
 
     def _parse_instruments(self, data):
-        # decode to string for Python 3
-        d = data
-        # Decode unicode data
-        if not PY2 and type(d) == bytes:
-            d = data.decode("utf-8").strip()
-
-        records = []
-        reader = csv.DictReader(StringIO(d))
-
-        for row in reader:
-            row["instrument_token"] = int(row["instrument_token"])
-            row["last_price"] = float(row["last_price"])
-            row["strike"] = float(row["strike"])
-            row["tick_size"] = float(row["tick_size"])
-            row["lot_size"] = int(row["lot_size"])
-
-            # Parse date
-            if len(row["expiry"]) == 10:
-                row["expiry"] = dateutil.parser.parse(row["expiry"]).date()
-
-            records.append(row)
-
-        return records
+        return parse_instruments(data)
 
     def _parse_mf_instruments(self, data):
-        # decode to string for Python 3
-        d = data
-        if not PY2 and type(d) == bytes:
-            d = data.decode("utf-8").strip()
-
-        records = []
-        reader = csv.DictReader(StringIO(d))
+        return parse_mf_instruments(data)
 
-        for row in reader:
-            row["minimum_purchase_amount"] = float(row["minimum_purchase_amount"])
-            row["purchase_amount_multiplier"] = float(row["purchase_amount_multiplier"])
-            row["minimum_additional_purchase_amount"] = float(row["minimum_additional_purchase_amount"])
-            row["minimum_redemption_quantity"] = float(row["minimum_redemption_quantity"])
-            row["redemption_quantity_multiplier"] = float(row["redemption_quantity_multiplier"])
-            row["purchase_allowed"] = bool(int(row["purchase_allowed"]))
-            row["redemption_allowed"] = bool(int(row["redemption_allowed"]))
-            row["last_price"] = float(row["last_price"])
+    async def _parse(self, parser, data):
+        """Run `parser` on a response, in `parse_executor` if the response is large."""
+        if self.parse_offload_rows is None or row_count(data) < self.parse_offload_rows:
+            return parser(data)
 
-            # Parse date
-            if len(row["last_price_date"]) == 10:
-                row["last_price_date"] = dateutil.parser.parse(row["last_price_date"]).date()
-
-            records.append(row)
-
-        return records
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_executor, parser, data)
 
     def _user_agent(self):
         return (__title__ + "-python/").capitalize() + __version__
 
     async def _get(self, route, url_args=None, params=None, is_json=False):
         """Alias for sending a GET request."""
-        return await self._request(route, "GET", url_args=url_args, params=params, is_json=is_json)
+        return await self._retry_request(route, "GET", url_args=url_args, params=params, is_json=is_json)
 
     async def _post(self, route, url_args=None, params=None, is_json=False, query_params=None):
         """Alias for sending a POST request."""
-        return await self._request(route, "POST", url_args=url_args, params=params, is_json=is_json, query_params=query_params)
+        return await self._retry_request(route, "POST", url_args=url_args, params=params, is_json=is_json, query_params=query_params)
 
     async def _put(self, route, url_args=None, params=None, is_json=False, query_params=None):
         """Alias for sending a PUT request."""
-        return await self._request(route, "PUT", url_args=url_args, params=params, is_json=is_json, query_params=query_params)
+        return await self._retry_request(route, "PUT", url_args=url_args, params=params, is_json=is_json, query_params=query_params)
 
     async def _delete(self, route, url_args=None, params=None, is_json=False):
         """Alias for sending a DELETE request."""
-        return await self._request(route, "DELETE", url_args=url_args, params=params, is_json=is_json)
+        return await self._retry_request(route, "DELETE", url_args=url_args, params=params, is_json=is_json)
+
+    async def _retry_request(self, route, method, **kwargs):
+        """Make an HTTP request under the retry policy of the route."""
+        policy = self._retry_policy(route)
+
+        dedup = None
+        params = kwargs.get("params")
+        if policy.dedup_by_tag and route == "order.place" and isinstance(params, dict) and params.get("tag"):
+            # Only orders placed from the first attempt on can be one of its attempts.
+            since = exchange_now()
+
+            async def dedup():
+                return await self._find_order_by_tag(params, since)
+
+        rate_limiter = self.order_rate_limiter if route in self._order_rate_limited_routes else None
+
+        async def attempt(remaining):
+            if rate_limiter is not None:
+                waited = await rate_limiter.acquire_async()
+                if remaining is not None:
+                    remaining -= waited
+            self._check_deadline(route, remaining)
+            return await self._request(route, method, timeout=self.timeout, **kwargs)
+
+        return await policy.acall(attempt, self._retry_exceptions, unsent_exceptions=self._unsent_exceptions, dedup=dedup)
+
+    def _check_deadline(self, route, remaining):
+        """
+        Raise if the retry budget is used up before a request is sent. Sending it anyway with the
+        rest of the budget as its timeout could report an order as failed after it was placed.
+        """
+        if remaining is not None and remaining <= 0:
+            raise ex.NetworkException("Deadline exceeded before sending the {} request.".format(route))
+
+    async def _find_order_by_tag(self, params, since):
+        """
+        Find an order in the orderbook which matches the `tag` and the instrument, side and
+        quantity of the order `params` and was placed at or after `since`, a naive IST datetime.
+        Returns the `order.place` response for it or None.
+
+        Earlier orders with a reused tag are never matched, so the local clock should be in sync.
+        """
+        for order in reversed(await self.orders()):
+            if order.get("tag") != params["tag"] and params["tag"] not in (order.get("tags") or []):
+                continue
+
+            placed = order.get("order_timestamp")
+            if not isinstance(placed, datetime.datetime) or placed < since:
+                continue
+
+            if (order.get("tradingsymbol") == params.get("tradingsymbol") and
+                    order.get("exchange") == params.get("exchange") and
+                    order.get("transaction_type") == params.get("transaction_type") and
+                    int(order.get("quantity") or 0) == int(params.get("quantity") or 0)):
+                return {"order_id": order["order_id"]}
+
+        return None
+
+    def _client_timeout(self, total):
+        """`client_timeout` with the `total` of a single request."""
+        if total is None or total == self.client_timeout.total:
+            return self.client_timeout
+
+        t = self.client_timeout
+        return aiohttp.ClientTimeout(total=total, connect=t.connect, sock_read=t.sock_read, sock_connect=t.sock_connect)
 
-    async def _request(self, route, method, url_args=None, params=None, is_json=False, query_params=None):
+    async def _request(self, route, method, url_args=None, params=None, is_json=False, query_params=None, timeout=None):
         """Make an HTTP request."""
         # Form a restful URL
         if url_args:
@@ -954,20 +1250,25 @@ class AsyncKiteConnect(object):
         if method in ["GET", "DELETE"]:
             query_params = params
 
-        json_data = params if (method in ["POST", "PUT"] and is_json) else None
-        data = params if (method in ["POST", "PUT"] and not is_json) else None
+        # Encode JSON bodies with the active codec instead of aiohttp's default encoder
+        data = None
+        if method in ["POST", "PUT"]:
+            if is_json:
+                data = codec.dumps(params).encode("utf-8")
+                headers["Content-Type"] = "application/json"
+            else:
+                data = params
 
         try:
             async with self.session.request(
                 method,
                 url,
-                json=json_data,
                 data=data,
                 params=query_params,
                 headers=headers,
                 ssl=not self.disable_ssl,
                 allow_redirects=True,
-                timeout=self.timeout,
+                timeout=self._client_timeout(timeout),
             ) as r:
                 if self.debug:
                     log.debug("Response: {code} {content}".format(code=r.status, content=await r.text()))
@@ -975,8 +1276,12 @@ class AsyncKiteConnect(object):
                 content_type = r.headers.get("content-type", "")
                 if "json" in content_type:
                     try:
-                        data = await r.json()
-                    except Exception:
+                        body = await r.read()
+                        if self.parse_offload_rows is not None and len(body) >= self._parse_offload_bytes:
+                            data = await asyncio.get_running_loop().run_in_executor(None, codec.loads, body)
+                        else:
+                            data = codec.loads(body)
+                    except ValueError:
                         raise ex.DataException(
                             "Couldn't parse the JSON response received from the server: {content}".format(content=await r.text())
                         )
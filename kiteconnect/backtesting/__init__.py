@@ -4,27 +4,20 @@ import numpy as np
 import matplotlib.pyplot as plt
 import itertools
 
-def run_backtest(
-    historical_data: List[Dict],
-    strategy: Callable[[List[Dict]], List[Dict]],
-) -> List[Dict]:
-    """
-    A basic backtesting function to simulate a trading strategy on historical data.
-
-    :param historical_data: A list of historical data points (e.g., candles).
-                            Each data point should be a dictionary with at least 'date', 'open', 'high', 'low', 'close'.
-    :param strategy: A callable representing the trading strategy. It should take
-                     a list of historical data (up to the current point) and return
-                     a list of simulated trades. Each trade should be a dictionary
-                     with at least 'date', 'action' ('BUY' or 'SELL'), 'price', 'quantity'.
-    :return: A list of simulated trades generated by the strategy.
-    """
-    simulated_trades = []
-    for i in range(len(historical_data)):
-        current_data = historical_data[:i+1]
-        trades = strategy(current_data)
-        simulated_trades.extend(trades)
-    return simulated_trades
+from .core import run_backtest
+from .engine import BacktestEngine, Bars, Cursor, SimulatedBroker, Strategy
+
+__all__ = [
+    "run_backtest",
+    "BacktestEngine",
+    "Bars",
+    "Cursor",
+    "SimulatedBroker",
+    "Strategy",
+    "calculate_performance_metrics",
+    "plot_equity_curve",
+    "optimize_strategy_parameters",
+]
 
 def calculate_performance_metrics(trades: List[Dict], initial_capital: float = 100000.0) -> Dict:
     """
@@ -1,5 +1,7 @@
 from typing import Any, Callable, Dict, List
 
+from .engine import BacktestEngine
+
 def run_backtest(
     historical_data: List[Dict[str, Any]],
     strategy: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
@@ -7,6 +9,14 @@ def run_backtest(
     """
     Runs a backtest of a trading strategy.
 
+    The strategy is called on every bar with the historical data up to and including that bar,
+    a read-only sequence rather than a copy, so the run is linear in the number of bars. A
+    `kiteconnect.backtesting.engine.Strategy`, which gets `on_bar` events with a cursor into the
+    columns of the data and trades through a simulated broker, is run as well.
+
+    A strategy with a `prepare` method is first called with all of the historical data,
+    eg: to compute its indicators once for the whole run.
+
     Args:
         historical_data (List[Dict[str, Any]]): A list of historical data points.
         strategy (Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]): The trading strategy to backtest.
@@ -14,9 +24,4 @@ def run_backtest(
     Returns:
         List[Dict[str, Any]]: A list of simulated trades.
     """
-    trades = []
-    for i in range(1, len(historical_data)):
-        data_so_far = historical_data[:i]
-        new_trades = strategy(data_so_far)
-        trades.extend(new_trades)
-    return trades
+    return BacktestEngine(historical_data, strategy).run()
@@ -0,0 +1,286 @@
+from collections import abc
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Union, cast
+
+import numpy as np
+import pandas as pd
+
+
+class _Columns(abc.Mapping):
+    """
+    Columns of a list of records, each converted to a read-only array when first read. The
+    fields are those of any record, a record without one has None for it.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        self.records = records
+        self.arrays = {}  # type: Dict[str, np.ndarray]
+        self._names = None  # type: Optional[List[str]]
+
+    @property
+    def names(self) -> List[str]:
+        if self._names is None:
+            names = {}  # type: Dict[str, None]
+            for record in self.records:
+                names.update(dict.fromkeys(record))
+            self._names = list(names)
+        return self._names
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        values = self.arrays.get(name)
+        if values is None:
+            if name not in self.names:
+                raise KeyError(name)
+            values = self.arrays[name] = np.array([record.get(name) for record in self.records])
+            values.flags.writeable = False
+        return values
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class Bars:
+    """
+    Historical data as read-only columnar arrays, one per field of the candles. The columns of
+    a list of dicts are only converted when they are first read.
+
+    Args:
+        historical_data (Union[List[Dict[str, Any]], pd.DataFrame]): Candles as a list of dicts,
+            eg: from `historical_data`, or a DataFrame with a column per field.
+    """
+
+    def __init__(self, historical_data: Union[List[Dict[str, Any]], pd.DataFrame]):
+        if isinstance(historical_data, pd.DataFrame):
+            self.records = None
+            columns = dict((name, historical_data[name].to_numpy()) for name in historical_data.columns)
+            if "date" not in columns and isinstance(historical_data.index, pd.DatetimeIndex):
+                columns["date"] = historical_data.index.to_numpy()
+            for values in columns.values():
+                values.flags.writeable = False
+            self.columns = columns  # type: Mapping[str, np.ndarray]
+        else:
+            self.records = historical_data
+            self.columns = _Columns(historical_data)
+        self.length = len(historical_data)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def record(self, i: int) -> Dict[str, Any]:
+        """The `i`th candle as a dict."""
+        if self.records is not None:
+            return self.records[i]
+        return dict((name, values[i]) for name, values in self.columns.items())
+
+
+class Cursor:
+    """
+    Read-only window of the bars up to and including the current one. Columns are views of the
+    arrays of `Bars`, so moving the cursor and reading them costs the same on every bar.
+
+        #!python
+        closes = cursor["close"]      # Every close so far, the current one last
+        close = cursor.value("close") # The current close
+    """
+    __slots__ = ("bars", "index")
+
+    def __init__(self, bars: Bars, index: int = 0):
+        self.bars = bars
+        self.index = index
+
+    def __len__(self) -> int:
+        return self.index + 1
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.bars.columns[name][:self.index + 1]
+
+    def value(self, name: str, ago: int = 0) -> Any:
+        """Value of a field `ago` bars before the current one, None before the first bar."""
+        i = self.index - ago
+        return self.bars.columns[name][i] if i >= 0 else None
+
+    @property
+    def date(self) -> Any:
+        return self.value("date")
+
+    @property
+    def bar(self) -> Dict[str, Any]:
+        """The current candle as a dict."""
+        return self.bars.record(self.index)
+
+
+class SimulatedBroker:
+    """
+    Fills orders immediately, at the given price or else the current bar's close, and keeps the
+    position, cash and trades of the backtest.
+
+    Args:
+        initial_capital (float, optional): Starting cash. Defaults to 100000.0.
+        commission (float, optional): Charged on each fill. Defaults to 0.
+    """
+
+    def __init__(self, initial_capital: float = 100000.0, commission: float = 0.0):
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.cash = initial_capital
+        self.position = 0
+        self.trades = []  # type: List[Dict[str, Any]]
+        self.cursor = None  # type: Optional[Cursor]
+
+    def submit(self, action: str, quantity: int = 1, price: Optional[float] = None, **extra: Any) -> Dict[str, Any]:
+        """
+        Submits an order, filled on the current bar.
+
+        Args:
+            action (str): "BUY" or "SELL".
+            quantity (int, optional): Quantity to trade. Defaults to 1.
+            price (float, optional): Fill price. Defaults to the current bar's close.
+
+        Returns:
+            Dict[str, Any]: The trade, with `date`, `action`, `price` and `quantity`.
+        """
+        if action not in ("BUY", "SELL"):
+            raise ValueError("action must be BUY or SELL, got {!r}".format(action))
+        cursor = self._cursor()
+        if price is None:
+            price = cursor.value("close")
+        trade = dict(date=cursor.date, action=action, price=price, quantity=quantity, **extra)
+        self.fill(trade)
+        return trade
+
+    def buy(self, quantity: int = 1, price: Optional[float] = None, **extra: Any) -> Dict[str, Any]:
+        return self.submit("BUY", quantity, price, **extra)
+
+    def sell(self, quantity: int = 1, price: Optional[float] = None, **extra: Any) -> Dict[str, Any]:
+        return self.submit("SELL", quantity, price, **extra)
+
+    def fill(self, trade: Dict[str, Any]) -> None:
+        """Records a trade, a dict with `action`, `price` and `quantity`, and updates the position and cash."""
+        sign = 1 if trade["action"] == "BUY" else -1
+        self.position += sign * trade["quantity"]
+        self.cash -= sign * trade["price"] * trade["quantity"] + self.commission
+        self.trades.append(trade)
+
+    def equity(self, price: Optional[float] = None) -> float:
+        """Cash plus the position valued at `price`, by default the current close."""
+        if price is None:
+            price = self._cursor().value("close")
+        return self.cash + self.position * price
+
+    def _cursor(self) -> Cursor:
+        if self.cursor is None:
+            raise RuntimeError("The broker has no current bar, it's only usable in a `BacktestEngine` run")
+        return self.cursor
+
+
+class Strategy:
+    """
+    Base class of event-driven strategies. `on_bar` is called once per bar with a cursor at it
+    and submits orders to the broker.
+    """
+
+    def on_start(self, bars: Bars) -> None:
+        """Called before the first bar, eg: to compute indicators over the whole of `bars.columns`."""
+
+    def on_bar(self, cursor: Cursor, broker: SimulatedBroker) -> None:
+        raise NotImplementedError
+
+    def on_end(self, broker: SimulatedBroker) -> None:
+        """Called after the last bar."""
+
+
+class _Prefix(abc.Sequence):
+    """The records up to `length`, like `records[:length]` without copying them."""
+
+    def __init__(self, records: Sequence[Dict[str, Any]], length: int):
+        self.records = records
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.records[j] for j in range(*i.indices(self.length))]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("index out of range")
+        return self.records[i]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        records = self.records
+        for i in range(self.length):
+            yield records[i]
+
+
+class CallableStrategy(Strategy):
+    """
+    Runs a strategy written for `run_backtest`: a callable taking the historical data up to the
+    current bar and returning its trades. The data is a read-only sequence over the records rather
+    than a copy of them, so each bar costs the same however long the history. A strategy with a
+    `prepare` method is first called with all of the historical data.
+
+    The trades are added to the broker's as returned, like `run_backtest` always did, without
+    updating its position and cash.
+    """
+
+    def __init__(self, strategy: Callable[..., List[Dict[str, Any]]]):
+        self.strategy = strategy
+        self.records = []  # type: Sequence[Dict[str, Any]]
+
+    def on_start(self, bars: Bars) -> None:
+        self.records = bars.records if bars.records is not None else [bars.record(i) for i in range(len(bars))]
+        prepare = getattr(self.strategy, "prepare", None)
+        if prepare is not None:
+            prepare(self.records)
+
+    def on_bar(self, cursor: Cursor, broker: SimulatedBroker) -> None:
+        trades = self.strategy(_Prefix(self.records, cursor.index + 1))
+        if trades:
+            broker.trades.extend(trades)
+
+
+class BacktestEngine:
+    """
+    Event-driven backtest: a cursor moves over the bars once, the strategy gets an `on_bar` event
+    at each and trades through a simulated broker. The run is linear in the number of bars.
+
+    Args:
+        historical_data (Union[List[Dict[str, Any]], pd.DataFrame]): The candles to run over.
+        strategy (Union[Strategy, Callable]): A `Strategy`, or a callable as taken by `core.run_backtest`.
+        broker (SimulatedBroker, optional): Defaults to a new `SimulatedBroker`.
+    """
+
+    def __init__(
+        self,
+        historical_data: Union[List[Dict[str, Any]], pd.DataFrame, Bars],
+        strategy: Union[Strategy, Callable[..., List[Dict[str, Any]]]],
+        broker: Optional[SimulatedBroker] = None
+    ):
+        self.bars = historical_data if isinstance(historical_data, Bars) else Bars(historical_data)
+        if hasattr(strategy, "on_bar"):
+            # A `Strategy`, or any object with its methods.
+            self.strategy = cast(Strategy, strategy)
+        else:
+            self.strategy = CallableStrategy(strategy)
+        self.broker = broker if broker is not None else SimulatedBroker()
+
+    def run(self) -> List[Dict[str, Any]]:
+        """
+        Runs the strategy over every bar.
+
+        Returns:
+            List[Dict[str, Any]]: The trades, in the order they were filled.
+        """
+        cursor = Cursor(self.bars)
+        broker, on_bar = self.broker, self.strategy.on_bar
+        broker.cursor = cursor
+        self.strategy.on_start(self.bars)
+        for i in range(len(self.bars)):
+            cursor.index = i
+            on_bar(cursor, broker)
+        self.strategy.on_end(broker)
+        return broker.trades
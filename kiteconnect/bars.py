@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+    bars.py
+
+    OHLCV bars for several timeframes built incrementally from ticks.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import time
+import logging
+import datetime
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from kiteconnect.resample import IST_OFFSET, DAY, INTERVALS, bucket_close, bucket_start
+
+log = logging.getLogger(__name__)
+
+IST = datetime.timezone(datetime.timedelta(seconds=IST_OFFSET))
+
+
+class Bar(object):
+    """An OHLCV bar of an instrument. `start` and `close_time` are epoch seconds."""
+
+    __slots__ = ("instrument_token", "interval", "start", "close_time", "open", "high", "low", "close", "volume",
+                 "oi", "ticks")
+
+    def __init__(self, instrument_token: int, interval: str, start: int, price: float, oi: Optional[int]) -> None:
+        self.instrument_token = instrument_token
+        self.interval = interval
+        self.start = start
+        self.close_time = bucket_close(start, interval)
+        self.open = self.high = self.low = self.close = price
+        self.volume = 0
+        self.oi = oi
+        self.ticks = 0
+
+    @property
+    def date(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.start, IST)
+
+    def as_candle(self) -> Dict[str, Any]:
+        """The bar in the format of a `historical_data` candle."""
+        candle = {"date": self.date, "open": self.open, "high": self.high, "low": self.low, "close": self.close,
+                  "volume": self.volume}
+        if self.oi is not None:
+            candle["oi"] = self.oi
+        return candle
+
+    def __repr__(self) -> str:
+        return "Bar({} {} {} O={} H={} L={} C={} V={})".format(
+            self.instrument_token, self.interval, self.date.isoformat(), self.open, self.high, self.low, self.close,
+            self.volume)
+
+
+def tick_time(tick: Dict[str, Any], now: Callable[[], float] = time.time) -> int:
+    """Epoch seconds of a tick, from its exchange timestamp or last trade time, else the local clock."""
+    for key in ("exchange_timestamp", "last_trade_time", "timestamp"):
+        value = tick.get(key)
+        if value is not None:
+            # Naive ticker timestamps are in local time, which `timestamp()` assumes too.
+            return int(value.timestamp()) if isinstance(value, datetime.datetime) else int(value)
+    return int(now())
+
+
+class BarBuilder(object):
+    """
+    Builds OHLCV bars of several intervals for every instrument from `KiteTicker` ticks.
+
+    - Prices are from `last_price` and volume from the change in `volume_traded` between ticks.
+    - Bars are anchored to the 09:15 session open like the API's candles and bars which span the
+    15:30 session close end with it (see `kiteconnect.resample`).
+    - A bar closes when a tick of a later bar arrives or, with `start()`, on a timer once its time
+    is over even if no tick arrives. Ticks of a bar already closed are dropped and counted in `late`.
+    - Closed bars are passed to `on_bar` and, with a `store`, saved to the `CandleStore` every
+    `save_interval` seconds, without marking their range as fetched.
+
+        #!python
+        builder = BarBuilder(["minute", "5minute"], on_bar=print)
+        builder.attach(kws)
+        builder.start()
+        kws.connect(threaded=True)
+
+    Each tick costs a constant amount of work per interval.
+    """
+
+    def __init__(
+        self,
+        intervals: Sequence[str] = ("minute",),
+        on_bar: Optional[Callable[[Bar], None]] = None,
+        store: Any = None,
+        save_interval: float = 300,
+        grace: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        - `intervals` of the bars, any of `kiteconnect.resample.INTERVALS`.
+        - `on_bar` called with each closed bar, from the thread which closed it.
+        - `store` a `CandleStore` to save closed bars to.
+        - `grace` seconds after its end a bar is closed by the timer, for ticks still in flight.
+        - `clock` returning the current epoch time, for tests.
+        """
+        unknown = [interval for interval in intervals if interval not in INTERVALS]
+        if unknown:
+            raise ValueError("Unknown intervals: {}".format(unknown))
+
+        self.intervals = list(intervals)
+        self.on_bar = on_bar
+        self.store = store
+        self.save_interval = save_interval
+        self.grace = grace
+        self.clock = clock
+        self.late = 0
+
+        self._lock = threading.RLock()
+        # instrument_token -> bar in progress of each interval, in the order of `intervals`.
+        self._bars = {}  # type: Dict[int, List[Optional[Bar]]]
+        # instrument_token -> close time of the last bar closed of each interval.
+        self._closed = {}  # type: Dict[int, List[int]]
+        # instrument_token -> (day start, cumulative volume traded) of the last tick.
+        self._volumes = {}  # type: Dict[int, Tuple[int, int]]
+        self._unsaved = []  # type: List[Bar]
+        self._last_save = clock()
+        self._ticker_callbacks = {}  # type: Dict[str, Any]
+        self._stop = threading.Event()
+        self._timer = None  # type: Optional[threading.Thread]
+
+    # ----------------------------------------------------------------
+    # Ticks
+    # ----------------------------------------------------------------
+    def update(self, tick: Dict[str, Any]) -> List[Bar]:
+        """Add a tick to the bars of its instrument. Returns the bars it closed."""
+        price = tick.get("last_price")
+        if price is None:
+            return []
+        token = tick["instrument_token"]
+        ts = tick_time(tick, self.clock)
+        oi = tick.get("oi")
+        closed = []  # type: List[Bar]
+
+        with self._lock:
+            volume = self._volume_delta(token, ts, tick.get("volume_traded"))
+            bars = self._bars.get(token)
+            if bars is None:
+                bars = self._bars[token] = [None] * len(self.intervals)
+                self._closed[token] = [0] * len(self.intervals)
+            closed_until = self._closed[token]
+
+            for i, interval in enumerate(self.intervals):
+                bar = bars[i]
+                if bar is not None and ts >= bar.close_time:
+                    closed.append(bar)
+                    closed_until[i] = bar.close_time
+                    bar = bars[i] = None
+                if bar is None:
+                    if ts < closed_until[i]:
+                        self.late += 1
+                        continue
+                    start = bucket_start(ts, interval)
+                    if ts >= bucket_close(start, interval):
+                        # After the session close, in a bar which ended with it.
+                        continue
+                    bar = bars[i] = Bar(token, interval, start, price, oi)
+                elif ts < bar.start:
+                    self.late += 1
+                    continue
+
+                if price > bar.high:
+                    bar.high = price
+                elif price < bar.low:
+                    bar.low = price
+                bar.close = price
+                bar.volume += volume
+                if oi is not None:
+                    bar.oi = oi
+                bar.ticks += 1
+
+        self._emit(closed)
+        return closed
+
+    def update_many(self, ticks: List[Dict[str, Any]]) -> List[Bar]:
+        closed = []  # type: List[Bar]
+        for tick in ticks:
+            closed.extend(self.update(tick))
+        return closed
+
+    def _volume_delta(self, token: int, ts: int, volume_traded: Optional[int]) -> int:
+        if volume_traded is None:
+            return 0
+        day = ts - (ts + IST_OFFSET) % DAY
+        last = self._volumes.get(token)
+        if last is None or last[0] != day:
+            # The first tick of the day carries the volume traded before it, which belongs to no bar seen here.
+            self._volumes[token] = (day, volume_traded)
+            return 0
+        if volume_traded <= last[1]:
+            # Unchanged, or a late tick.
+            return 0
+        self._volumes[token] = (day, volume_traded)
+        return volume_traded - last[1]
+
+    # ----------------------------------------------------------------
+    # Closing bars
+    # ----------------------------------------------------------------
+    def close_due(self, now: Optional[float] = None) -> List[Bar]:
+        """Close the bars whose time is over by `grace` seconds. Returns them."""
+        now = self.clock() if now is None else now
+        closed = []  # type: List[Bar]
+        with self._lock:
+            for token, bars in self._bars.items():
+                for i, bar in enumerate(bars):
+                    if bar is not None and bar.close_time + self.grace <= now:
+                        closed.append(bar)
+                        self._closed[token][i] = bar.close_time
+                        bars[i] = None
+        self._emit(closed)
+        if self.store is not None and self.clock() - self._last_save >= self.save_interval:
+            self.save()
+        return closed
+
+    def current(self, instrument_token: int, interval: str) -> Optional[Bar]:
+        """Bar in progress of an instrument and interval."""
+        with self._lock:
+            bars = self._bars.get(instrument_token)
+            return bars[self.intervals.index(interval)] if bars else None
+
+    def _emit(self, closed: List[Bar]) -> None:
+        if not closed:
+            return
+        if self.store is not None:
+            with self._lock:
+                self._unsaved.extend(closed)
+        if self.on_bar is not None:
+            for bar in closed:
+                try:
+                    self.on_bar(bar)
+                except Exception as e:
+                    log.error("Error in on_bar for {}: {}".format(bar, e))
+
+    def save(self) -> None:
+        """Save the closed bars to the store, one write per instrument and interval."""
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, []
+            self._last_save = self.clock()
+
+        groups = {}  # type: Dict[Tuple[int, str], List[Dict[str, Any]]]
+        for bar in unsaved:
+            groups.setdefault((bar.instrument_token, bar.interval), []).append(bar.as_candle())
+        for (token, interval), candles in groups.items():
+            try:
+                self.store.add(token, interval, candles)
+            except Exception as e:
+                log.error("Error saving {} {} bars: {}".format(token, interval, e))
+
+    # ----------------------------------------------------------------
+    # Timer
+    # ----------------------------------------------------------------
+    def start(self, period: float = 1.0) -> None:
+        """Close due bars every `period` seconds in a background thread."""
+        if self._timer is None:
+            self._stop.clear()
+            self._timer = threading.Thread(target=self._run, args=(period,), name="BarBuilderTimer")
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self, period: float) -> None:
+        while not self._stop.wait(period):
+            try:
+                self.close_due()
+            except Exception as e:
+                log.error("Error closing bars: {}".format(e))
+
+    def stop(self) -> None:
+        """Stop the timer and save the closed bars."""
+        self._stop.set()
+        if self._timer is not None and self._timer is not threading.current_thread():
+            self._timer.join()
+        self._timer = None
+        if self.store is not None:
+            self.save()
+
+    # ----------------------------------------------------------------
+    # Ticker hooks
+    # ----------------------------------------------------------------
+    def attach(self, ticker: Any) -> None:
+        """
+        Hook the builder to a `KiteTicker`'s ticks. A callback already set on the ticker keeps
+        working and is called after the bars have been updated.
+        """
+        self._ticker_callbacks["on_ticks"] = getattr(ticker, "on_ticks", None)
+        ticker.on_ticks = self._on_ticks
+
+    def _on_ticks(self, ws: Any, ticks: List[Dict[str, Any]]) -> None:
+        self.update_many(ticks)
+        callback = self._ticker_callbacks.get("on_ticks")
+        if callback:
+            callback(ws, ticks)
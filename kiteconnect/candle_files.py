@@ -0,0 +1,267 @@
+"""
+Columnar on-disk storage for historical candles.
+
+Candles are stored in one directory per instrument, series (interval) and month:
+
+    <root>/<instrument_token>/<series>/<YYYY-MM>/CURRENT
+    <root>/<instrument_token>/<series>/<YYYY-MM>/<segment>/timestamp.npy
+    <root>/<instrument_token>/<series>/<YYYY-MM>/<segment>/open.npy
+    ...
+
+Each column is a typed `.npy` file which is memory mapped on load, so reading years of
+minute candles costs a few page faults instead of parsing.
+
+A partition is a list of segments of time sorted candles, oldest first, named in `CURRENT`.
+Candles after the stored ones are written as a new segment, and a segment is merged with the
+one before it once it is as large, so a write costs the new candles rather than the month and
+a partition has at most log2(candles) segments. Candles overlapping stored ones are merged
+with the segments they overlap. A write builds its segments and then atomically replaces
+`CURRENT`, so readers in other processes never see a half written partition. Writers of a
+partition take an exclusive lock on its `LOCK` file, where `fcntl` is available, so that
+writes from other processes are merged rather than lost. The segments a write replaces are
+only deleted by the next write.
+"""
+import os
+import uuid
+import shutil
+import datetime
+import importlib
+import threading
+import contextlib
+from types import ModuleType
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    fcntl = importlib.import_module("fcntl")  # type: Optional[ModuleType]
+except ImportError:  # Windows
+    fcntl = None
+
+# Column names and types. `oi` is OI_MISSING when the candles were fetched without open interest.
+COLUMNS = (
+    ("timestamp", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.int64),
+    ("oi", np.int64),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+OI_MISSING = -1
+
+# Partitions are split on calendar months in the exchange timezone.
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
+Columns = Dict[str, np.ndarray]
+
+
+def empty_columns() -> Columns:
+    return dict((name, np.empty(0, dtype=dtype)) for name, dtype in COLUMNS)
+
+
+def _concatenate(parts: List[Columns]) -> Columns:
+    return dict((name, np.concatenate([part[name] for part in parts])) for name in COLUMN_NAMES)
+
+
+def _segments(partition: str) -> Optional[List[str]]:
+    """Segments of the current version of a partition, None if it has none."""
+    try:
+        with open(os.path.join(partition, "CURRENT")) as f:
+            return f.read().split()
+    except (IOError, OSError):
+        return None
+
+
+@contextlib.contextmanager
+def _partition_lock(partition: str) -> Iterator[None]:
+    """Exclusive lock of a partition, across processes."""
+    os.makedirs(partition, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(partition, "LOCK"), "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _month(ts: int) -> Tuple[int, int]:
+    d = datetime.datetime.fromtimestamp(ts, IST)
+    return d.year, d.month
+
+
+def _month_start(year: int, month: int) -> int:
+    return int(datetime.datetime(year, month, 1, tzinfo=IST).timestamp())
+
+
+def _next_month(year: int, month: int) -> Tuple[int, int]:
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _months(start: int, end: int) -> Iterator[Tuple[int, int]]:
+    year, month = _month(start)
+    last = _month(end)
+    while (year, month) <= last:
+        yield year, month
+        year, month = _next_month(year, month)
+
+
+class CandleFiles(object):
+    """Month partitioned columnar candle files under `root`."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _series_dir(self, instrument_token: int, series: str) -> str:
+        return os.path.join(self.root, str(instrument_token), series)
+
+    def _partition_dir(self, instrument_token: int, series: str, year: int, month: int) -> str:
+        return os.path.join(self._series_dir(instrument_token, series), "{:04d}-{:02d}".format(year, month))
+
+    # ----------------------------------------------------------------
+    # Reading
+    # ----------------------------------------------------------------
+    def _load(self, partition: str) -> Optional[Tuple[List[str], List[Columns]]]:
+        """Memory map the columns of the segments of a partition. Returns the segments and their columns."""
+        for _ in range(3):
+            segments = _segments(partition)
+            if segments is None:
+                return None
+
+            try:
+                return segments, [
+                    dict((name, np.load(os.path.join(partition, segment, name + ".npy"), mmap_mode="r"))
+                         for name in COLUMN_NAMES)
+                    for segment in segments
+                ]
+            except (IOError, OSError):
+                # Replaced by a concurrent write, read the new version.
+                continue
+        return None
+
+    def read(self, instrument_token: int, series: str, start: int, end: int) -> Columns:
+        """
+        Columns of the candles from `start` to `end` (inclusive epoch seconds), sorted by time.
+        Arrays are read-only memory mapped views when the range is in a single partition.
+        """
+        parts = []  # type: List[Columns]
+        for year, month in _months(start, end):
+            loaded = self._load(self._partition_dir(instrument_token, series, year, month))
+            if loaded is None:
+                continue
+
+            for columns in loaded[1]:
+                ts = columns["timestamp"]
+                lo, hi = np.searchsorted(ts, start, "left"), np.searchsorted(ts, end, "right")
+                if hi > lo:
+                    parts.append(dict((name, col[lo:hi]) for name, col in columns.items()))
+
+        if not parts:
+            return empty_columns()
+        if len(parts) == 1:
+            return parts[0]
+        return _concatenate(parts)
+
+    # ----------------------------------------------------------------
+    # Writing
+    # ----------------------------------------------------------------
+    def write(self, instrument_token: int, series: str, columns: Columns) -> None:
+        """
+        Merge candles into their partitions. Candles replace stored ones with the same
+        timestamp, except that a missing `oi` keeps the stored value.
+        """
+        columns = dict((name, np.asarray(columns[name], dtype=dtype)) for name, dtype in COLUMNS)
+        ts = columns["timestamp"]
+        if not len(ts):
+            return
+
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        # The last of the candles with the same timestamp wins.
+        order = order[np.append(ts[1:] != ts[:-1], True)]
+        columns = dict((name, col[order]) for name, col in columns.items())
+        ts = columns["timestamp"]
+
+        with self._lock:
+            for year, month in _months(int(ts[0]), int(ts[-1])):
+                start = _month_start(year, month)
+                end = _month_start(*_next_month(year, month)) - 1
+                lo, hi = np.searchsorted(ts, start, "left"), np.searchsorted(ts, end, "right")
+                if hi > lo:
+                    part = dict((name, col[lo:hi]) for name, col in columns.items())
+                    self._write_partition(self._partition_dir(instrument_token, series, year, month), part)
+
+    def _write_partition(self, partition: str, new: Columns) -> None:
+        with _partition_lock(partition):
+            previous, columns = self._load(partition) or ([], [])  # type: List[str], List[Columns]
+
+            # The segments from the first one the new candles overlap are merged with them.
+            start = new["timestamp"][0]
+            keep = 0
+            while keep < len(columns) and columns[keep]["timestamp"][-1] < start:
+                keep += 1
+            if keep < len(columns):
+                new = self._merge(_concatenate(columns[keep:]), new)
+            segments = previous[:keep] + [""]  # "" for a segment to write
+            columns = columns[:keep] + [new]
+
+            # A segment as large as the one before is merged with it, so their sizes halve going forward.
+            while len(columns) > 1 and len(columns[-1]["timestamp"]) >= len(columns[-2]["timestamp"]):
+                columns[-2:] = [_concatenate(columns[-2:])]
+                segments[-2:] = [""]
+
+            path = ""
+            for i, segment in enumerate(segments):
+                if not segment:
+                    segments[i] = uuid.uuid4().hex
+                    path = os.path.join(partition, segments[i])
+                    os.makedirs(path)
+                    for name in COLUMN_NAMES:
+                        np.save(os.path.join(path, name + ".npy"), np.ascontiguousarray(columns[i][name]))
+
+            pointer = os.path.join(partition, "CURRENT.tmp-" + os.path.basename(path))
+            with open(pointer, "w") as f:
+                f.write("\n".join(segments))
+            os.replace(pointer, os.path.join(partition, "CURRENT"))
+
+            # Segments of the version before the one just replaced, which a reader may still be
+            # about to open. Readers which have them mapped keep working on POSIX.
+            keep_entries = set(segments) | set(previous) | {"CURRENT", "LOCK"}
+            for entry in os.listdir(partition):
+                if entry not in keep_entries and not entry.startswith("CURRENT.tmp-"):
+                    shutil.rmtree(os.path.join(partition, entry), ignore_errors=True)
+
+    @staticmethod
+    def _merge(old: Columns, new: Columns) -> Columns:
+        old_ts, new_ts = old["timestamp"], new["timestamp"]
+
+        # Keep the stored open interest where the new candles have none.
+        oi = np.array(new["oi"])
+        idx = np.searchsorted(old_ts, new_ts)
+        found = idx < len(old_ts)
+        found[found] = old_ts[idx[found]] == new_ts[found]
+        fill = found & (oi == OI_MISSING)
+        oi[fill] = old["oi"][idx[fill]]
+        new = dict(new, oi=oi)
+
+        keep = ~np.isin(old_ts, new_ts)
+        merged = _concatenate([dict((name, old[name][keep]) for name in COLUMN_NAMES), new])
+        order = np.argsort(merged["timestamp"], kind="stable")
+        return dict((name, col[order]) for name, col in merged.items())
+
+    def delete(self, instrument_token: Optional[int] = None, series: Optional[List[str]] = None) -> None:
+        """Delete the candles of an instrument and/or series, or all of them."""
+        with self._lock:
+            tokens = [str(instrument_token)] if instrument_token is not None else (
+                os.listdir(self.root) if os.path.isdir(self.root) else [])
+            for token in tokens:
+                if series is None:
+                    shutil.rmtree(os.path.join(self.root, token), ignore_errors=True)
+                    continue
+                for name in series:
+                    shutil.rmtree(os.path.join(self.root, token, name), ignore_errors=True)
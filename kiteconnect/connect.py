@@ -7,21 +7,28 @@
     :copyright: (c) 2021 by Zerodha Technology.
     :license: see LICENSE for details.
 """
-from six import StringIO, PY2
 from six.moves.urllib.parse import urljoin
-import csv
-import json
 import dateutil.parser
 import hashlib
+import time
 import logging
 import datetime
 import requests
 import warnings
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError, wait as wait_futures
 from typing import Any, Callable, Dict, Iterable, List, Optional, Union, Tuple
 
 from .__version__ import __version__, __title__
 import kiteconnect.exceptions as ex
-from kiteconnect.utils.network import retry
+from kiteconnect.utils import codec
+from kiteconnect.utils.spread import SpreadOrderResult, spread_phases
+from kiteconnect.utils.bulk import PLACE, MODIFY, CANCEL, bulk_batches, bulk_result
+from kiteconnect.utils.executor import CallExecutor
+from kiteconnect.utils.parsing import parse_instruments, parse_mf_instruments, format_historical
+from kiteconnect.utils.network import (
+    RateLimiter, RetryPolicy, DEFAULT_RETRY_POLICY, NON_IDEMPOTENT_RETRY_POLICY, NO_RETRY_POLICY, exchange_now
+)
 
 log = logging.getLogger(__name__)
 
@@ -62,7 +69,6 @@ class KiteConnect(object):
     VARIETY_ICEBERG = "iceberg"
     VARIETY_AUCTION = "auction"
     VARIETY_AUCTION = "auction"
-    
 
     # Transaction type
     TRANSACTION_TYPE_BUY = "BUY"
@@ -170,6 +176,30 @@ class KiteConnect(object):
         "order.contract_note": "/charges/orders",
     }
 
+    # Retry policies for routes which are not safe to send twice.
+    # All other routes use `_default_retry_policy`.
+    _default_retry_policy = DEFAULT_RETRY_POLICY
+    _retry_policies = {
+        "api.token": NO_RETRY_POLICY,
+        "api.token.renew": NO_RETRY_POLICY,
+        "order.place": NON_IDEMPOTENT_RETRY_POLICY,
+        "portfolio.positions.convert": NON_IDEMPOTENT_RETRY_POLICY,
+        "mf.order.place": NON_IDEMPOTENT_RETRY_POLICY,
+        "mf.sip.place": NON_IDEMPOTENT_RETRY_POLICY,
+        "gtt.place": NON_IDEMPOTENT_RETRY_POLICY,
+    }
+
+    # Transient errors which are retried and the subset which guarantee the request was never sent.
+    _retry_exceptions = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    _unsent_exceptions = (requests.exceptions.ConnectTimeout,)
+
+    # Order rate limit (requests per second) and the routes it applies to.
+    _default_order_rate_limit = 10
+    _order_rate_limited_routes = ("order.place", "order.modify", "order.cancel")
+
+    # Default number of concurrent requests for bulk order operations.
+    _default_bulk_workers = 10
+
     def __init__(
         self,
         api_key: str,
@@ -180,6 +210,8 @@ class KiteConnect(object):
         proxies: Optional[Dict[str, str]] = None,
         pool: Optional[Dict[str, Any]] = None,
         disable_ssl: bool = False,
+        retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+        order_rate_limit: Optional[float] = _default_order_rate_limit,
     ) -> None:
         """
         Initialise a new Kite Connect client instance.
@@ -202,6 +234,10 @@ class KiteConnect(object):
         - `pool` is manages request pools. It takes a dict of params accepted by HTTPAdapter as described here in [python requests documentation](http://docs.python-requests.org/en/master/api/#requests.adapters.HTTPAdapter)
         - `disable_ssl` disables the SSL verification while making a request.
         If set requests won't throw SSLError if its set to custom `root` url without SSL.
+        - `retry_policies` is a dict of route name to `RetryPolicy` which overrides the default
+        retry behaviour for those routes. Use the route name `default` to override it for all other routes.
+        - `order_rate_limit` is the maximum number of order place, modify and cancel requests per second
+        sent by this client. Defaults to 10. Set it to None to disable client side rate limiting.
         """
         self.debug = debug
         self.api_key = api_key
@@ -213,6 +249,15 @@ class KiteConnect(object):
         self.root = root or self._default_root_uri
         self.timeout = timeout or self._default_timeout
 
+        self.retry_policies = dict(self._retry_policies)
+        for route, policy in (retry_policies or {}).items():
+            self.set_retry_policy(route, policy)
+
+        self.order_rate_limiter = RateLimiter(order_rate_limit) if order_rate_limit else None
+
+        # Runs the calls made with `submit` and `gather`, sized to the connection pool.
+        self.executor = CallExecutor(self._pool_size, thread_name_prefix="kiteconnect")
+
         # Create requests session by default
         # Same session to be used by pool connections
         self.reqsession = requests.Session()
@@ -230,10 +275,78 @@ class KiteConnect(object):
             )
 
     def close(self) -> None:
-        """Close the underlying HTTP session."""
+        """Stop the worker threads and close the underlying HTTP session."""
+        if getattr(self, "executor", None) is not None:
+            self.executor.shutdown()
         if getattr(self, "reqsession", None) is not None:
             self.reqsession.close()
 
+    def _pool_size(self) -> int:
+        """Connection pool size of the HTTP adapter serving `root`."""
+        adapter = self.reqsession.get_adapter(self.root)
+        return getattr(adapter, "_pool_maxsize", None) or requests.adapters.DEFAULT_POOLSIZE
+
+    # ----------------------------------------------------------------
+    # Concurrent calls
+    # ----------------------------------------------------------------
+    def submit(self, method: Union[str, Callable[..., Any]], *args: Any, **kwargs: Any) -> "Future[Any]":
+        """
+        Call a client method in the background and return a `concurrent.futures.Future`.
+
+        - `method` is the name of a client method, eg: `positions`, or any callable.
+
+        Calls run on a thread pool shared by all threads using this client. The pool
+        has as many workers as the HTTP connection pool (the `pool_maxsize` passed in
+        `pool`, 10 by default) so that concurrent calls reuse connections.
+
+            #!python
+            positions = kite.submit("positions")
+            quote = kite.submit("quote", ["NSE:INFY"])
+            positions.result(), quote.result()
+        """
+        func = getattr(self, method) if isinstance(method, str) else method
+        return self.executor.submit(func, *args, **kwargs)
+
+    def gather(self, *calls: Any, return_exceptions: bool = False, timeout: Optional[float] = None) -> List[Any]:
+        """
+        Run calls concurrently and return their results in the same order.
+
+        Each call is a method name, a tuple of a method name followed by its
+        arguments, or a future returned by `submit`.
+
+        - `return_exceptions` returns exceptions in place of results instead of raising
+        the first one.
+        - `timeout` is the maximum seconds to wait for all the calls. Raises
+        `concurrent.futures.TimeoutError` when exceeded.
+
+            #!python
+            profile, margins, positions, quote = kite.gather(
+                "profile", "margins", "positions", ("quote", ["NSE:INFY"]))
+        """
+        futures = []
+        for call in calls:
+            if isinstance(call, Future):
+                futures.append(call)
+            elif isinstance(call, tuple):
+                futures.append(self.submit(*call))
+            else:
+                futures.append(self.submit(call))
+
+        _, pending = wait_futures(futures, timeout=timeout)
+        if pending:
+            for future in pending:
+                future.cancel()
+            raise FutureTimeoutError("{} of {} calls did not complete in {} seconds".format(
+                len(pending), len(futures), timeout))
+
+        results = []
+        for future in futures:
+            error = future.exception()
+            if error is not None and not return_exceptions:
+                raise error
+            results.append(error if error is not None else future.result())
+        return results
+
     # ----------------------------------------------------------------
     # Context manager support
     # ----------------------------------------------------------------
@@ -265,6 +378,31 @@ class KiteConnect(object):
 
         self.session_expiry_hook = method
 
+    def set_retry_policy(self, route: str, policy: RetryPolicy) -> None:
+        """
+        Set the retry policy for a route.
+
+        - `route` is a route name from `_routes`, eg: `order.place`, or `default` for all unlisted routes.
+        - `policy` is a `kiteconnect.utils.network.RetryPolicy`.
+
+        Orders are never retried by default since a timed out order may still have been placed.
+        To retry them safely, tag your orders and enable the tag based dedup check:
+
+            kite.set_retry_policy("order.place", RetryPolicy(idempotent=False, dedup_by_tag=True, deadline=5))
+        """
+        if not isinstance(policy, RetryPolicy):
+            raise TypeError("Invalid input type. Only RetryPolicy instances are accepted.")
+
+        if route == "default":
+            self._default_retry_policy = policy
+        elif route in self._routes:
+            self.retry_policies[route] = policy
+        else:
+            raise ex.InputException("Unknown route `{}`".format(route))
+
+    def _retry_policy(self, route: str) -> RetryPolicy:
+        return self.retry_policies.get(route, self._default_retry_policy)
+
     def set_access_token(self, access_token: str) -> None:
         """Set the `access_token` received after a successful authentication."""
         self.access_token = access_token
@@ -428,33 +566,170 @@ class KiteConnect(object):
         return self.cancel_order(variety, order_id, parent_order_id=parent_order_id)
 
     def place_spread_order(
-        self, legs: Iterable[Dict[str, Any]], cancel_on_failure: bool = True
-    ) -> List[str]:
-        """Place multiple legs of a spread sequentially.
+        self,
+        legs: Iterable[Dict[str, Any]],
+        cancel_on_failure: bool = True,
+        concurrent: bool = False,
+        phases: Optional[List[List[int]]] = None,
+        hedge_first: bool = False,
+    ) -> SpreadOrderResult:
+        """Place multiple legs of a spread.
 
         Each leg in ``legs`` should be a dictionary of the same parameters that
-        :py:meth:`place_order` accepts. If ``cancel_on_failure`` is ``True`` and
-        any leg fails to be placed, all previously placed legs are cancelled
-        before the exception is propagated.
+        :py:meth:`place_order` accepts. By default legs are placed sequentially.
+
+        - ``concurrent`` places all the legs in parallel.
+        - ``phases`` is a list of lists of leg indices. Legs in a phase are placed
+          in parallel and each phase waits for the previous one to complete.
+        - ``hedge_first`` places the BUY legs in parallel first and then the SELL
+          legs in parallel, so that hedges reduce the margin for the short legs.
+
+        If ``cancel_on_failure`` is ``True`` and any leg fails to be placed, all
+        the legs which were placed are cancelled in parallel before the first
+        exception is propagated.
 
-        Returns a list of order ids corresponding to each successfully placed
-        leg.
+        Returns a list of order ids corresponding to each leg. The list also has
+        a ``timings`` attribute with per-leg round trip timings and a ``skew``
+        property to measure the delay between the legs.
         """
+        legs = list(legs)
+        started = time.perf_counter()
+        order_ids = {}  # type: Dict[int, str]
+        timings = []  # type: List[Dict[str, Any]]
+
+        def place(phase_idx: int, idx: int) -> str:
+            leg_started = time.perf_counter()
+            order_id = self.place_order(**legs[idx])
+            leg_finished = time.perf_counter()
+            timings.append({
+                "leg": idx,
+                "phase": phase_idx,
+                "order_id": order_id,
+                "started": leg_started - started,
+                "finished": leg_finished - started,
+                "elapsed": leg_finished - leg_started,
+            })
+            return order_id
+
+        for phase_idx, phase in enumerate(spread_phases(legs, concurrent, phases, hedge_first)):
+            errors = []
+            if len(phase) == 1:
+                try:
+                    order_ids[phase[0]] = place(phase_idx, phase[0])
+                except Exception as e:
+                    errors.append(e)
+            else:
+                futures = [(idx, self.executor.submit(place, phase_idx, idx)) for idx in phase]
+                for idx, future in futures:
+                    try:
+                        order_ids[idx] = future.result()
+                    except Exception as e:
+                        errors.append(e)
+
+            if errors:
+                if cancel_on_failure and order_ids:
+                    self._cancel_spread_legs(legs, order_ids)
+                raise errors[0]
+
+        timings.sort(key=lambda t: t["leg"])
+        return SpreadOrderResult([order_ids[i] for i in range(len(legs))], timings)
 
-        order_ids = []
-        for idx, leg in enumerate(legs):
+    def _cancel_spread_legs(self, legs: List[Dict[str, Any]], order_ids: Dict[int, str]) -> None:
+        """Cancel the placed legs of a failed spread in parallel."""
+        def cancel(idx: int) -> None:
             try:
-                order_ids.append(self.place_order(**leg))
-            except Exception:
-                if cancel_on_failure and order_ids:
-                    for oid, prev_leg in zip(order_ids, legs[:idx]):
-                        try:
-                            self.cancel_order(prev_leg.get("variety"), oid)
-                        except Exception as e:
-                            log.exception("Failed to cancel order %s: %s", oid, e)
-                raise
+                self.cancel_order(legs[idx]["variety"], order_ids[idx])
+            except Exception as e:
+                log.exception("Failed to cancel order %s: %s", order_ids[idx], e)
+
+        if len(order_ids) == 1:
+            cancel(next(iter(order_ids)))
+            return
 
-        return order_ids
+        wait_futures([self.executor.submit(cancel, idx) for idx in sorted(order_ids)])
+
+    def place_orders(
+        self, orders: Iterable[Dict[str, Any]], max_workers: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Place many orders concurrently.
+
+        Each item in `orders` is a dict of the params accepted by `place_order`.
+        Returns a result dict for each order, in the same order, with the keys
+        `op`, `params`, `status`, `order_id` and `error`. Failures are reported in
+        the results instead of being raised.
+        """
+        return self.bulk_orders(place=orders, max_workers=max_workers)[PLACE]
+
+    def modify_orders(
+        self, orders: Iterable[Dict[str, Any]], max_workers: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Modify many open orders concurrently.
+
+        Each item in `orders` is a dict of the params accepted by `modify_order`.
+        Returns a result dict for each order as described in `place_orders`.
+        """
+        return self.bulk_orders(modify=orders, max_workers=max_workers)[MODIFY]
+
+    def cancel_orders(
+        self, orders: Iterable[Dict[str, Any]], max_workers: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Cancel many orders concurrently.
+
+        Each item in `orders` is a dict with `variety`, `order_id` and optionally
+        `parent_order_id`. Rows from `orders()` can be passed as is.
+        Returns a result dict for each order as described in `place_orders`.
+        """
+        return self.bulk_orders(cancel=orders, max_workers=max_workers)[CANCEL]
+
+    def bulk_orders(
+        self,
+        place: Iterable[Dict[str, Any]] = (),
+        modify: Iterable[Dict[str, Any]] = (),
+        cancel: Iterable[Dict[str, Any]] = (),
+        prioritize_cancels: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run a mix of order placements, modifications and cancellations concurrently.
+
+        - `max_workers` is the maximum number of requests in flight. Requests run on
+        the client's shared thread pool (see `submit`) and are additionally throttled
+        by the client's order rate limit.
+        - `prioritize_cancels` runs all cancellations before any modification or
+        new order, eg: to free up margin when rebalancing a basket.
+
+        Returns a dict with the keys `place`, `modify` and `cancel`, each holding the
+        results of the corresponding items in input order as described in `place_orders`.
+        """
+        items, batches = bulk_batches(place, modify, cancel, prioritize_cancels)
+        results = {op: [None] * len(items[op]) for op in items}  # type: Dict[str, List[Any]]
+        calls = {
+            PLACE: self.place_order, MODIFY: self.modify_order, CANCEL: self.cancel_order,
+        }  # type: Dict[str, Callable[..., str]]
+
+        in_flight = threading.BoundedSemaphore(max_workers or self._default_bulk_workers)
+
+        def run(op: str, params: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                return bulk_result(op, params, order_id=calls[op](**params))
+            except Exception as e:
+                log.warning("Bulk {} failed for {}: {}".format(op, params, e))
+                return bulk_result(op, params, error=e)
+            finally:
+                in_flight.release()
+
+        for batch in batches:
+            futures = []
+            for op, idx, params in batch:
+                in_flight.acquire()
+                futures.append((op, idx, self.executor.submit(run, op, params)))
+            for op, idx, future in futures:
+                results[op][idx] = future.result()
+
+        return results
 
     def _format_response(self, data: Any) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
         """Parse and format responses."""
@@ -720,21 +995,7 @@ class KiteConnect(object):
         return self._format_historical(data)
 
     def _format_historical(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        records = []
-        for d in data["candles"]:
-            record = {
-                "date": dateutil.parser.parse(d[0]),
-                "open": d[1],
-                "high": d[2],
-                "low": d[3],
-                "close": d[4],
-                "volume": d[5],
-            }
-            if len(d) == 7:
-                record["oi"] = d[6]
-            records.append(record)
-
-        return records
+        return format_historical(data)
 
     def trigger_range(self, transaction_type: str, *instruments: str) -> Dict[str, Any]:
         """Retrieve the buy/sell trigger range for Cover Orders."""
@@ -832,8 +1093,8 @@ class KiteConnect(object):
         condition, gtt_orders = self._get_gtt_payload(trigger_type, tradingsymbol, exchange, trigger_values, last_price, orders)
 
         return self._post("gtt.place", params={
-            "condition": json.dumps(condition),
-            "orders": json.dumps(gtt_orders),
+            "condition": codec.dumps(condition),
+            "orders": codec.dumps(gtt_orders),
             "type": trigger_type})
 
     def modify_gtt(
@@ -864,8 +1125,8 @@ class KiteConnect(object):
         return self._put("gtt.modify",
                          url_args={"trigger_id": trigger_id},
                          params={
-                             "condition": json.dumps(condition),
-                             "orders": json.dumps(gtt_orders),
+                             "condition": codec.dumps(condition),
+                             "orders": codec.dumps(gtt_orders),
                              "type": trigger_type})
 
     def delete_gtt(self, trigger_id: str) -> Dict[str, Any]:
@@ -917,68 +1178,20 @@ class KiteConnect(object):
         warnings.warn(message, DeprecationWarning)
 
     def _parse_instruments(self, data: Any) -> List[Dict[str, Any]]:
-        # decode to string for Python 3
-        d = data
-        # Decode unicode data
-        if not PY2 and type(d) == bytes:
-            d = data.decode("utf-8").strip()
-
-        records = []
-        reader = csv.DictReader(StringIO(d))
-
-        for row in reader:
-            row["instrument_token"] = int(row["instrument_token"])
-            row["last_price"] = float(row["last_price"])
-            row["strike"] = float(row["strike"])
-            row["tick_size"] = float(row["tick_size"])
-            row["lot_size"] = int(row["lot_size"])
-
-            # Parse date
-            if len(row["expiry"]) == 10:
-                row["expiry"] = dateutil.parser.parse(row["expiry"]).date()
-
-            records.append(row)
-
-        return records
+        return parse_instruments(data)
 
     def _parse_mf_instruments(self, data: Any) -> List[Dict[str, Any]]:
-        # decode to string for Python 3
-        d = data
-        if not PY2 and type(d) == bytes:
-            d = data.decode("utf-8").strip()
-
-        records = []
-        reader = csv.DictReader(StringIO(d))
-
-        for row in reader:
-            row["minimum_purchase_amount"] = float(row["minimum_purchase_amount"])
-            row["purchase_amount_multiplier"] = float(row["purchase_amount_multiplier"])
-            row["minimum_additional_purchase_amount"] = float(row["minimum_additional_purchase_amount"])
-            row["minimum_redemption_quantity"] = float(row["minimum_redemption_quantity"])
-            row["redemption_quantity_multiplier"] = float(row["redemption_quantity_multiplier"])
-            row["purchase_allowed"] = bool(int(row["purchase_allowed"]))
-            row["redemption_allowed"] = bool(int(row["redemption_allowed"]))
-            row["last_price"] = float(row["last_price"])
-
-            # Parse date
-            if len(row["last_price_date"]) == 10:
-                row["last_price_date"] = dateutil.parser.parse(row["last_price_date"]).date()
-
-            records.append(row)
-
-        return records
+        return parse_mf_instruments(data)
 
     def _user_agent(self) -> str:
         return (__title__ + "-python/").capitalize() + __version__
 
-    @retry(exceptions=(requests.exceptions.ConnectionError, requests.exceptions.Timeout), tries=3, delay=1, backoff=2)
     def _get(
         self, route: str, url_args: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None, is_json: bool = False
     ) -> Any:
         """Alias for sending a GET request."""
-        return self._request(route, "GET", url_args=url_args, params=params, is_json=is_json)
+        return self._retry_request(route, "GET", url_args=url_args, params=params, is_json=is_json)
 
-    @retry(exceptions=(requests.exceptions.ConnectionError, requests.exceptions.Timeout), tries=3, delay=1, backoff=2)
     def _post(
         self,
         route: str,
@@ -988,9 +1201,8 @@ class KiteConnect(object):
         query_params: Optional[Dict[str, Any]] = None,
     ) -> Any:
         """Alias for sending a POST request."""
-        return self._request(route, "POST", url_args=url_args, params=params, is_json=is_json, query_params=query_params)
+        return self._retry_request(route, "POST", url_args=url_args, params=params, is_json=is_json, query_params=query_params)
 
-    @retry(exceptions=(requests.exceptions.ConnectionError, requests.exceptions.Timeout), tries=3, delay=1, backoff=2)
     def _put(
         self,
         route: str,
@@ -1000,14 +1212,68 @@ class KiteConnect(object):
         query_params: Optional[Dict[str, Any]] = None,
     ) -> Any:
         """Alias for sending a PUT request."""
-        return self._request(route, "PUT", url_args=url_args, params=params, is_json=is_json, query_params=query_params)
+        return self._retry_request(route, "PUT", url_args=url_args, params=params, is_json=is_json, query_params=query_params)
 
-    @retry(exceptions=(requests.exceptions.ConnectionError, requests.exceptions.Timeout), tries=3, delay=1, backoff=2)
     def _delete(
         self, route: str, url_args: Optional[Dict[str, Any]] = None, params: Optional[Dict[str, Any]] = None, is_json: bool = False
     ) -> Any:
         """Alias for sending a DELETE request."""
-        return self._request(route, "DELETE", url_args=url_args, params=params, is_json=is_json)
+        return self._retry_request(route, "DELETE", url_args=url_args, params=params, is_json=is_json)
+
+    def _retry_request(self, route: str, method: str, **kwargs: Any) -> Any:
+        """Make an HTTP request under the retry policy of the route."""
+        policy = self._retry_policy(route)
+
+        dedup = None
+        params = kwargs.get("params")
+        if policy.dedup_by_tag and route == "order.place" and isinstance(params, dict) and params.get("tag"):
+            # Only orders placed from the first attempt on can be one of its attempts.
+            since = exchange_now()
+
+            def dedup() -> Optional[Dict[str, Any]]:
+                return self._find_order_by_tag(params, since)
+
+        rate_limiter = self.order_rate_limiter if route in self._order_rate_limited_routes else None
+
+        def attempt(remaining: Optional[float]) -> Any:
+            if rate_limiter is not None:
+                waited = rate_limiter.acquire()
+                if remaining is not None:
+                    remaining -= waited
+            self._check_deadline(route, remaining)
+            return self._request(route, method, timeout=self.timeout, **kwargs)
+
+        return policy.call(attempt, self._retry_exceptions, unsent_exceptions=self._unsent_exceptions, dedup=dedup)
+
+    def _check_deadline(self, route: str, remaining: Optional[float]) -> None:
+        """
+        Raise if the retry budget is used up before a request is sent. Sending it anyway with the
+        rest of the budget as its timeout could report an order as failed after it was placed.
+        """
+        if remaining is not None and remaining <= 0:
+            raise ex.NetworkException("Deadline exceeded before sending the {} request.".format(route))
+
+    def _find_order_by_tag(self, params: Dict[str, Any], since: datetime.datetime) -> Optional[Dict[str, Any]]:
+        """
+        Find an order in the orderbook which matches the `tag` and the instrument, side and
+        quantity of the order `params` and was placed at or after `since`, a naive IST datetime.
+        Returns the `order.place` response for it or None.
+
+        Earlier orders with a reused tag are never matched, so the local clock should be in sync.
+        """
+        for order in reversed(self.orders()):
+            if order.get("tag") != params["tag"] and params["tag"] not in (order.get("tags") or []):
+                continue
+
+            placed = order.get("order_timestamp")
+            if not isinstance(placed, datetime.datetime) or placed < since:
+                continue
+
+            same = all(order.get(key) == params.get(key) for key in ("tradingsymbol", "exchange", "transaction_type"))
+            if same and int(order.get("quantity") or 0) == int(params.get("quantity") or 0):
+                return {"order_id": order["order_id"]}
+
+        return None
 
     def _request(
         self,
@@ -1017,6 +1283,7 @@ class KiteConnect(object):
         params: Optional[Any] = None,
         is_json: bool = False,
         query_params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
     ) -> Any:
         """Make an HTTP request."""
         # Form a restful URL
@@ -1045,16 +1312,24 @@ class KiteConnect(object):
         if method in ["GET", "DELETE"]:
             query_params = params
 
+        # Encode JSON bodies with the active codec instead of letting requests use stdlib json
+        data = None
+        if method in ["POST", "PUT"]:
+            if is_json:
+                data = codec.dumps(params).encode("utf-8")
+                headers["Content-Type"] = "application/json"
+            else:
+                data = params
+
         try:
             r = self.reqsession.request(method,
                                         url,
-                                        json=params if (method in ["POST", "PUT"] and is_json) else None,
-                                        data=params if (method in ["POST", "PUT"] and not is_json) else None,
+                                        data=data,
                                         params=query_params,
                                         headers=headers,
                                         verify=not self.disable_ssl,
                                         allow_redirects=True,
-                                        timeout=self.timeout,
+                                        timeout=timeout or self.timeout,
                                         proxies=self.proxies)
         # Any requests lib related exceptions are raised here - https://requests.readthedocs.io/en/latest/api/#exceptions
         except Exception as e:
@@ -1066,7 +1341,7 @@ class KiteConnect(object):
         # Validate the content type.
         if "json" in r.headers["content-type"]:
             try:
-                data = r.json()
+                data = codec.loads(r.content)
             except ValueError:
                 raise ex.DataException("Couldn't parse the JSON response received from the server: {content}".format(
                     content=r.content))
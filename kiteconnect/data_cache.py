@@ -1,77 +1,462 @@
 import sqlite3
-import pandas as pd
-import json
+import logging
 import datetime
-from typing import Optional, Dict, Any
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from kiteconnect.candle_files import CandleFiles, OI_MISSING, empty_columns
+from kiteconnect.resample import INTERVALS as RESAMPLE_INTERVALS, last_minute, resample
+from kiteconnect.utils.lru import LRUCache
+from kiteconnect.utils.sqlite import get_store
+
+log = logging.getLogger(__name__)
 
 CACHE_DB = "historical_data_cache.db"
+# Directory of the candle files, see `kiteconnect.candle_files`.
+CACHE_DIR = "historical_data_cache"
 
-def _init_cache_db():
-    """
-    Initializes the SQLite database for caching historical data.
+# Exchange timezone. Naive datetimes passed to the cache are taken to be in it, like the API does.
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
+# Length of a candle of each interval in seconds.
+INTERVAL_SECONDS = {
+    "minute": 60,
+    "3minute": 3 * 60,
+    "5minute": 5 * 60,
+    "10minute": 10 * 60,
+    "15minute": 15 * 60,
+    "30minute": 30 * 60,
+    "60minute": 60 * 60,
+    "day": 24 * 60 * 60,
+}
+
+# Maximum number of days of candles the API returns in a single request.
+MAX_DAYS_PER_REQUEST = {
+    "minute": 60,
+    "3minute": 100,
+    "5minute": 100,
+    "10minute": 100,
+    "15minute": 200,
+    "30minute": 200,
+    "60minute": 400,
+    "day": 2000,
+}
+
+CANDLE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Intervals `fetch` builds from cached minute candles by default. Day candles are left out: the
+# API's include the closing price and trades outside the session, which minute candles don't.
+FROM_MINUTE_INTERVALS = tuple(i for i in RESAMPLE_INTERVALS if i not in ("minute", "day"))
+
+# Size of the in-memory tier in front of the disk store, shared by all the stores of the process.
+MEMORY_CACHE_BYTES = 256 * 1024 * 1024
+# Longest time a range which includes the latest candles is served from memory.
+MAX_LIVE_TTL = 60
+
+DateLike = Union[str, datetime.date, datetime.datetime]
+# An inclusive range of epoch seconds.
+Range = Tuple[int, int]
+
+
+def _to_datetime(value: DateLike) -> datetime.datetime:
+    """Timezone aware datetime for a date, datetime or ISO format string. Naive values are in IST."""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    elif not isinstance(value, datetime.datetime):
+        value = datetime.datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=IST)
+    return value
+
+
+def _to_timestamp(value: Any) -> int:
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime()
+    return int(_to_datetime(value).timestamp())
+
+
+def _from_timestamp(ts: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(ts, IST)
+
+
+def merge_ranges(ranges: Iterable[Range]) -> List[Range]:
+    """Merge overlapping and adjacent inclusive ranges."""
+    merged = []  # type: List[List[int]]
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def subtract_ranges(start: int, end: int, covered: Sequence[Range]) -> List[Range]:
+    """Parts of the inclusive range `start` to `end` which are not in the merged `covered` ranges."""
+    missing = []
+    cursor = start
+    for c_start, c_end in covered:
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            missing.append((cursor, c_start - 1))
+        cursor = max(cursor, c_end + 1)
+        if cursor > end:
+            break
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
+
+
+def _frame_size(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True).sum())
+
+
+# DataFrames returned by `CandleStore.fetch`, see `CandleStore.memory`.
+memory_cache = LRUCache(MEMORY_CACHE_BYTES, sizeof=_frame_size)
+
+SCHEMA = [
     """
-    conn = sqlite3.connect(CACHE_DB)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS historical_data (
+        CREATE TABLE IF NOT EXISTS candle_coverage (
             instrument_token INTEGER NOT NULL,
             interval TEXT NOT NULL,
-            from_date TEXT NOT NULL,
-            to_date TEXT NOT NULL,
-            data TEXT NOT NULL,
-            PRIMARY KEY (instrument_token, interval, from_date, to_date)
+            oi INTEGER NOT NULL,
+            from_ts INTEGER NOT NULL,
+            to_ts INTEGER NOT NULL
         )
+    """,
+    "CREATE INDEX IF NOT EXISTS candle_coverage_key ON candle_coverage (instrument_token, interval, oi)",
+]
+
+
+class CandleStore(object):
+    """
+    Cache of historical candles, indexed by instrument, interval and time.
+
+    Candles are stored in month partitioned columnar files under `root` which are memory mapped
+    on load (see `kiteconnect.candle_files`). The SQLite database at `path` keeps the time
+    ranges which were fetched from the API, so that any
+    range query can be answered from the cache and only the missing parts are fetched. Extending a
+    backtest by a month or refreshing today's candles fetches just the new candles.
+
+        #!python
+        store = CandleStore()
+        df = store.fetch(kite, 256265, "2024-01-01", "2024-03-31 15:30:00", "minute")
+
+    Continuous futures data is cached separately from the contract's own data. Ranges fetched
+    with `oi` also answer queries without it, but not the other way round.
+
+    In front of the disk store, `fetch` keeps its results in `memory`, an LRU cache bounded by
+    bytes which is shared by the stores of the process unless one is passed. Ranges ending before
+    the latest complete candle never change and stay until evicted, others expire after a candle
+    (at most `MAX_LIVE_TTL` seconds). `memory.stats()` has the hit, miss and eviction counts.
+    """
+
+    def __init__(self, path: str = CACHE_DB, root: str = CACHE_DIR, memory: Optional[LRUCache] = None) -> None:
+        self.path = path
+        self.files = CandleFiles(root)
+        self.memory = memory if memory is not None else memory_cache
+        # Shared by the stores of the same database, so the schema is created once per process.
+        self.db = get_store(path, SCHEMA)
+
+    @staticmethod
+    def _series(interval: str, continuous: bool = False) -> str:
+        """Name the candles of an interval are stored under."""
+        return interval + "-continuous" if continuous else interval
+
+    # ----------------------------------------------------------------
+    # Coverage
+    # ----------------------------------------------------------------
+    def _coverage(self, instrument_token: int, series: str, oi: bool) -> List[Range]:
+        if oi:
+            rows = self.db.query("""
+                SELECT from_ts, to_ts FROM candle_coverage
+                WHERE instrument_token = ? AND interval = ? AND oi = 1
+            """, (instrument_token, series))
+        else:
+            rows = self.db.query("""
+                SELECT from_ts, to_ts FROM candle_coverage
+                WHERE instrument_token = ? AND interval = ?
+            """, (instrument_token, series))
+        return merge_ranges(rows.fetchall())
+
+    def coverage(
+        self, instrument_token: int, interval: str, continuous: bool = False, oi: bool = False
+    ) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """Time ranges of candles which are cached, as (from, to) datetimes."""
+        ranges = self._coverage(instrument_token, self._series(interval, continuous), oi)
+        return [(_from_timestamp(start), _from_timestamp(end)) for start, end in ranges]
+
+    def missing(
+        self,
+        instrument_token: int,
+        interval: str,
+        from_date: DateLike,
+        to_date: DateLike,
+        continuous: bool = False,
+        oi: bool = False,
+    ) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """Parts of the range `from_date` to `to_date` (both inclusive) which are not cached."""
+        covered = self._coverage(instrument_token, self._series(interval, continuous), oi)
+        gaps = subtract_ranges(_to_timestamp(from_date), _to_timestamp(to_date), covered)
+        return [(_from_timestamp(start), _from_timestamp(end)) for start, end in gaps]
+
+    # ----------------------------------------------------------------
+    # Candles
+    # ----------------------------------------------------------------
+    def put(
+        self,
+        instrument_token: int,
+        interval: str,
+        candles: Union[pd.DataFrame, List[Dict[str, Any]]],
+        from_date: DateLike,
+        to_date: DateLike,
+        continuous: bool = False,
+        oi: bool = False,
+        complete_until: Optional[DateLike] = None,
+    ) -> None:
+        """
+        Store the candles fetched for the range `from_date` to `to_date`.
+
+        - `candles` as returned by `historical_data` or a DataFrame of them indexed by date.
+        - `complete_until` marks the range as fetched only up to this time, eg: the start
+        of the candle still in progress. Later candles are stored but fetched again next time.
+        """
+        series = self.add(instrument_token, interval, candles, continuous)
+
+        start, end = _to_timestamp(from_date), _to_timestamp(to_date)
+        if complete_until is not None:
+            end = min(end, _to_timestamp(complete_until) - 1)
+        if start > end:
+            return
+
+        with self.db.transaction() as conn:
+            self._add_coverage(conn, instrument_token, series, oi, (start, end))
+
+    def add(
+        self,
+        instrument_token: int,
+        interval: str,
+        candles: Union[pd.DataFrame, List[Dict[str, Any]]],
+        continuous: bool = False,
+    ) -> str:
+        """
+        Store candles without marking their range as fetched, eg: bars built from ticks, which
+        may have missed some. `fetch` still gets the range from the API. Returns the series name.
+        """
+        series = self._series(interval, continuous)
+        self.files.write(instrument_token, series, self._columns(candles))
+        # Higher timeframes may have been built from minute candles.
+        self._invalidate(instrument_token, None if interval == "minute" else [series])
+        return series
+
+    def _add_coverage(self, conn: sqlite3.Connection, instrument_token: int, series: str, oi: bool,
+                      new: Range) -> None:
+        flag = 1 if oi else 0
+        existing = conn.execute("""
+            SELECT from_ts, to_ts FROM candle_coverage WHERE instrument_token = ? AND interval = ? AND oi = ?
+        """, (instrument_token, series, flag)).fetchall()
+        conn.execute("""
+            DELETE FROM candle_coverage WHERE instrument_token = ? AND interval = ? AND oi = ?
+        """, (instrument_token, series, flag))
+        conn.executemany("""
+            INSERT INTO candle_coverage (instrument_token, interval, oi, from_ts, to_ts) VALUES (?, ?, ?, ?, ?)
+        """, [(instrument_token, series, flag, start, end) for start, end in merge_ranges(existing + [new])])
+
+    @staticmethod
+    def _columns(candles: Union[pd.DataFrame, List[Dict[str, Any]]]) -> Dict[str, np.ndarray]:
+        """Columns for `CandleFiles` from `historical_data` records or a DataFrame of them."""
+        df = candles.reset_index() if isinstance(candles, pd.DataFrame) else pd.DataFrame(candles)
+        if df.empty:
+            return empty_columns()
+
+        dates = pd.to_datetime(df["date"])
+        if dates.dt.tz is None:
+            dates = dates.dt.tz_localize(IST)
+        columns = dict((name, df[name].to_numpy()) for name in CANDLE_COLUMNS)
+        columns["timestamp"] = dates.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy("datetime64[s]").astype(
+            np.int64)
+        columns["oi"] = df["oi"].fillna(OI_MISSING).to_numpy() if "oi" in df else np.full(len(df), OI_MISSING)
+        return columns
+
+    def columns(
+        self,
+        instrument_token: int,
+        interval: str,
+        from_date: DateLike,
+        to_date: DateLike,
+        continuous: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Cached candles from `from_date` to `to_date` (both inclusive) as numpy arrays of `timestamp`
+        (epoch seconds), `open`, `high`, `low`, `close`, `volume` and `oi` without building a DataFrame.
+        Ranges within a month are read-only memory mapped views of the files.
+        """
+        return self.files.read(instrument_token, self._series(interval, continuous),
+                               _to_timestamp(from_date), _to_timestamp(to_date))
+
+    def get(
+        self,
+        instrument_token: int,
+        interval: str,
+        from_date: DateLike,
+        to_date: DateLike,
+        continuous: bool = False,
+        oi: bool = False,
+    ) -> pd.DataFrame:
+        """Cached candles from `from_date` to `to_date` (both inclusive) as a DataFrame indexed by date."""
+        return self._frame(self.columns(instrument_token, interval, from_date, to_date, continuous), oi)
+
+    @staticmethod
+    def _frame(columns: Dict[str, np.ndarray], oi: bool) -> pd.DataFrame:
+        index = pd.DatetimeIndex(pd.to_datetime(columns["timestamp"], unit="s", utc=True), name="date")
+        index = index.tz_convert(IST)
+        names = CANDLE_COLUMNS + ["oi"] if oi else CANDLE_COLUMNS
+        return pd.DataFrame(dict((name, columns[name]) for name in names), index=index, columns=names)
+
+    def fetch(
+        self,
+        kite: Any,
+        instrument_token: int,
+        from_date: DateLike,
+        to_date: DateLike,
+        interval: str,
+        continuous: bool = False,
+        oi: bool = False,
+        from_minute: Union[bool, Sequence[str]] = True,
+    ) -> pd.DataFrame:
+        """
+        Candles from `from_date` to `to_date` as a DataFrame indexed by date. Only the parts of the
+        range missing from the cache are fetched with `kite.historical_data`, in as many requests as
+        the API's per request limits need.
+
+        The DataFrame is served from `memory` when the same range was fetched recently. With
+        `from_minute`, higher timeframes are built from cached minute candles when they cover the
+        range (see `kiteconnect.resample`), without an API call or storing them separately. True
+        stands for the intraday `FROM_MINUTE_INTERVALS`; pass the intervals to build instead, eg:
+        `("15minute", "day")`, to opt in to day candles built from minutes.
+        """
+        series = self._series(interval, continuous)
+        key = (self.files.root, instrument_token, series, oi, _to_timestamp(from_date), _to_timestamp(to_date))
+        df = self.memory.get(key)
+        if df is not None:
+            # A shallow copy so callers' changes don't reach the cached frame.
+            return df.copy(deep=False)
+
+        if from_minute is True:
+            from_minute = FROM_MINUTE_INTERVALS
+        if from_minute and interval != "minute" and interval in RESAMPLE_INTERVALS and interval in from_minute:
+            df = self._resampled(instrument_token, key[-2], key[-1], interval, continuous, oi)
+            if df is not None:
+                self.memory.put(key, df)
+                return df.copy(deep=False)
+
+        now = datetime.datetime.now(IST)
+        # The latest candle may still be forming, it's fetched again next time.
+        complete_until = now - datetime.timedelta(seconds=INTERVAL_SECONDS.get(interval, 0))
+
+        for start, end in self.missing(instrument_token, interval, from_date, to_date, continuous, oi):
+            for chunk_start, chunk_end in self._chunks(start, end, interval):
+                log.debug("Fetching {} {} candles from {} to {}".format(
+                    instrument_token, interval, chunk_start, chunk_end))
+                candles = kite.historical_data(
+                    instrument_token=instrument_token,
+                    from_date=chunk_start.replace(tzinfo=None),
+                    to_date=chunk_end.replace(tzinfo=None),
+                    interval=interval,
+                    continuous=continuous,
+                    oi=oi,
+                )
+                self.put(instrument_token, interval, candles, chunk_start, chunk_end, continuous, oi,
+                         complete_until=complete_until)
+
+        df = self.get(instrument_token, interval, from_date, to_date, continuous, oi)
+        ttl = None
+        if key[-1] >= _to_timestamp(complete_until):
+            ttl = min(INTERVAL_SECONDS.get(interval, MAX_LIVE_TTL), MAX_LIVE_TTL)
+        self.memory.put(key, df, ttl=ttl)
+        return df.copy(deep=False)
+
+    def _resampled(self, instrument_token: int, start: int, end: int, interval: str, continuous: bool,
+                   oi: bool) -> Optional[pd.DataFrame]:
+        """Candles of `interval` starting from `start` to `end` built from minute candles, None unless cached."""
+        # Minute candles up to the end of the last candle.
+        minute_start, minute_end = _from_timestamp(start), _from_timestamp(last_minute(end, interval))
+        if self.missing(instrument_token, "minute", minute_start, minute_end, continuous, oi):
+            return None
+
+        columns = resample(self.columns(instrument_token, "minute", minute_start, minute_end, continuous), interval)
+        ts = columns["timestamp"]
+        lo, hi = np.searchsorted(ts, start, "left"), np.searchsorted(ts, end, "right")
+        return self._frame(dict((name, col[lo:hi]) for name, col in columns.items()), oi)
+
+    def _invalidate(self, instrument_token: Optional[int] = None, series: Optional[List[str]] = None) -> None:
+        """Drop the in-memory results of an instrument and/or series of this store."""
+        root = self.files.root
+
+        def match(key: Any) -> bool:
+            # Keys of `fetch`, (root, instrument_token, series, ...).
+            return key[0] == root and instrument_token in (None, key[1]) and (series is None or key[2] in series)
+
+        self.memory.invalidate(match)
+
+    @staticmethod
+    def _chunks(start: datetime.datetime, end: datetime.datetime,
+                interval: str) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """Split a range into the largest ranges the API returns in a single request."""
+        step = datetime.timedelta(days=MAX_DAYS_PER_REQUEST.get(interval, 60))
+        chunks = []
+        while start <= end:
+            chunk_end = min(end, start + step - datetime.timedelta(seconds=1))
+            chunks.append((start, chunk_end))
+            start = chunk_end + datetime.timedelta(seconds=1)
+        return chunks
+
+    def clear(self, instrument_token: Optional[int] = None, interval: Optional[str] = None) -> None:
+        """Delete cached candles, all of them or those of an instrument and/or interval."""
+        series = [interval, self._series(interval, True)] if interval is not None else None
+        self.files.delete(instrument_token, series)
+        self._invalidate(instrument_token, series)
+
+        where, args = [], []  # type: List[str], List[Any]
+        if instrument_token is not None:
+            where.append("instrument_token = ?")
+            args.append(instrument_token)
+        if interval is not None:
+            where.append("(interval = ? OR interval = ?)")
+            args.extend([interval, self._series(interval, True)])
+        clause = " WHERE " + " AND ".join(where) if where else ""
+
+        self.db.execute("DELETE FROM candle_coverage" + clause, args)
+
+
+def _init_cache_db():
     """
-    )
-    conn.commit()
-    conn.close()
+    Initializes the SQLite database for caching historical data.
+    """
+    CandleStore(CACHE_DB, CACHE_DIR)
+
 
 def save_historical_data(instrument_token: int, interval: str, from_date: datetime.datetime, to_date: datetime.datetime, data: pd.DataFrame):
     """
     Saves historical data to the cache database.
     """
-    _init_cache_db()
-    conn = sqlite3.connect(CACHE_DB)
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            INSERT OR REPLACE INTO historical_data (instrument_token, interval, from_date, to_date, data)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            instrument_token,
-            interval,
-            from_date.isoformat(),
-            to_date.isoformat(),
-            data.to_json(orient='records')
-        ))
-        conn.commit()
-    except sqlite3.Error as e:
-        print(f"Error saving data to cache: {e}")
-    finally:
-        conn.close()
+        CandleStore(CACHE_DB, CACHE_DIR).put(instrument_token, interval, data, from_date, to_date)
+    except (sqlite3.Error, OSError) as e:
+        log.error(f"Error saving data to cache: {e}")
+
 
 def load_historical_data(instrument_token: int, interval: str, from_date: datetime.datetime, to_date: datetime.datetime) -> Optional[pd.DataFrame]:
     """
-    Loads historical data from the cache database.
+    Loads historical data from the cache database. Returns None unless the whole range is cached.
     """
-    _init_cache_db()
-    conn = sqlite3.connect(CACHE_DB)
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            SELECT data FROM historical_data
-            WHERE instrument_token = ? AND interval = ? AND from_date = ? AND to_date = ?
-        """, (
-            instrument_token,
-            interval,
-            from_date.isoformat(),
-            to_date.isoformat()
-        ))
-        row = cursor.fetchone()
-        if row:
-            return pd.read_json(row[0])
-    except sqlite3.Error as e:
-        print(f"Error loading data from cache: {e}")
-    finally:
-        conn.close()
+        store = CandleStore(CACHE_DB, CACHE_DIR)
+        if not store.missing(instrument_token, interval, from_date, to_date):
+            return store.get(instrument_token, interval, from_date, to_date)
+    except (sqlite3.Error, OSError) as e:
+        log.error(f"Error loading data from cache: {e}")
     return None
@@ -0,0 +1,383 @@
+"""
+Indicators declared as a graph of primitives, with shared parts computed once.
+
+An indicator is an expression of a few primitives: `shift`, rolling mean, std, min and max,
+exponentially weighted means and arithmetic. Expressions are identified by their structure,
+so `sma(close, 20)` and the middle Bollinger band, or the EMAs of MACD and an `ema(close, 12)`,
+are the same node and computed once however many indicators use them.
+
+    #!python
+    close, high, low = column("close"), column("high"), column("low")
+    pipeline = Pipeline(dict(
+        sma20=sma(close, 20),
+        rsi=rsi(close, 14),
+        atr=atr(high, low, close, 14),
+        **bollinger_bands(close, 20),
+        **macd(close),
+    ))
+
+    df = pipeline.run(candles)        # Batch, a column per output
+    stream = pipeline.stream()
+    for bar in bars:                  # Streaming, constant work per bar
+        values = stream.update(bar)
+
+Batch results are identical to the `kiteconnect.technical_indicators` functions and streaming
+ones match them like `kiteconnect.streaming_indicators`, which the streaming mode builds on.
+Streaming assumes input values are never NaN.
+"""
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from kiteconnect.streaming_indicators import NAN, SMA, _RollingExtreme, _RollingMoments, _divide
+
+
+class Node(object):
+    """An expression of the graph. Nodes with the same `key` compute the same values."""
+
+    __slots__ = ("op", "inputs", "params", "key")
+
+    def __init__(self, op: str, inputs: Sequence["Node"] = (), params: Tuple[Any, ...] = ()) -> None:
+        self.op = op
+        self.inputs = tuple(inputs)
+        self.params = params
+        self.key = (op, params, tuple(node.key for node in self.inputs))  # type: Tuple[Any, ...]
+
+    def __repr__(self) -> str:
+        return "Node({!r})".format(self.key)
+
+    def __add__(self, other: "Operand") -> "Node":
+        return Node("add", (self, _node(other)))
+
+    def __radd__(self, other: "Operand") -> "Node":
+        return Node("add", (_node(other), self))
+
+    def __sub__(self, other: "Operand") -> "Node":
+        return Node("sub", (self, _node(other)))
+
+    def __rsub__(self, other: "Operand") -> "Node":
+        return Node("sub", (_node(other), self))
+
+    def __mul__(self, other: "Operand") -> "Node":
+        return Node("mul", (self, _node(other)))
+
+    def __rmul__(self, other: "Operand") -> "Node":
+        return Node("mul", (_node(other), self))
+
+    def __truediv__(self, other: "Operand") -> "Node":
+        return Node("div", (self, _node(other)))
+
+    def __rtruediv__(self, other: "Operand") -> "Node":
+        return Node("div", (_node(other), self))
+
+    def __neg__(self) -> "Node":
+        return Node("neg", (self,))
+
+    def __abs__(self) -> "Node":
+        return Node("abs", (self,))
+
+
+Operand = Union[Node, float]
+
+
+def _node(value: Operand) -> Node:
+    return value if isinstance(value, Node) else Node("const", params=(float(value),))
+
+
+# ----------------------------------------------------------------
+# Primitives
+# ----------------------------------------------------------------
+def column(name: str) -> Node:
+    """A column of the input, eg: "close"."""
+    return Node("column", params=(name,))
+
+
+def shift(x: Node) -> Node:
+    """The previous value."""
+    return Node("shift", (x,))
+
+
+def diff(x: Node) -> Node:
+    """Change from the previous value."""
+    return x - shift(x)
+
+
+def positive(x: Node) -> Node:
+    """The value where it's positive, else 0, like `x.where(x > 0, 0)`."""
+    return Node("positive", (x,))
+
+
+def maximum(*xs: Node) -> Node:
+    """Largest of the values, skipping NaN."""
+    return Node("max", xs)
+
+
+def rolling_mean(x: Node, window: int) -> Node:
+    return Node("rolling_mean", (x,), (window,))
+
+
+def rolling_std(x: Node, window: int) -> Node:
+    """Rolling sample standard deviation."""
+    return Node("rolling_std", (x,), (window,))
+
+
+def rolling_min(x: Node, window: int) -> Node:
+    return Node("rolling_min", (x,), (window,))
+
+
+def rolling_max(x: Node, window: int) -> Node:
+    return Node("rolling_max", (x,), (window,))
+
+
+def ewm(x: Node, com: Optional[float] = None, span: Optional[float] = None, adjust: bool = True,
+        min_periods: int = 0) -> Node:
+    """Exponentially weighted mean with pandas' `ewm(...).mean()` semantics. Takes one of `com` and `span`."""
+    _ewm_alpha(com, span)
+    return Node("ewm", (x,), (com, span, adjust, min_periods))
+
+
+def _ewm_alpha(com: Optional[float], span: Optional[float]) -> float:
+    if com is not None and span is None:
+        if com < 0:
+            raise ValueError("com must be at least 0")
+        return 1 / (1 + com)
+    if span is not None and com is None:
+        if span < 1:
+            raise ValueError("span must be at least 1")
+        return 2 / (span + 1)
+    raise ValueError("Pass exactly one of com and span")
+
+
+# ----------------------------------------------------------------
+# Indicators, as in `kiteconnect.technical_indicators`
+# ----------------------------------------------------------------
+def sma(x: Node, window: int) -> Node:
+    return rolling_mean(x, window)
+
+
+def ema(x: Node, span: int) -> Node:
+    return ewm(x, span=span, adjust=False)
+
+
+def rsi(x: Node, window: int = 14) -> Node:
+    delta = diff(x)
+    avg_gain = ewm(positive(delta), com=window - 1, min_periods=window)
+    avg_loss = ewm(positive(-delta), com=window - 1, min_periods=window)
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def macd(x: Node, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, Node]:
+    line = ema(x, fast_period) - ema(x, slow_period)
+    signal_line = ema(line, signal_period)
+    return {"MACD": line, "Signal_Line": signal_line, "Histogram": line - signal_line}
+
+
+def bollinger_bands(x: Node, window: int = 20, num_std_dev: float = 2) -> Dict[str, Node]:
+    middle_band = rolling_mean(x, window)
+    std_dev = rolling_std(x, window)
+    return {
+        "Middle_Band": middle_band,
+        "Upper_Band": middle_band + (std_dev * num_std_dev),
+        "Lower_Band": middle_band - (std_dev * num_std_dev),
+    }
+
+
+def stochastic_oscillator(high: Node, low: Node, close: Node, k_period: int = 14,
+                          d_period: int = 3) -> Dict[str, Node]:
+    lowest_low = rolling_min(low, k_period)
+    highest_high = rolling_max(high, k_period)
+    k_percent = ((close - lowest_low) / (highest_high - lowest_low)) * 100
+    return {"K_Percent": k_percent, "D_Percent": rolling_mean(k_percent, d_period)}
+
+
+def atr(high: Node, low: Node, close: Node, window: int = 14) -> Node:
+    previous_close = shift(close)
+    true_range = maximum(high - low, abs(high - previous_close), abs(low - previous_close))
+    return ewm(true_range, com=window - 1, min_periods=window)
+
+
+# ----------------------------------------------------------------
+# Batch evaluation
+# ----------------------------------------------------------------
+def _batch_ewm(x: pd.Series, com: Optional[float], span: Optional[float], adjust: bool,
+               min_periods: int) -> pd.Series:
+    return x.ewm(com=com, span=span, adjust=adjust, min_periods=min_periods).mean()
+
+
+_BATCH = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+    "div": lambda a, b: a / b,
+    "neg": lambda a: -a,
+    "abs": lambda a: abs(a),
+    "shift": lambda a: a.shift(),
+    "positive": lambda a: a.where(a > 0, 0),
+    "max": lambda *xs: pd.concat(xs, axis=1).max(axis=1),
+    "rolling_mean": lambda a, window: a.rolling(window=window).mean(),
+    "rolling_std": lambda a, window: a.rolling(window=window).std(),
+    "rolling_min": lambda a, window: a.rolling(window=window).min(),
+    "rolling_max": lambda a, window: a.rolling(window=window).max(),
+    "ewm": _batch_ewm,
+}  # type: Dict[str, Callable[..., Any]]
+
+
+# ----------------------------------------------------------------
+# Streaming evaluation
+# ----------------------------------------------------------------
+class _Shift(object):
+    def __init__(self) -> None:
+        self.last = NAN
+
+    def update(self, value: float) -> float:
+        previous, self.last = self.last, value
+        return previous
+
+
+class _RollingStd(object):
+    def __init__(self, window: int) -> None:
+        self.moments = _RollingMoments(window)
+
+    def update(self, value: float) -> float:
+        self.moments.update(value)
+        return self.moments.std
+
+
+class _Extreme(object):
+    def __init__(self, window: int, maximum: bool) -> None:
+        self.extreme = _RollingExtreme(window, maximum)
+
+    def update(self, value: float) -> float:
+        return self.extreme.update(value)
+
+
+class _EWM(object):
+    """Streaming `ewm(com=..., span=..., adjust=..., min_periods=...).mean()`."""
+
+    def __init__(self, com: Optional[float], span: Optional[float], adjust: bool, min_periods: int) -> None:
+        alpha = _ewm_alpha(com, span)
+        self.decay = 1 - alpha
+        self.alpha = alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        self.count += 1
+        if self.adjust:
+            self.numerator = value + self.decay * self.numerator
+            self.denominator = 1 + self.decay * self.denominator
+            mean = self.numerator / self.denominator
+        elif self.count == 1:
+            mean = self.numerator = value
+        else:
+            mean = self.numerator = self.alpha * value + self.decay * self.numerator
+        return mean if self.count >= self.min_periods else NAN
+
+
+def _fmax(*xs: float) -> float:
+    values = [x for x in xs if x == x]
+    return max(values) if values else NAN
+
+
+_STATELESS = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+    "div": _divide,
+    "neg": lambda a: -a,
+    "abs": abs,
+    "positive": lambda a: a if a > 0 else 0.0,
+    "max": _fmax,
+}  # type: Dict[str, Callable[..., float]]
+
+_STATEFUL = {
+    "shift": lambda: _Shift(),
+    "rolling_mean": lambda window: SMA(window),
+    "rolling_std": lambda window: _RollingStd(window),
+    "rolling_min": lambda window: _Extreme(window, maximum=False),
+    "rolling_max": lambda window: _Extreme(window, maximum=True),
+    "ewm": lambda com, span, adjust, min_periods: _EWM(com, span, adjust, min_periods),
+}  # type: Dict[str, Callable[..., Any]]
+
+
+class Stream(object):
+    """Streaming state of a `Pipeline`, updated with one bar at a time."""
+
+    def __init__(self, pipeline: "Pipeline") -> None:
+        self.pipeline = pipeline
+        self.values = [NAN] * len(pipeline.nodes)
+        self._steps = []  # type: List[Tuple[str, Any, Tuple[Any, ...], Tuple[int, ...]]]
+        for node, inputs in zip(pipeline.nodes, pipeline._inputs):
+            if node.op in ("column", "const"):
+                self._steps.append((node.op, None, node.params, inputs))
+            elif node.op in _STATEFUL:
+                self._steps.append(("update", _STATEFUL[node.op](*node.params).update, (), inputs))
+            else:
+                self._steps.append(("call", _STATELESS[node.op], (), inputs))
+
+    def update(self, bar: Mapping[str, float]) -> Dict[str, float]:
+        """Add a bar, a mapping of the input columns, and return the latest value of each output."""
+        values = self.values
+        for i, (kind, func, params, inputs) in enumerate(self._steps):
+            if kind == "column":
+                values[i] = float(bar[params[0]])
+            elif kind == "const":
+                values[i] = params[0]
+            else:
+                values[i] = func(*[values[j] for j in inputs])
+        return dict((name, values[i]) for name, i in self.pipeline._outputs.items())
+
+
+# ----------------------------------------------------------------
+# Pipeline
+# ----------------------------------------------------------------
+class Pipeline(object):
+    """
+    Named indicator expressions compiled to a graph of unique nodes, in dependency order.
+
+    :param outputs: The expressions to compute, by output name.
+    """
+
+    def __init__(self, outputs: Mapping[str, Operand]) -> None:
+        self.nodes = []  # type: List[Node]
+        self._index = {}  # type: Dict[Tuple[Any, ...], int]
+        self._inputs = []  # type: List[Tuple[int, ...]]
+        self._outputs = dict((name, self._add(_node(expr))) for name, expr in outputs.items())
+
+    def _add(self, node: Node) -> int:
+        index = self._index.get(node.key)
+        if index is None:
+            inputs = tuple(self._add(child) for child in node.inputs)
+            index = self._index[node.key] = len(self.nodes)
+            self.nodes.append(node)
+            self._inputs.append(inputs)
+        return index
+
+    @property
+    def columns(self) -> List[str]:
+        """Input columns the pipeline reads."""
+        return [node.params[0] for node in self.nodes if node.op == "column"]
+
+    def run(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Compute every output over the whole of `df`, each node once. Returns a column per output."""
+        values = []  # type: List[Any]
+        for node, inputs in zip(self.nodes, self._inputs):
+            if node.op == "column":
+                values.append(df[node.params[0]])
+            elif node.op == "const":
+                values.append(node.params[0])
+            else:
+                values.append(_BATCH[node.op](*([values[j] for j in inputs] + list(node.params))))
+
+        result = {}  # type: Dict[str, pd.Series]
+        for name, i in self._outputs.items():
+            value = values[i]
+            result[name] = value if isinstance(value, pd.Series) else pd.Series(value, index=df.index)
+        return pd.DataFrame(result, index=df.index)
+
+    def stream(self) -> Stream:
+        """New streaming state, see `Stream.update`."""
+        return Stream(self)
@@ -0,0 +1,158 @@
+"""
+Technical indicators for many instruments at once.
+
+The functions take 2D arrays of instruments x time, eg: the closes of a universe on a common
+time grid with NaN where an instrument has no candle, and compute the indicator for every
+instrument in one vectorized pass along the time axis. Each row of the result is what the
+full series function of `kiteconnect.technical_indicators` returns for that instrument.
+
+    #!python
+    tokens, index, close = to_matrix(candles, "close")  # {token: DataFrame} from historical data
+    rsi = matrix_indicators.rsi(close, 14)
+    latest = dict(zip(tokens, rsi[:, -1]))
+"""
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+Matrix = np.ndarray
+
+
+def _frame(values: Any) -> pd.DataFrame:
+    """Time x instruments frame of an instruments x time matrix, so pandas works down the columns."""
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[np.newaxis, :]
+    return pd.DataFrame(values.T)
+
+
+def _matrix(df: pd.DataFrame) -> Matrix:
+    return df.to_numpy().T
+
+
+def to_matrix(frames: Dict[Any, pd.DataFrame], column: str = "close") -> Tuple[List[Any], pd.Index, Matrix]:
+    """
+    Align a column of per instrument DataFrames, eg: from `get_historical_data_dataframe`, on
+    the union of their indexes.
+
+    :param frames: DataFrames indexed by date, keyed by instrument.
+    :param column: The column to take (default: 'close').
+    :return: The instruments, the time index and an instruments x time matrix, NaN where an instrument has no row.
+    """
+    keys = list(frames)
+    df = pd.concat([frames[key][column] for key in keys], axis=1, keys=range(len(keys)))
+    return keys, df.index, _matrix(df)
+
+
+def sma(values: Matrix, window: int) -> Matrix:
+    """
+    Simple Moving Average of every instrument.
+
+    :param values: Instruments x time matrix.
+    :param window: The rolling window for SMA calculation.
+    """
+    return _matrix(_frame(values).rolling(window=window).mean())
+
+
+def ema(values: Matrix, span: int) -> Matrix:
+    """
+    Exponential Moving Average of every instrument, as used by MACD.
+
+    :param values: Instruments x time matrix.
+    :param span: The EMA period.
+    """
+    return _matrix(_frame(values).ewm(span=span, adjust=False).mean())
+
+
+def rsi(values: Matrix, window: int = 14) -> Matrix:
+    """
+    Relative Strength Index of every instrument.
+
+    :param values: Instruments x time matrix.
+    :param window: The rolling window for RSI calculation (default: 14).
+    """
+    df = _frame(values)
+    delta = df.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+
+    avg_gain = gain.ewm(com=window - 1, min_periods=window).mean()
+    avg_loss = loss.ewm(com=window - 1, min_periods=window).mean()
+    return _matrix(100 - (100 / (1 + avg_gain / avg_loss)))
+
+
+def macd(values: Matrix, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, Matrix]:
+    """
+    Moving Average Convergence Divergence of every instrument.
+
+    :param values: Instruments x time matrix.
+    :param fast_period: The period for the fast EMA (default: 12).
+    :param slow_period: The period for the slow EMA (default: 26).
+    :param signal_period: The period for the signal line EMA (default: 9).
+    :return: A dictionary of MACD, Signal_Line and Histogram matrices.
+    """
+    df = _frame(values)
+    line = df.ewm(span=fast_period, adjust=False).mean() - df.ewm(span=slow_period, adjust=False).mean()
+    signal_line = line.ewm(span=signal_period, adjust=False).mean()
+    return {
+        "MACD": _matrix(line),
+        "Signal_Line": _matrix(signal_line),
+        "Histogram": _matrix(line - signal_line),
+    }
+
+
+def bollinger_bands(values: Matrix, window: int = 20, num_std_dev: float = 2) -> Dict[str, Matrix]:
+    """
+    Bollinger Bands of every instrument.
+
+    :param values: Instruments x time matrix.
+    :param window: The rolling window for the moving average (default: 20).
+    :param num_std_dev: The number of standard deviations for the upper and lower bands (default: 2).
+    :return: A dictionary of Middle_Band, Upper_Band and Lower_Band matrices.
+    """
+    rolling = _frame(values).rolling(window=window)
+    middle_band = _matrix(rolling.mean())
+    std_dev = _matrix(rolling.std())
+    return {
+        "Middle_Band": middle_band,
+        "Upper_Band": middle_band + std_dev * num_std_dev,
+        "Lower_Band": middle_band - std_dev * num_std_dev,
+    }
+
+
+def stochastic_oscillator(high: Matrix, low: Matrix, close: Matrix, k_period: int = 14,
+                          d_period: int = 3) -> Dict[str, Matrix]:
+    """
+    Stochastic Oscillator (%K and %D) of every instrument.
+
+    :param high: Instruments x time matrix of highs.
+    :param low: Instruments x time matrix of lows.
+    :param close: Instruments x time matrix of closes.
+    :param k_period: The period for %K calculation (default: 14).
+    :param d_period: The period for %D (SMA of %K) calculation (default: 3).
+    :return: A dictionary of K_Percent and D_Percent matrices.
+    """
+    lowest_low = _frame(low).rolling(window=k_period).min()
+    highest_high = _frame(high).rolling(window=k_period).max()
+
+    k_percent = ((_frame(close) - lowest_low) / (highest_high - lowest_low)) * 100
+    d_percent = k_percent.rolling(window=d_period).mean()
+    return {"K_Percent": _matrix(k_percent), "D_Percent": _matrix(d_percent)}
+
+
+def atr(high: Matrix, low: Matrix, close: Matrix, window: int = 14) -> Matrix:
+    """
+    Average True Range of every instrument.
+
+    :param high: Instruments x time matrix of highs.
+    :param low: Instruments x time matrix of lows.
+    :param close: Instruments x time matrix of closes.
+    :param window: The rolling window for ATR calculation (default: 14).
+    """
+    high, low = _frame(high), _frame(low)
+    previous_close = _frame(close).shift()
+
+    # `fmax` skips NaN like the row-wise max of `calculate_atr`.
+    true_range = np.fmax(high - low, np.fmax((high - previous_close).abs(), (low - previous_close).abs()))
+    return _matrix(true_range.ewm(com=window - 1, min_periods=window).mean())
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+    mock_server.py
+
+    Self-contained local HTTP server which mimics the Kite Connect REST API.
+
+    Every route in `KiteConnect._routes` is served from the canned JSON and CSV
+    responses in a directory, eg: the `tests/mock_responses` directory of a source
+    checkout, which is not installed with the package. Latency, server errors and `429 Too many requests` can be
+    injected to load test clients, caches and rate limiters without touching the
+    real API.
+
+        #!python
+        with MockKiteServer("tests/mock_responses", latency=0.005, error_rate=0.01,
+                            rate_limits={"default": 10}) as server:
+            kite = KiteConnect(api_key="key", access_token="token", root=server.root)
+            kite.holdings()
+
+        print(server.stats)
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import os
+import re
+import time
+import random
+import logging
+import itertools
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Pattern, Tuple, Union
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from six.moves.urllib.parse import urlsplit
+
+from kiteconnect.connect import KiteConnect
+from kiteconnect.utils import codec
+from kiteconnect.utils.network import RateLimiter
+
+log = logging.getLogger(__name__)
+
+# HTTP method and response file of each route. Routes without a file get a generated response.
+ROUTES = {
+    "api.token": ("POST", None),
+    "api.token.invalidate": ("DELETE", None),
+    "api.token.renew": ("POST", None),
+    "user.profile": ("GET", "profile.json"),
+    "user.margins": ("GET", "margins.json"),
+    "user.margins.segment": ("GET", "margins.json"),
+
+    "orders": ("GET", "orders.json"),
+    "trades": ("GET", "trades.json"),
+    "order.info": ("GET", "order_info.json"),
+    "order.place": ("POST", None),
+    "order.modify": ("PUT", None),
+    "order.cancel": ("DELETE", None),
+    "order.trades": ("GET", "order_trades.json"),
+
+    "portfolio.positions": ("GET", "positions.json"),
+    "portfolio.holdings": ("GET", "holdings.json"),
+    "portfolio.holdings.auction": ("GET", "auctions_list.json"),
+    "portfolio.positions.convert": ("PUT", None),
+
+    "mf.orders": ("GET", "mf_orders.json"),
+    "mf.order.info": ("GET", "mf_orders_info.json"),
+    "mf.order.place": ("POST", None),
+    "mf.order.cancel": ("DELETE", None),
+    "mf.sips": ("GET", "mf_sips.json"),
+    "mf.sip.info": ("GET", "mf_sip_info.json"),
+    "mf.sip.place": ("POST", None),
+    "mf.sip.modify": ("PUT", None),
+    "mf.sip.cancel": ("DELETE", None),
+    "mf.holdings": ("GET", "mf_holdings.json"),
+    "mf.instruments": ("GET", "mf_instruments.csv"),
+
+    "market.instruments.all": ("GET", "instruments_all.csv"),
+    "market.instruments": ("GET", "instruments_nse.csv"),
+    "market.historical": ("GET", "historical_minute.json"),
+    "market.trigger_range": ("GET", "trigger_range.json"),
+    "market.quote": ("GET", "quote.json"),
+    "market.quote.ohlc": ("GET", "ohlc.json"),
+    "market.quote.ltp": ("GET", "ltp.json"),
+
+    "gtt": ("GET", "gtt_get_orders.json"),
+    "gtt.place": ("POST", "gtt_place_order.json"),
+    "gtt.info": ("GET", "gtt_get_order.json"),
+    "gtt.modify": ("PUT", "gtt_modify_order.json"),
+    "gtt.delete": ("DELETE", "gtt_delete_order.json"),
+
+    "order.margins": ("POST", "order_margins.json"),
+    "order.margins.basket": ("POST", "basket_margins.json"),
+    "order.contract_note": ("POST", "virtual_contract_note.json"),
+}
+
+# A response: (status, content type, body).
+Response = Tuple[int, str, bytes]
+
+
+def _error(status: int, error_type: str, message: str) -> Response:
+    body = codec.dumps({"status": "error", "error_type": error_type, "message": message, "data": None})
+    return status, "application/json", body.encode("utf-8")
+
+
+def _success(data: Any) -> Response:
+    return 200, "application/json", codec.dumps({"status": "success", "data": data}).encode("utf-8")
+
+
+class MockKiteServer(object):
+    """
+    Local Kite Connect REST API server.
+
+    - `responses_dir` with the canned responses, named as in `ROUTES`.
+    - `host` and `port` to listen on. Port 0 picks a free port.
+    - `latency` added to every response in seconds, either a number or a `(min, max)` range.
+    - `error_rate` probability of answering with a `500 GeneralException`.
+    - `throttle_rate` probability of answering with a `429 NetworkException`.
+    - `rate_limits` maps route names to the requests per second allowed, like the real API.
+    Requests over the limit get a `429`. Use the key `default` for all other routes.
+    - `seed` for the random fault injection, to make runs reproducible.
+
+    Per route and status request counts are available in `stats`.
+    """
+
+    def __init__(
+        self,
+        responses_dir: str,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Union[float, Tuple[float, float]] = 0,
+        error_rate: float = 0,
+        throttle_rate: float = 0,
+        rate_limits: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.responses_dir = responses_dir
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limits = dict(rate_limits or {})
+
+        self.stats = Counter()  # type: Counter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(100000000000001)
+        self._limiters = dict((route, RateLimiter(rate)) for route, rate in self.rate_limits.items())
+        self._routes = self._compile_routes()
+        self._bodies = {}  # type: Dict[str, bytes]
+        self._server = None  # type: Optional[ThreadingHTTPServer]
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def __enter__(self) -> "MockKiteServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.stop()
+
+    @property
+    def root(self) -> str:
+        """Root URL to pass to `KiteConnect(root=...)`."""
+        return "http://{}:{}".format(self.host, self.port)
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the root URL."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+
+                status, content_type, body = server.handle(self.command, self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format: str, *args: Any) -> None:
+                log.debug(format % args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="MockKiteServer")
+        self._thread.daemon = True
+        self._thread.start()
+        return self.root
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ----------------------------------------------------------------
+    # Request handling
+    # ----------------------------------------------------------------
+    def handle(self, method: str, path: str) -> Response:
+        """Return the response for a request. Fault injection is applied here."""
+        route = self.match(method, urlsplit(path).path)
+        response = self._respond(method, route)
+
+        with self._lock:
+            self.stats[(route, response[0])] += 1
+        return response
+
+    def match(self, method: str, path: str) -> Optional[str]:
+        """Return the name of the route matching a request or None."""
+        for route, route_method, pattern in self._routes:
+            if route_method == method and pattern.match(path):
+                return route
+        return None
+
+    def _respond(self, method: str, route: Optional[str]) -> Response:
+        if route is None:
+            return _error(404, "GeneralException", "Route not found")
+
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+        limiter = self._limiters.get(route, self._limiters.get("default"))
+        if limiter is not None and not limiter.try_acquire():
+            return _error(429, "NetworkException", "Too many requests")
+
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return _error(429, "NetworkException", "Too many requests")
+        if roll < self.throttle_rate + self.error_rate:
+            return _error(500, "GeneralException", "Injected server error")
+
+        filename = ROUTES[route][1]
+        if filename is None:
+            return _success(self._generated(route))
+
+        body = self._body(filename)
+        content_type = "text/csv" if filename.endswith(".csv") else "application/json"
+        return 200, content_type, body
+
+    def _body(self, filename: str) -> bytes:
+        body = self._bodies.get(filename)
+        if body is None:
+            with open(os.path.join(self.responses_dir, filename), "rb") as f:
+                body = self._bodies[filename] = f.read()
+        return body
+
+    def _generated(self, route: str) -> Any:
+        """Response data for write routes which have no canned response."""
+        if route in ("api.token", "api.token.renew"):
+            profile = codec.loads(self._body("profile.json"))["data"]
+            profile.update({"access_token": "mock_access_token", "refresh_token": "mock_refresh_token",
+                            "public_token": "mock_public_token", "login_time": time.strftime("%Y-%m-%d %H:%M:%S")})
+            return profile
+        if route.startswith("order.") or route.startswith("mf.order."):
+            return {"order_id": str(next(self._ids))}
+        if route.startswith("mf.sip."):
+            return {"sip_id": str(next(self._ids))}
+        return True
+
+    @staticmethod
+    def _compile_routes() -> List[Tuple[str, str, Pattern]]:
+        routes = []
+        for route, uri in KiteConnect._routes.items():
+            if route not in ROUTES:
+                continue
+            pattern = re.compile("^" + re.sub(r"\{\w+\}", "[^/]+", uri) + "$")
+            routes.append((route, ROUTES[route][0], pattern))
+        return routes
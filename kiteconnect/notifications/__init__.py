@@ -1,5 +1,7 @@
 from .email import send_email
+from .telegram import send_telegram_message
 
 __all__ = [
     "send_email",
+    "send_telegram_message",
 ]
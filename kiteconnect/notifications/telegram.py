@@ -1,5 +1,10 @@
+import logging
+
 import requests
 
+log = logging.getLogger(__name__)
+
+
 def send_telegram_message(bot_token: str, chat_id: str, message: str) -> bool:
     """
     Sends a message to a Telegram chat via a bot.
@@ -20,5 +25,5 @@ def send_telegram_message(bot_token: str, chat_id: str, message: str) -> bool:
         response.raise_for_status()  # Raise an exception for HTTP errors
         return response.json()["ok"]
     except requests.exceptions.RequestException as e:
-        print(f"Error sending Telegram message: {e}")
+        log.error(f"Error sending Telegram message: {e}")
         return False
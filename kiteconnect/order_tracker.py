@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+    order_tracker.py
+
+    In-memory order book driven by websocket order updates.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import kiteconnect.exceptions as ex
+
+log = logging.getLogger(__name__)
+
+
+class OrderTracker(object):
+    """
+    Track the state of orders from `KiteTicker` order updates.
+
+    The tracker keeps an order book keyed by `order_id` which is updated by the
+    postbacks pushed on the websocket, so that waiting for a fill doesn't need
+    polling `orders()` or `order_history()`.
+
+    - When the websocket (re)connects the order book is reconciled with a single `orders()` call
+    so that updates missed while disconnected are picked up. The call is made from a worker
+    thread rather than the ticker's callback thread.
+    - While the websocket is down and someone is waiting on an order, `orders()` is polled with
+    an adaptive interval which starts at `poll_interval` and backs off up to `max_poll_interval`
+    as long as nothing changes.
+
+        #!python
+        kite = KiteConnect(api_key, access_token=access_token)
+        kws = KiteTicker(api_key, access_token)
+
+        tracker = OrderTracker(kite)
+        tracker.attach(kws)
+        kws.connect(threaded=True)
+
+        order_id = kite.place_order(...)
+        order = tracker.wait_for(order_id, kite.STATUS_COMPLETE, timeout=10).result()
+    """
+
+    # Statuses after which an order never changes.
+    TERMINAL_STATUSES = ("COMPLETE", "REJECTED", "CANCELLED")
+
+    def __init__(
+        self,
+        kite: Any,
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 10.0,
+        poll_backoff: float = 2.0,
+    ) -> None:
+        """
+        Initialise the tracker.
+
+        - `kite` is an authenticated `KiteConnect` instance used for reconciliation and fallback polling.
+        - `poll_interval` is the initial polling interval in seconds while the websocket is down.
+        - `max_poll_interval` is the upper bound for the polling interval.
+        - `poll_backoff` is the multiplier applied to the interval after a poll with no changes.
+        """
+        self.kite = kite
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.poll_backoff = poll_backoff
+
+        self.orders = {}  # type: Dict[str, Dict[str, Any]]
+        self.connected = False
+
+        self._lock = threading.RLock()
+        self._waiters = {}  # type: Dict[str, List[Tuple[Optional[Tuple[str, ...]], Future]]]
+        self._poller = None  # type: Optional[threading.Thread]
+        self._reconciler = None  # type: Optional[threading.Thread]
+        self._stop = threading.Event()
+        self._ticker_callbacks = {}  # type: Dict[str, Any]
+
+    # ----------------------------------------------------------------
+    # Ticker hooks
+    # ----------------------------------------------------------------
+    def attach(self, ticker: Any) -> None:
+        """
+        Hook the tracker to a `KiteTicker`. Callbacks already set on the ticker keep working
+        and are called after the tracker has processed the event.
+        """
+        hooks = {
+            "on_order_update": self._on_order_update,
+            "on_connect": self._on_connect,
+            "on_close": self._on_close,
+            "on_noreconnect": self._on_noreconnect,
+        }
+
+        for name, hook in hooks.items():
+            self._ticker_callbacks[name] = getattr(ticker, name, None)
+            setattr(ticker, name, hook)
+
+        self.connected = bool(getattr(ticker, "is_connected", lambda: False)())
+
+    def _chain(self, name: str, *args: Any) -> None:
+        callback = self._ticker_callbacks.get(name)
+        if callback:
+            callback(*args)
+
+    def _on_order_update(self, ws: Any, data: Dict[str, Any]) -> None:
+        self.update(data)
+        self._chain("on_order_update", ws, data)
+
+    def _on_connect(self, ws: Any, response: Any) -> None:
+        self.connected = True
+        # Off the ticker's thread, which would otherwise block on the REST call.
+        self._reconciler = threading.Thread(target=self._reconcile_on_connect, name="OrderTrackerReconciler")
+        self._reconciler.daemon = True
+        self._reconciler.start()
+        self._chain("on_connect", ws, response)
+
+    def _reconcile_on_connect(self) -> None:
+        try:
+            self.reconcile()
+        except Exception as e:
+            log.error("Order book reconciliation failed: {}".format(e))
+            self._ensure_polling()
+
+    def _on_close(self, ws: Any, code: int, reason: Any) -> None:
+        self.connected = False
+        self._ensure_polling()
+        self._chain("on_close", ws, code, reason)
+
+    def _on_noreconnect(self, ws: Any) -> None:
+        self.connected = False
+        self._ensure_polling()
+        self._chain("on_noreconnect", ws)
+
+    # ----------------------------------------------------------------
+    # Order book
+    # ----------------------------------------------------------------
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Return the last known state of an order or None if it hasn't been seen yet."""
+        with self._lock:
+            return self.orders.get(order_id)
+
+    def update(self, order: Dict[str, Any]) -> bool:
+        """
+        Apply an order update (a websocket postback or a row from `orders()`).
+        Returns True if the order book changed.
+
+        Stale updates are ignored: an order in a terminal status is never moved
+        back to an open one and the filled quantity never goes down.
+        """
+        order_id = order.get("order_id")
+        if not order_id:
+            return False
+
+        with self._lock:
+            current = self.orders.get(order_id)
+            if current is not None:
+                if current.get("status") in self.TERMINAL_STATUSES and order.get("status") not in self.TERMINAL_STATUSES:
+                    return False
+                if (order.get("filled_quantity") or 0) < (current.get("filled_quantity") or 0):
+                    return False
+                if all(current.get(k) == v for k, v in order.items()):
+                    return False
+
+                merged = dict(current)
+                merged.update(order)
+                order = merged
+
+            self.orders[order_id] = order
+            self._notify(order)
+            return True
+
+    def reconcile(self) -> int:
+        """
+        Sync the order book with a single `orders()` call.
+        Returns the number of orders that changed.
+        """
+        changed = 0
+        for order in self.kite.orders():
+            if self.update(order):
+                changed += 1
+
+        if changed:
+            log.debug("Reconciled {} orders.".format(changed))
+        return changed
+
+    # ----------------------------------------------------------------
+    # Waiting
+    # ----------------------------------------------------------------
+    def wait_for(
+        self,
+        order_id: str,
+        status: Optional[Union[str, Iterable[str]]] = None,
+        timeout: Optional[float] = None,
+    ) -> "Future[Dict[str, Any]]":
+        """
+        Return a `concurrent.futures.Future` which resolves to the order once it reaches `status`.
+
+        - `status` is a status or a list of statuses to wait for. Defaults to any terminal status.
+        - `timeout` in seconds after which the future fails with `concurrent.futures.TimeoutError`.
+
+        If the order reaches a terminal status other than the ones waited for (eg: it is
+        rejected while waiting for `COMPLETE`), the future fails with `OrderException`.
+        """
+        if isinstance(status, str):
+            statuses = (status,)  # type: Optional[Tuple[str, ...]]
+        else:
+            statuses = tuple(status) if status is not None else None
+
+        future = Future()  # type: Future
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None or not self._resolve(future, statuses, order):
+                self._waiters.setdefault(order_id, []).append((statuses, future))
+
+        if future.done():
+            return future
+
+        if timeout is not None:
+            timer = threading.Timer(timeout, self._expire, args=(order_id, future, timeout))
+            timer.daemon = True
+            timer.start()
+            future.add_done_callback(lambda _: timer.cancel())
+
+        self._ensure_polling()
+        return future
+
+    async def wait_for_async(
+        self,
+        order_id: str,
+        status: Optional[Union[str, Iterable[str]]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Asyncio version of `wait_for()`. Returns the order or raises like `wait_for().result()`."""
+        return await asyncio.wrap_future(self.wait_for(order_id, status, timeout))
+
+    def _resolve(self, future: Future, statuses: Optional[Tuple[str, ...]], order: Dict[str, Any]) -> bool:
+        """Resolve `future` if `order` satisfies it. Returns True if the future is done."""
+        status = order.get("status")
+        if (statuses is None and status in self.TERMINAL_STATUSES) or (statuses is not None and status in statuses):
+            future.set_result(order)
+            return True
+
+        if status in self.TERMINAL_STATUSES:
+            future.set_exception(ex.OrderException(
+                "Order {} is {}: {}".format(order["order_id"], status, order.get("status_message") or "")))
+            return True
+
+        return False
+
+    def _notify(self, order: Dict[str, Any]) -> None:
+        waiters = self._waiters.get(order["order_id"])
+        if not waiters:
+            return
+
+        pending = [(statuses, future) for statuses, future in waiters
+                   if not future.done() and not self._resolve(future, statuses, order)]
+        if pending:
+            self._waiters[order["order_id"]] = pending
+        else:
+            del self._waiters[order["order_id"]]
+
+    def _expire(self, order_id: str, future: Future, timeout: float) -> None:
+        with self._lock:
+            waiters = self._waiters.get(order_id, [])
+            self._waiters[order_id] = [w for w in waiters if w[1] is not future]
+            if not self._waiters[order_id]:
+                del self._waiters[order_id]
+
+            # Under the lock, like the updates resolving the future.
+            if not future.done():
+                try:
+                    future.set_exception(TimeoutError(
+                        "Timed out after {}s waiting for order {}".format(timeout, order_id)))
+                except InvalidStateError:
+                    # Cancelled by the caller in the meantime.
+                    pass
+
+    # ----------------------------------------------------------------
+    # Fallback polling
+    # ----------------------------------------------------------------
+    def _ensure_polling(self) -> None:
+        """Start the fallback poller if the websocket is down and someone is waiting."""
+        with self._lock:
+            if self.connected or not self._waiters or self._stop.is_set():
+                return
+            if self._poller is not None and self._poller.is_alive():
+                return
+
+            self._poller = threading.Thread(target=self._poll, name="OrderTrackerPoller")
+            self._poller.daemon = True
+            self._poller.start()
+
+    def _poll(self) -> None:
+        interval = self.poll_interval
+        while not self._stop.wait(interval):
+            with self._lock:
+                if self.connected or not self._waiters:
+                    self._poller = None
+                    return
+
+            try:
+                changed = self.reconcile()
+            except Exception as e:
+                log.warning("Order book poll failed: {}".format(e))
+                changed = 0
+
+            interval = self.poll_interval if changed else min(interval * self.poll_backoff, self.max_poll_interval)
+
+    def close(self) -> None:
+        """Stop fallback polling and wait for a running reconciliation."""
+        self._stop.set()
+        for thread in (self._poller, self._reconciler):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join()
@@ -1,17 +1,27 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from kiteconnect import KiteConnect
+from kiteconnect.error_handling import DataFetchError
+from kiteconnect.position_book import PositionBook
 
 def get_current_portfolio(
-    kite: KiteConnect
+    kite: KiteConnect,
+    position_book: Optional[PositionBook] = None,
 ) -> Dict[str, List[Dict]]:
     """
     Fetches current positions and holdings and calculates their live value.
 
     :param kite: An initialized KiteConnect object.
+    :param position_book: Optional live PositionBook. If given, the portfolio is read from it without any API calls.
     :return: A dictionary containing 'positions' and 'holdings' with live values.
     """
+    if position_book is not None:
+        return {
+            "positions": position_book.get_positions(),
+            "holdings": position_book.get_holdings()
+        }
+
     try:
-        positions = kite.positions()["day"] + kite.positions()["overnight"]
+        positions = kite.positions()["net"]
         holdings = kite.holdings()
     except Exception as e:
         raise DataFetchError("Failed to fetch positions or holdings.", original_exception=e)
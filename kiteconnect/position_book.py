@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+    position_book.py
+
+    Positions and holdings maintained incrementally from order updates and ticks.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Positions are keyed by (exchange, tradingsymbol, product) and holdings by (exchange, tradingsymbol).
+PositionKey = Tuple[str, str, str]
+HoldingKey = Tuple[str, str]
+
+
+class PositionBook(object):
+    """
+    Live positions and holdings without polling.
+
+    The book takes a single `positions()`, `holdings()` and `orders()` snapshot, then
+
+    - applies fills from `KiteTicker` order updates to the net quantity, average price,
+    buy/sell values and realised P&L of the position,
+    - marks positions and holdings to market from `KiteTicker` ticks, and
+    - optionally reconciles against `positions()` every `reconcile_interval` seconds
+    and reports any drift.
+
+    P&L follows the Kite convention `pnl = (sell_value - buy_value) + quantity * last_price * multiplier`.
+
+        #!python
+        book = PositionBook(kite, reconcile_interval=300)
+        book.snapshot()
+        book.attach(kws)
+        kws.connect(threaded=True)
+
+        book.pnl()  # No network calls
+    """
+
+    def __init__(self, kite: Any, reconcile_interval: Optional[float] = None, tolerance: float = 1e-6) -> None:
+        """
+        Initialise the position book.
+
+        - `kite` is an authenticated `KiteConnect` instance used for the snapshot and reconciliation.
+        - `reconcile_interval` in seconds to reconcile against `positions()` in the background. None disables it.
+        - `tolerance` for comparing prices and values when reconciling.
+        """
+        self.kite = kite
+        self.reconcile_interval = reconcile_interval
+        self.tolerance = tolerance
+
+        self.positions = {}  # type: Dict[PositionKey, Dict[str, Any]]
+        self.holdings = {}  # type: Dict[HoldingKey, Dict[str, Any]]
+        self.drift = []  # type: List[Dict[str, Any]]
+
+        self._lock = threading.RLock()
+        # Serializes snapshots and reconciliations, see `_holding_updates`.
+        self._refresh_lock = threading.Lock()
+        # Order updates received while a snapshot is fetched, None otherwise.
+        self._held = None  # type: Optional[List[Dict[str, Any]]]
+        # Cumulative (filled_quantity, average_price) already applied for each order.
+        self._fills = {}  # type: Dict[str, Tuple[int, float]]
+        self._last_prices = {}  # type: Dict[int, float]
+        self._ticker_callbacks = {}  # type: Dict[str, Any]
+        self._stop = threading.Event()
+        self._reconciler = None  # type: Optional[threading.Thread]
+
+    # ----------------------------------------------------------------
+    # Snapshot and reconciliation
+    # ----------------------------------------------------------------
+    def snapshot(self) -> None:
+        """
+        Load positions, holdings and the fills of the day's orders with one call each and start
+        periodic reconciliation if enabled.
+        """
+        with self._holding_updates():
+            orders = self.kite.orders()
+            positions = self.kite.positions()["net"]
+            holdings = self.kite.holdings()
+
+            with self._lock:
+                self._seed_fills(orders)
+                self.positions = dict((self._position_key(p), dict(p)) for p in positions)
+                self.holdings = dict(((h["exchange"], h["tradingsymbol"]), dict(h)) for h in holdings)
+                for item in list(self.positions.values()) + list(self.holdings.values()):
+                    self._mark(item)
+
+        if self.reconcile_interval and self._reconciler is None:
+            self._reconciler = threading.Thread(target=self._reconcile_loop, name="PositionBookReconciler")
+            self._reconciler.daemon = True
+            self._reconciler.start()
+
+    def reconcile(self) -> List[Dict[str, Any]]:
+        """
+        Compare the book with a single `positions()` call and reset it to the broker's state. The
+        fills already applied are reset from a single `orders()` call too.
+
+        Returns the drift found, a list of dicts with the keys `key`, `field`, `local` and `remote`.
+        The last reconciliation's drift is also available as `drift`.
+        """
+        drift = []  # type: List[Dict[str, Any]]
+        with self._holding_updates():
+            orders = self.kite.orders()
+            remote = dict((self._position_key(p), p) for p in self.kite.positions()["net"])
+
+            with self._lock:
+                self._seed_fills(orders)
+                for key in set(self.positions) | set(remote):
+                    local_pos = self.positions.get(key) or {}
+                    remote_pos = remote.get(key) or {}
+                    for field in ("quantity", "average_price", "buy_quantity", "sell_quantity"):
+                        local = local_pos.get(field) or 0
+                        remote_value = remote_pos.get(field) or 0
+                        if abs(local - remote_value) > self.tolerance:
+                            drift.append({"key": key, "field": field, "local": local, "remote": remote_value})
+
+                self.positions = dict((key, dict(p)) for key, p in remote.items())
+                for pos in self.positions.values():
+                    self._mark(pos)
+                self.drift = drift
+
+        if drift:
+            log.warning("Position book drifted from the broker on {} fields: {}".format(len(drift), drift))
+        return drift
+
+    @contextmanager
+    def _holding_updates(self) -> Iterator[None]:
+        """
+        Hold order updates back while the broker's state is fetched and replay them once it's
+        loaded, under the same lock. Updates the fetched orders already include apply nothing,
+        as their fills are taken as applied. The rest are applied to the new state rather than
+        to the one it replaces. On an error the updates are applied to the current state.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                self._held = []
+            try:
+                yield
+            finally:
+                with self._lock:
+                    held, self._held = self._held or [], None
+                    for order in held:
+                        self._apply_order_update(order)
+
+    def _seed_fills(self, orders: List[Dict[str, Any]]) -> None:
+        """
+        Take the fills of `orders` as applied, since the positions loaded with them include them.
+        Otherwise the next update of an order filled in part before would apply its earlier fills again.
+        """
+        self._fills = dict(
+            (order["order_id"], (int(order.get("filled_quantity") or 0), float(order.get("average_price") or 0)))
+            for order in orders if order.get("order_id")
+        )
+
+    def _reconcile_loop(self) -> None:
+        while not self._stop.wait(self.reconcile_interval):
+            try:
+                self.reconcile()
+            except Exception as e:
+                log.warning("Position book reconciliation failed: {}".format(e))
+
+    def close(self) -> None:
+        """Stop periodic reconciliation."""
+        self._stop.set()
+        if self._reconciler is not None and self._reconciler is not threading.current_thread():
+            self._reconciler.join()
+
+    # ----------------------------------------------------------------
+    # Ticker hooks
+    # ----------------------------------------------------------------
+    def attach(self, ticker: Any) -> None:
+        """
+        Hook the book to a `KiteTicker` to receive order updates and ticks. Callbacks already
+        set on the ticker keep working and are called after the book has been updated.
+        """
+        hooks = {"on_order_update": self._on_order_update, "on_ticks": self._on_ticks}
+        for name, hook in hooks.items():
+            self._ticker_callbacks[name] = getattr(ticker, name, None)
+            setattr(ticker, name, hook)
+
+    def _on_order_update(self, ws: Any, data: Dict[str, Any]) -> None:
+        self.apply_order_update(data)
+        callback = self._ticker_callbacks.get("on_order_update")
+        if callback:
+            callback(ws, data)
+
+    def _on_ticks(self, ws: Any, ticks: List[Dict[str, Any]]) -> None:
+        self.apply_ticks(ticks)
+        callback = self._ticker_callbacks.get("on_ticks")
+        if callback:
+            callback(ws, ticks)
+
+    # ----------------------------------------------------------------
+    # Incremental updates
+    # ----------------------------------------------------------------
+    def apply_order_update(self, order: Dict[str, Any]) -> bool:
+        """
+        Apply the new fills of an order update. Updates carry the cumulative `filled_quantity`
+        and `average_price`, so only the delta since the last update of the order is applied.
+        Returns True if a fill was applied. Updates received during a `snapshot` or `reconcile`
+        are applied once it's done, and return False.
+        """
+        with self._lock:
+            if self._held is not None:
+                self._held.append(order)
+                return False
+            return self._apply_order_update(order)
+
+    def _apply_order_update(self, order: Dict[str, Any]) -> bool:
+        filled = int(order.get("filled_quantity") or 0)
+        average_price = float(order.get("average_price") or 0)
+        order_id = order.get("order_id")
+        if order_id is None:
+            return False
+
+        with self._lock:
+            prev_filled, prev_average = self._fills.get(order_id, (0, 0.0))
+            quantity = filled - prev_filled
+            if quantity <= 0:
+                return False
+
+            price = (filled * average_price - prev_filled * prev_average) / quantity
+            self._fills[order_id] = (filled, average_price)
+            self.apply_fill(
+                exchange=order["exchange"],
+                tradingsymbol=order["tradingsymbol"],
+                product=order["product"],
+                transaction_type=order["transaction_type"],
+                quantity=quantity,
+                price=price,
+                instrument_token=order.get("instrument_token"),
+            )
+            return True
+
+    def apply_fill(
+        self,
+        exchange: str,
+        tradingsymbol: str,
+        product: str,
+        transaction_type: str,
+        quantity: int,
+        price: float,
+        instrument_token: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Apply a single fill to the position and return the updated position."""
+        key = (exchange, tradingsymbol, product)
+
+        with self._lock:
+            pos = self.positions.get(key)
+            if pos is None:
+                pos = self.positions[key] = {
+                    "exchange": exchange,
+                    "tradingsymbol": tradingsymbol,
+                    "product": product,
+                    "instrument_token": instrument_token,
+                    "quantity": 0,
+                    "multiplier": 1,
+                    "average_price": 0.0,
+                    "last_price": self._last_prices.get(instrument_token) if instrument_token else None,
+                    "buy_quantity": 0,
+                    "buy_value": 0.0,
+                    "sell_quantity": 0,
+                    "sell_value": 0.0,
+                    "realised": 0.0,
+                }
+
+            multiplier = pos.get("multiplier") or 1
+            held = pos.get("quantity") or 0
+            average = pos.get("average_price") or 0.0
+            signed = quantity if transaction_type == "BUY" else -quantity
+
+            if held == 0 or (held > 0) == (signed > 0):
+                # Adding to the position.
+                average = (abs(held) * average + quantity * price) / (abs(held) + quantity)
+            else:
+                # Reducing, closing or flipping the position.
+                closed = min(quantity, abs(held))
+                direction = 1 if held > 0 else -1
+                pos["realised"] = (pos.get("realised") or 0.0) + closed * (price - average) * direction * multiplier
+                if quantity > abs(held):
+                    average = price
+                elif quantity == abs(held):
+                    average = 0.0
+
+            side = "buy" if transaction_type == "BUY" else "sell"
+            pos[side + "_quantity"] = (pos.get(side + "_quantity") or 0) + quantity
+            pos[side + "_value"] = (pos.get(side + "_value") or 0.0) + quantity * price * multiplier
+            pos["quantity"] = held + signed
+            pos["average_price"] = average
+            self._mark(pos)
+            return pos
+
+    def apply_ticks(self, ticks: List[Dict[str, Any]]) -> None:
+        """Mark positions and holdings to market with the `last_price` of the ticks."""
+        with self._lock:
+            for tick in ticks:
+                if "last_price" in tick:
+                    self._last_prices[tick["instrument_token"]] = tick["last_price"]
+
+            for item in list(self.positions.values()) + list(self.holdings.values()):
+                token = item.get("instrument_token")
+                last_price = self._last_prices.get(token) if token is not None else None
+                if last_price is not None and last_price != item.get("last_price"):
+                    item["last_price"] = last_price
+                    self._mark(item)
+
+    def _mark(self, item: Dict[str, Any]) -> None:
+        """Recompute the mark to market fields of a position or a holding."""
+        last_price = item.get("last_price")
+        quantity = item.get("quantity") or 0
+        multiplier = item.get("multiplier") or 1
+        average = item.get("average_price") or 0.0
+
+        if last_price is None:
+            return
+
+        if "buy_value" in item:
+            item["value"] = (item.get("sell_value") or 0.0) - (item.get("buy_value") or 0.0)
+            item["pnl"] = item["value"] + quantity * last_price * multiplier
+            item["unrealised"] = (last_price - average) * quantity * multiplier
+        else:
+            item["pnl"] = (last_price - average) * quantity
+        item["current_value"] = last_price * quantity * multiplier
+
+    # ----------------------------------------------------------------
+    # Queries
+    # ----------------------------------------------------------------
+    def pnl(self, include_holdings: bool = False) -> float:
+        """Total P&L of the positions, and optionally of the holdings, at the last traded prices."""
+        with self._lock:
+            items = list(self.positions.values())
+            if include_holdings:
+                items += list(self.holdings.values())
+            return sum(item.get("pnl") or 0.0 for item in items)
+
+    def get_positions(self) -> List[Dict[str, Any]]:
+        """Copy of the positions in the same shape as `positions()["net"]`."""
+        with self._lock:
+            return [dict(p) for p in self.positions.values()]
+
+    def get_holdings(self) -> List[Dict[str, Any]]:
+        """Copy of the holdings in the same shape as `holdings()`."""
+        with self._lock:
+            return [dict(h) for h in self.holdings.values()]
+
+    @staticmethod
+    def _position_key(position: Dict[str, Any]) -> PositionKey:
+        return (position["exchange"], position["tradingsymbol"], position["product"])
@@ -1,20 +1,51 @@
+import time
 import asyncio
 import logging
-from collections import deque
-from typing import Dict, Callable, Optional
-import pandas as pd
+from typing import Dict, Callable, Iterable, List, Optional, Union
 
-from kiteconnect.technical_indicators import calculate_sma, calculate_rsi, calculate_macd, calculate_bollinger_bands, calculate_stochastic_oscillator, calculate_atr
+from kiteconnect.streaming_indicators import SMA, RSI, MACD, BollingerBands, StochasticOscillator, ATR
+from kiteconnect.notifications import send_telegram_message
+from kiteconnect.bars import BarBuilder
+from kiteconnect.window_store import WindowStore
 
 logger = logging.getLogger(__name__)
 
+class InstrumentState:
+    """
+    Indicators, signal state and position of one instrument of a `RealtimeMarketDataProcessor`.
+    """
+    __slots__ = ("instrument_token", "bars", "sma_short", "sma_long", "rsi", "macd", "bollinger", "stochastic",
+                 "atr", "last_sma_short", "last_sma_long", "position", "last_log")
+
+    def __init__(self, instrument_token: int, processor: "RealtimeMarketDataProcessor"):
+        self.instrument_token = instrument_token
+        self.bars = 0
+
+        # Indicators are updated with each bar instead of recomputed over the history.
+        self.sma_short = SMA(processor.sma_short_window)
+        self.sma_long = SMA(processor.sma_long_window)
+        self.rsi = RSI(processor.rsi_window)
+        self.macd = MACD(processor.macd_fast_period, processor.macd_slow_period, processor.macd_signal_period)
+        self.bollinger = BollingerBands(processor.bollinger_window, processor.bollinger_num_std_dev)
+        self.stochastic = StochasticOscillator(processor.stochastic_k_period, processor.stochastic_d_period)
+        self.atr = ATR(processor.atr_window)
+
+        self.last_sma_short = None  # type: Optional[float]
+        self.last_sma_long = None  # type: Optional[float]
+        self.position = "FLAT" # Can be "LONG", "SHORT", "FLAT"
+        self.last_log = None  # type: Optional[float]
+
+
 class RealtimeMarketDataProcessor:
     """
     Processes real-time market data to calculate indicators and generate signals.
+
+    A single processor handles any number of instruments: each tick is routed to the state of its
+    instrument with a dict lookup, and only that instrument's indicators and signals are updated.
     """
     def __init__(
         self,
-        instrument_token: int,
+        instrument_token: Union[int, Iterable[int], None] = None,
         sma_short_window: int = 5,
         sma_long_window: int = 20,
         rsi_window: int = 14,
@@ -28,9 +59,30 @@ class RealtimeMarketDataProcessor:
         atr_window: int = 14,
         telegram_bot_token: Optional[str] = None,
         telegram_chat_id: Optional[str] = None,
-        alert_callback: Optional[Callable[[str], None]] = None
+        alert_callback: Optional[Callable[[str], None]] = None,
+        bar_interval: Optional[str] = None,
+        log_interval: float = 60,
+        keep_windows: bool = False
     ):
-        self.instrument_token = instrument_token
+        """
+        `instrument_token` is the token to process, a list of them, or None for every instrument
+        ticks arrive for.
+
+        With `bar_interval`, eg: "minute", ticks are aggregated into bars of the interval and the
+        indicators are computed on each closed bar. Otherwise every tick is treated as a bar.
+
+        The indicator values of an instrument are logged at most once every `log_interval` seconds.
+
+        With `keep_windows`, the last bars of every instrument are kept in `windows`, a `WindowStore`,
+        eg: for vectorized indicators over `windows.matrix("close")`. The streaming indicators don't
+        need them, so they aren't kept by default.
+        """
+        if instrument_token is None or isinstance(instrument_token, int):
+            tokens = [] if instrument_token is None else [instrument_token]
+        else:
+            tokens = list(instrument_token)
+        # Kept for processors of a single instrument.
+        self.instrument_token = tokens[0] if len(tokens) == 1 else None
         self.sma_short_window = sma_short_window
         self.sma_long_window = sma_long_window
         self.rsi_window = rsi_window
@@ -45,88 +97,121 @@ class RealtimeMarketDataProcessor:
         self.telegram_bot_token = telegram_bot_token
         self.telegram_chat_id = telegram_chat_id
         self.alert_callback = alert_callback
+        self.log_interval = log_interval
+        self.bar_builder = BarBuilder([bar_interval]) if bar_interval else None
 
-        # Max length should accommodate the longest indicator period
-        max_len = max(sma_long_window, rsi_window, macd_slow_period, bollinger_window, stochastic_k_period, atr_window)
-        self.data_history = deque(maxlen=max_len)
+        # Bars needed by the longest indicator before signals are generated.
+        self.warmup = max(sma_long_window, rsi_window, macd_slow_period, bollinger_window, stochastic_k_period, atr_window)
 
-        self.last_sma_short = None
-        self.last_sma_long = None
-        self.position = "FLAT" # Can be "LONG", "SHORT", "FLAT"
+        # The last `warmup` bars of every instrument, with `keep_windows`.
+        self.windows = WindowStore(self.warmup, capacity=len(tokens) or 1024) if keep_windows else None
+
+        # instrument_token -> state. With tokens given, ticks of other instruments are dropped.
+        self.states: Dict[int, InstrumentState] = dict((token, InstrumentState(token, self)) for token in tokens)
+        self.any_instrument = not tokens
+
+    def __getattr__(self, name):
+        # The indicators and position of a processor of a single instrument, eg: `processor.rsi`.
+        states = self.__dict__.get("states")
+        token = self.__dict__.get("instrument_token")
+        if states is not None and token is not None and name in InstrumentState.__slots__:
+            return getattr(states[token], name)
+        raise AttributeError(name)
+
+    def state(self, instrument_token: int) -> Optional[InstrumentState]:
+        """State of an instrument, created on its first tick when the processor takes every instrument."""
+        state = self.states.get(instrument_token)
+        if state is None and self.any_instrument:
+            state = self.states[instrument_token] = InstrumentState(instrument_token, self)
+        return state
 
     async def process_tick(self, tick: Dict):
         """
         Processes a single tick of real-time data.
         """
-        # Only process ticks for the specified instrument
-        if tick['instrument_token'] != self.instrument_token:
+        state = self.state(tick['instrument_token'])
+        if state is None:
             return
 
-        # Append new tick data. Ensure it has 'high', 'low', 'close' for indicators.
-        # For live ticks, 'last_price' can be used as 'close'. 'high' and 'low' might need to be tracked per candle.
-        # For simplicity, we'll use last_price for all for now.
-        processed_tick = {
-            'date': pd.to_datetime(tick['timestamp']),
-            'open': tick['last_price'], # Placeholder
-            'high': tick['last_price'], # Placeholder
-            'low': tick['last_price'], # Placeholder
-            'close': tick['last_price'],
-            'volume': tick.get('volume', 0) # Use get to handle missing volume
-        }
-        self.data_history.append(processed_tick)
-
-        # Ensure enough data for longest indicator
-        if len(self.data_history) < self.data_history.maxlen:
-            logger.info(f"Collecting data for {self.instrument_token}. Current size: {len(self.data_history)}")
+        if self.bar_builder is not None:
+            for bar in self.bar_builder.update(tick):
+                await self.process_bar(bar.as_candle(), state)
             return
 
-        df = pd.DataFrame(list(self.data_history))
-        df = df.set_index('date')
+        # Without a bar interval every tick is a bar at its last price.
+        price = tick['last_price']
+        await self.process_bar({
+            'date': tick.get('timestamp'),
+            'open': price,
+            'high': price,
+            'low': price,
+            'close': price,
+            'volume': tick.get('volume', 0) # Use get to handle missing volume
+        }, state)
 
-        # Extract close prices for SMA and RSI
-        close_prices = df['close']
+    async def process_ticks(self, ticks: List[Dict]):
+        """
+        Processes a batch of ticks, eg: from `on_ticks`.
+        """
+        for tick in ticks:
+            await self.process_tick(tick)
+
+    async def process_bar(self, bar: Dict, state: Optional[InstrumentState] = None):
+        """
+        Updates the indicators and signals of an instrument with a bar, a dict of `date`, `open`,
+        `high`, `low`, `close` and `volume`. `state` defaults to the processor's single instrument.
+        """
+        if state is None:
+            if self.instrument_token is None:
+                raise ValueError("`state` is required by a processor of several instruments")
+            state = self.states[self.instrument_token]
+        token = state.instrument_token
+        state.bars += 1
+        if self.windows is not None:
+            self.windows.append(token, bar)
+        high, low, close = bar['high'], bar['low'], bar['close']
 
         # Calculate indicators
-        current_sma_short = calculate_sma(close_prices, self.sma_short_window)
-        current_sma_long = calculate_sma(close_prices, self.sma_long_window)
-        current_rsi = calculate_rsi(close_prices, self.rsi_window)
-        
-        macd_data = calculate_macd(df, self.macd_fast_period, self.macd_slow_period, self.macd_signal_period)
-        current_macd = macd_data['MACD']
-        current_signal_line = macd_data['Signal_Line']
-        
-        bollinger_data = calculate_bollinger_bands(df, self.bollinger_window, self.bollinger_num_std_dev)
-        current_middle_band = bollinger_data['Middle_Band']
-        current_upper_band = bollinger_data['Upper_Band']
-        current_lower_band = bollinger_data['Lower_Band']
-        
-        stochastic_data = calculate_stochastic_oscillator(df, self.stochastic_k_period, self.stochastic_d_period)
-        current_k_percent = stochastic_data['K_Percent']
-        current_d_percent = stochastic_data['D_Percent']
-        
-        current_atr = calculate_atr(df, self.atr_window)
-
-        logger.info(f"Instrument: {self.instrument_token}, LTP: {tick['last_price']:.2f}, SMA_S: {current_sma_short:.2f}, SMA_L: {current_sma_long:.2f}, RSI: {current_rsi:.2f}, MACD: {current_macd:.2f}, Signal: {current_signal_line:.2f}, BB_Mid: {current_middle_band:.2f}, BB_Upper: {current_upper_band:.2f}, BB_Lower: {current_lower_band:.2f}, %K: {current_k_percent:.2f}, %D: {current_d_percent:.2f}, ATR: {current_atr:.2f}")
+        current_sma_short = state.sma_short.update(close)
+        current_sma_long = state.sma_long.update(close)
+        current_rsi = state.rsi.update(close)
+
+        macd_data = state.macd.update(close)
+        bollinger_data = state.bollinger.update(close)
+        stochastic_data = state.stochastic.update(high, low, close)
+        current_atr = state.atr.update(high, low, close)
+
+        # Ensure enough data for longest indicator
+        if state.bars < self.warmup:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Collecting data for {token}. Current size: {state.bars}")
+            return
+
+        if logger.isEnabledFor(logging.INFO):
+            now = time.monotonic()
+            if state.last_log is None or now - state.last_log >= self.log_interval:
+                state.last_log = now
+                logger.info(f"Instrument: {token}, Close: {close:.2f}, SMA_S: {current_sma_short:.2f}, SMA_L: {current_sma_long:.2f}, RSI: {current_rsi:.2f}, MACD: {macd_data['MACD']:.2f}, Signal: {macd_data['Signal_Line']:.2f}, BB_Mid: {bollinger_data['Middle_Band']:.2f}, BB_Upper: {bollinger_data['Upper_Band']:.2f}, BB_Lower: {bollinger_data['Lower_Band']:.2f}, %K: {stochastic_data['K_Percent']:.2f}, %D: {stochastic_data['D_Percent']:.2f}, ATR: {current_atr:.2f}")
 
         # Generate signals (example: SMA crossover)
-        if self.last_sma_short and self.last_sma_long:
+        if state.last_sma_short and state.last_sma_long:
             # Golden Cross (Buy Signal)
-            if current_sma_short > current_sma_long and self.last_sma_short <= self.last_sma_long:
-                if self.position != "LONG":
-                    signal = f"BUY Signal for {self.instrument_token}! Short SMA ({current_sma_short:.2f}) crossed above Long SMA ({current_sma_long:.2f})."
+            if current_sma_short > current_sma_long and state.last_sma_short <= state.last_sma_long:
+                if state.position != "LONG":
+                    signal = f"BUY Signal for {token}! Short SMA ({current_sma_short:.2f}) crossed above Long SMA ({current_sma_long:.2f})."
                     logger.info(signal)
                     await self._send_alert(signal)
-                    self.position = "LONG"
+                    state.position = "LONG"
             # Death Cross (Sell Signal)
-            elif current_sma_short < current_sma_long and self.last_sma_short >= self.last_sma_long:
-                if self.position != "SHORT":
-                    signal = f"SELL Signal for {self.instrument_token}! Short SMA ({current_sma_short:.2f}) crossed below Long SMA ({current_sma_long:.2f})."
+            elif current_sma_short < current_sma_long and state.last_sma_short >= state.last_sma_long:
+                if state.position != "SHORT":
+                    signal = f"SELL Signal for {token}! Short SMA ({current_sma_short:.2f}) crossed below Long SMA ({current_sma_long:.2f})."
                     logger.info(signal)
                     await self._send_alert(signal)
-                    self.position = "SHORT"
+                    state.position = "SHORT"
 
-        self.last_sma_short = current_sma_short
-        self.last_sma_long = current_sma_long
+        state.last_sma_short = current_sma_short
+        state.last_sma_long = current_sma_long
 
     async def _send_alert(self, message: str):
         """
@@ -0,0 +1,116 @@
+"""
+Build higher timeframe candles from minute candles.
+
+Intraday candles are anchored to the NSE session open at 09:15 IST, like the API's: a
+15minute candle covers 09:15 to 09:29, a 60minute one 09:15 to 10:14 and the last one of
+the day 15:15 to 15:29. Day candles are timestamped at midnight IST.
+
+    #!python
+    columns = store.columns(256265, "minute", "2024-01-01", "2024-03-31 15:29:00")
+    fifteen = resample(columns, "15minute")
+
+Day candles built from minute candles can differ slightly from the API's, whose open, close
+and volume include the pre-open and closing auction sessions.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Offset of IST from UTC and the session open, in seconds.
+IST_OFFSET = 5 * 60 * 60 + 30 * 60
+SESSION_OPEN = 9 * 60 * 60 + 15 * 60
+SESSION_CLOSE = 15 * 60 * 60 + 30 * 60
+DAY = 24 * 60 * 60
+
+# Candle length of each interval which can be built from minute candles, in seconds.
+INTERVALS = {
+    "minute": 60,
+    "3minute": 3 * 60,
+    "5minute": 5 * 60,
+    "10minute": 10 * 60,
+    "15minute": 15 * 60,
+    "30minute": 30 * 60,
+    "60minute": 60 * 60,
+    "day": DAY,
+}
+
+
+def bucket_starts(timestamps: np.ndarray, interval: str) -> np.ndarray:
+    """Start, in epoch seconds, of the `interval` candle each of the `timestamps` falls in."""
+    ts = np.asarray(timestamps, dtype=np.int64)
+    day_start = ts - (ts + IST_OFFSET) % DAY
+    if interval == "day":
+        return day_start
+
+    size = INTERVALS[interval]
+    session_open = day_start + SESSION_OPEN
+    return session_open + (ts - session_open) // size * size
+
+
+def bucket_start(ts: int, interval: str) -> int:
+    """`bucket_starts` of a single timestamp, without numpy's per call overhead."""
+    day_start = ts - (ts + IST_OFFSET) % DAY
+    if interval == "day":
+        return day_start
+    size = INTERVALS[interval]
+    session_open = day_start + SESSION_OPEN
+    return session_open + (ts - session_open) // size * size
+
+
+def bucket_close(start: int, interval: str) -> int:
+    """
+    Time, in epoch seconds, the `interval` candle starting at `start` is complete. Candles which
+    span the session close are complete at 15:30.
+    """
+    end = start + INTERVALS[interval]
+    session_close = start - (start + IST_OFFSET) % DAY + SESSION_CLOSE
+    return session_close if start < session_close < end else end
+
+
+def last_minute(ts: int, interval: str) -> int:
+    """
+    Start of the last minute candle of the `interval` candle `ts` falls in. Candles which span
+    the session close end with the 15:29 minute.
+    """
+    start = int(bucket_starts(np.array([ts]), interval)[0])
+    day_start = ts - (ts + IST_OFFSET) % DAY
+    return max(start, min(start + INTERVALS[interval] - 60, day_start + SESSION_CLOSE - 60))
+
+
+def resample(columns: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """
+    Candles of `interval` from time sorted minute candle columns, as returned by
+    `CandleStore.columns`. Open is the first open, high the highest high, low the lowest low,
+    close the last close, volume the sum and open interest the last value of each candle.
+    """
+    ts = np.asarray(columns["timestamp"], dtype=np.int64)
+    if not len(ts) or interval == "minute":
+        return dict((name, np.asarray(col)) for name, col in columns.items())
+
+    buckets = bucket_starts(ts, interval)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    lasts = np.r_[starts[1:], len(ts)] - 1
+
+    result = {
+        "timestamp": buckets[starts],
+        "open": np.asarray(columns["open"])[starts],
+        "high": np.maximum.reduceat(np.asarray(columns["high"]), starts),
+        "low": np.minimum.reduceat(np.asarray(columns["low"]), starts),
+        "close": np.asarray(columns["close"])[lasts],
+        "volume": np.add.reduceat(np.asarray(columns["volume"]), starts),
+    }
+    if "oi" in columns:
+        result["oi"] = np.asarray(columns["oi"])[lasts]
+    return result
+
+
+def resample_dataframe(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """`resample` for a DataFrame of minute candles indexed by a timezone aware date."""
+    index = df.index if df.index.tz is not None else df.index.tz_localize("Asia/Kolkata")
+    columns = dict((name, df[name].to_numpy()) for name in df.columns)
+    columns["timestamp"] = index.as_unit("s").asi8
+    result = resample(columns, interval)
+
+    dates = pd.DatetimeIndex(pd.to_datetime(result.pop("timestamp"), unit="s", utc=True), name=df.index.name)
+    return pd.DataFrame(result, index=dates.tz_convert(index.tz), columns=list(df.columns))
@@ -1,16 +1,23 @@
 import logging
+from typing import Optional
 import pandas as pd
 from kiteconnect import KiteConnect, KiteTicker
+from kiteconnect.position_book import PositionBook
 
 class RiskManagementDashboard:
-    def __init__(self, kite: KiteConnect, ticker: KiteTicker):
+    def __init__(self, kite: KiteConnect, ticker: KiteTicker, position_book: Optional[PositionBook] = None):
         self.kite = kite
         self.ticker = ticker
+        self.position_book = position_book
         self.positions = pd.DataFrame()
         self.alerts = []
 
     def _update_positions(self):
-        self.positions = pd.DataFrame(self.kite.positions()["net"])
+        # A live position book is kept current from the ticker, so refreshing from it costs no API calls.
+        if self.position_book is not None:
+            self.positions = pd.DataFrame(self.position_book.get_positions())
+        else:
+            self.positions = pd.DataFrame(self.kite.positions()["net"])
 
     def _calculate_pnl(self):
         if not self.positions.empty:
@@ -27,6 +34,9 @@ class RiskManagementDashboard:
         self.alerts.append(alert)
 
     def on_tick(self, ws, ticks):
+        if self.position_book is not None:
+            self.position_book.apply_ticks(ticks)
+            self._update_positions()
         for tick in ticks:
             if not self.positions.empty:
                 self.positions.loc[
@@ -0,0 +1,317 @@
+"""
+Streaming versions of the indicators in `kiteconnect.technical_indicators`.
+
+Each indicator keeps its state between updates, so adding a value costs the same whatever the
+window, instead of recomputing the indicator over the whole window. After updating with every
+value of a series, an indicator's value is the one the matching `calculate_*` function returns
+for the series, NaN included while there are too few values.
+
+    #!python
+    rsi = RSI(14)
+    for candle in candles:
+        value = rsi.update(candle["close"])
+"""
+import math
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+NAN = float("nan")
+
+
+def _divide(a: float, b: float) -> float:
+    """`a / b` with numpy's semantics for a zero divisor."""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a)
+    return a / b
+
+
+class SMA(object):
+    """
+    Simple moving average, like `calculate_sma`, from a running sum.
+
+    :param window: The rolling window for SMA calculation.
+    """
+
+    # Updates between recomputing the running sum, to keep rounding errors from adding up.
+    RESUM_EVERY = 10000
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.values = deque(maxlen=window)  # type: Deque[float]
+        self.total = 0.0
+        self.nans = 0
+        self._updates = 0
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        """Add a value and return the latest SMA."""
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if old != old:
+                self.nans -= 1
+            else:
+                self.total -= old
+        self.values.append(value)
+        if value != value:
+            self.nans += 1
+        else:
+            self.total += value
+
+        self._updates += 1
+        if self._updates % self.RESUM_EVERY == 0:
+            self.total = math.fsum(v for v in self.values if v == v)
+
+        full = len(self.values) == self.window and not self.nans
+        self.value = self.total / self.window if full else NAN
+        return self.value
+
+
+class _EWMA(object):
+    """
+    Exponentially weighted mean with pandas' `ewm(com=com, min_periods=min_periods).mean()`
+    semantics, ie: `adjust=True`, computed recursively.
+    """
+
+    def __init__(self, com: float, min_periods: int = 0) -> None:
+        self.decay = 1 - 1 / (1 + com)
+        self.min_periods = min_periods
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        self.numerator = value + self.decay * self.numerator
+        self.denominator = 1 + self.decay * self.denominator
+        self.count += 1
+        return self.numerator / self.denominator if self.count >= max(self.min_periods, 1) else NAN
+
+
+class _EMA(object):
+    """Exponential moving average with pandas' `ewm(span=span, adjust=False).mean()` semantics."""
+
+    def __init__(self, span: int) -> None:
+        self.alpha = 2 / (span + 1)
+        self.value = None  # type: Optional[float]
+
+    def update(self, value: float) -> float:
+        if self.value is None:
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class RSI(object):
+    """
+    Relative Strength Index, like `calculate_rsi`, with Wilder's smoothing of gains and losses.
+
+    :param window: The window for RSI calculation (default: 14).
+    """
+
+    def __init__(self, window: int = 14) -> None:
+        self.window = window
+        self.gains = _EWMA(window - 1, window)
+        self.losses = _EWMA(window - 1, window)
+        self.last = None  # type: Optional[float]
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        """Add a price and return the latest RSI."""
+        delta = value - self.last if self.last is not None else NAN
+        self.last = value
+        # Like `Series.where`, the first, undefined change counts as no gain and no loss.
+        avg_gain = self.gains.update(delta if delta > 0 else 0.0)
+        avg_loss = self.losses.update(-delta if delta < 0 else 0.0)
+
+        rs = _divide(avg_gain, avg_loss)
+        self.value = 100 - 100 / (1 + rs) if rs == rs else NAN
+        return self.value
+
+
+class MACD(object):
+    """
+    Moving Average Convergence Divergence, like `calculate_macd`.
+
+    :param fast_period: The period for the fast EMA (default: 12).
+    :param slow_period: The period for the slow EMA (default: 26).
+    :param signal_period: The period for the signal line EMA (default: 9).
+    """
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> None:
+        self.fast = _EMA(fast_period)
+        self.slow = _EMA(slow_period)
+        self.signal = _EMA(signal_period)
+        self.value = {"MACD": NAN, "Signal_Line": NAN, "Histogram": NAN}  # type: Dict[str, float]
+
+    def update(self, value: float) -> Dict[str, float]:
+        """Add a price and return the latest MACD, Signal Line and Histogram values."""
+        macd = self.fast.update(value) - self.slow.update(value)
+        signal_line = self.signal.update(macd)
+        self.value = {"MACD": macd, "Signal_Line": signal_line, "Histogram": macd - signal_line}
+        return self.value
+
+
+class _RollingMoments(object):
+    """
+    Rolling mean and sample standard deviation over a window, with Welford's updates. Like
+    pandas, both are NaN while the window holds a NaN.
+    """
+
+    # Updates between recomputing the moments from the window, to keep rounding errors from adding up.
+    RESUM_EVERY = 10000
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.values = deque(maxlen=window)  # type: Deque[float]
+        self.mean = 0.0
+        # Sum of the squared differences from the mean.
+        self.m2 = 0.0
+        # Number of trailing equal values.
+        self.same = 0
+        self.nans = 0
+        self._updates = 0
+
+    def update(self, value: float) -> None:
+        full = len(self.values) == self.window
+        old = self.values[0] if full else 0.0
+        if old != old:
+            self.nans -= 1
+        self.same = self.same + 1 if self.values and self.values[-1] == value else 1
+        self.values.append(value)
+        if value != value:
+            self.nans += 1
+
+        self._updates += 1
+        if self.nans:
+            self.mean = self.m2 = NAN
+        elif self.mean != self.mean or old != old or self._updates % self.RESUM_EVERY == 0:
+            # The window has no NaN left, or it's time to drop the rounding errors.
+            self._recompute()
+        elif full:
+            new_mean = self.mean + (value - old) / self.window
+            self.m2 += (value - old) * (value - new_mean + old - self.mean)
+            self.mean = new_mean
+        else:
+            delta = value - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (value - self.mean)
+
+    def _recompute(self) -> None:
+        self.mean = math.fsum(self.values) / len(self.values)
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def std(self) -> float:
+        if not self.full or self.window == 1 or self.nans:
+            return NAN
+        if self.same >= self.window:
+            # Like pandas, exactly 0 for a constant window rather than the rounding left in `m2`.
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+
+class BollingerBands(object):
+    """
+    Bollinger Bands, like `calculate_bollinger_bands`, with Welford's running mean and variance
+    over the window.
+
+    :param window: The rolling window for the moving average (default: 20).
+    :param num_std_dev: The number of standard deviations for the upper and lower bands (default: 2).
+    """
+
+    def __init__(self, window: int = 20, num_std_dev: float = 2) -> None:
+        self.window = window
+        self.num_std_dev = num_std_dev
+        self.moments = _RollingMoments(window)
+        self.value = {"Middle_Band": NAN, "Upper_Band": NAN, "Lower_Band": NAN}  # type: Dict[str, float]
+
+    def update(self, value: float) -> Dict[str, float]:
+        """Add a price and return the latest Middle, Upper and Lower Band values."""
+        moments = self.moments
+        moments.update(value)
+        if not moments.full:
+            return self.value
+
+        std = moments.std
+        self.value = {
+            "Middle_Band": moments.mean,
+            "Upper_Band": moments.mean + std * self.num_std_dev,
+            "Lower_Band": moments.mean - std * self.num_std_dev,
+        }
+        return self.value
+
+
+class _RollingExtreme(object):
+    """Rolling min or max over a window from a monotonic deque of (index, value)."""
+
+    def __init__(self, window: int, maximum: bool) -> None:
+        self.window = window
+        self.maximum = maximum
+        self.items = deque()  # type: Deque[Tuple[int, float]]
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        if self.maximum:
+            while self.items and self.items[-1][1] <= value:
+                self.items.pop()
+        else:
+            while self.items and self.items[-1][1] >= value:
+                self.items.pop()
+        self.items.append((self.count, value))
+        self.count += 1
+        if self.items[0][0] <= self.count - 1 - self.window:
+            self.items.popleft()
+        return self.items[0][1] if self.count >= self.window else NAN
+
+
+class StochasticOscillator(object):
+    """
+    Stochastic Oscillator (%K and %D), like `calculate_stochastic_oscillator`, with monotonic
+    deques for the lowest low and highest high.
+
+    :param k_period: The period for %K calculation (default: 14).
+    :param d_period: The period for %D (SMA of %K) calculation (default: 3).
+    """
+
+    def __init__(self, k_period: int = 14, d_period: int = 3) -> None:
+        self.lows = _RollingExtreme(k_period, maximum=False)
+        self.highs = _RollingExtreme(k_period, maximum=True)
+        self.d = SMA(d_period)
+        self.value = {"K_Percent": NAN, "D_Percent": NAN}  # type: Dict[str, float]
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """Add a candle and return the latest %K and %D values."""
+        lowest_low = self.lows.update(low)
+        highest_high = self.highs.update(high)
+        k_percent = _divide(close - lowest_low, highest_high - lowest_low) * 100
+        self.value = {"K_Percent": k_percent, "D_Percent": self.d.update(k_percent)}
+        return self.value
+
+
+class ATR(object):
+    """
+    Average True Range, like `calculate_atr`, with Wilder's smoothing of the true range.
+
+    :param window: The window for ATR calculation (default: 14).
+    """
+
+    def __init__(self, window: int = 14) -> None:
+        self.window = window
+        self.true_range = _EWMA(window - 1, window)
+        self.last_close = None  # type: Optional[float]
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """Add a candle and return the latest ATR."""
+        true_range = high - low
+        if self.last_close is not None:
+            true_range = max(true_range, abs(high - self.last_close), abs(low - self.last_close))
+        self.last_close = close
+        self.value = self.true_range.update(true_range)
+        return self.value
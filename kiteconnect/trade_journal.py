@@ -1,17 +1,16 @@
 import sqlite3
-import os
 from typing import List, Dict, Any
 import pandas as pd
 
+from kiteconnect.utils.sqlite import SQLiteStore, get_store
+
 DATABASE_FILE = "trades.db"
 
-def init_db():
-    """
-    Initializes the SQLite database and creates the trades table if it doesn't exist.
+TRADE_COLUMNS = ["order_id", "trade_id", "tradingsymbol", "exchange", "transaction_type", "quantity", "price",
+                 "trade_time", "pnl", "strategy_tag"]
+
+SCHEMA = [
     """
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
         CREATE TABLE IF NOT EXISTS trades (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             order_id TEXT NOT NULL,
@@ -25,46 +24,67 @@ def init_db():
             pnl REAL,
             strategy_tag TEXT
         )
+    """,
+    "CREATE INDEX IF NOT EXISTS trades_trade_time ON trades (trade_time)",
+    "CREATE INDEX IF NOT EXISTS trades_order_id ON trades (order_id)",
+    "CREATE INDEX IF NOT EXISTS trades_symbol ON trades (tradingsymbol, trade_time)",
+    "CREATE INDEX IF NOT EXISTS trades_strategy ON trades (strategy_tag, trade_time)",
+]
+
+# Columns a trade can't be journaled without.
+REQUIRED_COLUMNS = ["order_id", "tradingsymbol", "exchange", "transaction_type", "quantity", "price", "trade_time"]
+
+# A trade already journaled, ie: with the same trade_id, is skipped rather than raising
+# IntegrityError, so that replayed order updates or a rerun import can be journaled again.
+INSERT_TRADE = """
+    INSERT INTO trades ({}) VALUES ({})
+    ON CONFLICT (trade_id) DO NOTHING
+""".format(", ".join(TRADE_COLUMNS), ", ".join("?" * len(TRADE_COLUMNS)))
+
+
+def _store() -> SQLiteStore:
+    return get_store(DATABASE_FILE, SCHEMA)
+
+
+def init_db():
+    """
+    Initializes the SQLite database and creates the trades table if it doesn't exist.
     """
-    )
-    conn.commit()
-    conn.close()
+    _store()
 
 def insert_trade(trade_data: Dict[str, Any]):
     """
     Inserts a single trade record into the database.
+
+    The write is batched with others and committed in the background, see `flush`. A trade
+    missing a required column raises IntegrityError right away. A trade with the `trade_id` of
+    one already journaled is skipped.
+    """
+    insert_trades([trade_data])
+
+def insert_trades(trades: List[Dict[str, Any]]):
+    """
+    Inserts trade records into the database in a batch, like `insert_trade`.
+    """
+    for trade in trades:
+        missing = [column for column in REQUIRED_COLUMNS if trade.get(column) is None]
+        if missing:
+            raise sqlite3.IntegrityError("NOT NULL constraint failed: trades.{}".format(missing[0]))
+    _store().write_many(INSERT_TRADE, [tuple(trade.get(column) for column in TRADE_COLUMNS) for trade in trades])
+
+def flush():
+    """
+    Commits the trades inserted so far. Reads flush on their own.
     """
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO trades (order_id, trade_id, tradingsymbol, exchange, transaction_type, quantity, price, trade_time, pnl, strategy_tag)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        trade_data.get('order_id'),
-        trade_data.get('trade_id'),
-        trade_data.get('tradingsymbol'),
-        trade_data.get('exchange'),
-        trade_data.get('transaction_type'),
-        trade_data.get('quantity'),
-        trade_data.get('price'),
-        trade_data.get('trade_time'),
-        trade_data.get('pnl'),
-        trade_data.get('strategy_tag'),
-    ))
-    conn.commit()
-    conn.close()
+    _store().flush()
 
 def get_all_trades() -> List[Dict[str, Any]]:
     """
     Retrieves all trade records from the database.
     """
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM trades")
-    rows = cursor.fetchall()
+    cursor = _store().query("SELECT * FROM trades ORDER BY id")
     cols = [description[0] for description in cursor.description]
-    conn.close()
-    return [dict(zip(cols, row)) for row in rows]
+    return [dict(zip(cols, row)) for row in cursor.fetchall()]
 
 def get_trades_dataframe() -> pd.DataFrame:
     """
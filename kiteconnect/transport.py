@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+    transport.py
+
+    Record and replay HTTP traffic of `KiteConnect` and `AsyncKiteConnect`.
+
+    Traffic is saved to a cassette, a JSON file of request/response pairs, which can
+    then be replayed offline at any rate. Requests are matched by method, path and
+    query string. The host is ignored, so a cassette recorded against the live API can
+    be replayed with any `root`. The `Authorization` header is never recorded, and
+    credentials such as the `request_token` and `checksum` sent to `api.token` or the
+    `access_token` it returns are replaced with `<REDACTED>` in requests and responses.
+
+        #!python
+        # Record
+        with Cassette("session.json") as cassette:
+            use_cassette(kite, cassette, record=True)
+            kite.holdings()
+
+        # Replay
+        use_cassette(kite, Cassette("session.json"))
+        kite.holdings()  # Served from the cassette
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import base64
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from six.moves.urllib.parse import parse_qsl, urlencode, urlsplit
+
+from kiteconnect.utils import codec
+
+log = logging.getLogger(__name__)
+
+# Request key: (method, path, sorted query params).
+RequestKey = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+
+# Response headers worth keeping in a cassette.
+_RECORDED_HEADERS = ("content-type",)
+
+# Query, form and JSON fields whose values are never written to a cassette.
+SENSITIVE_FIELDS = frozenset([
+    "access_token", "refresh_token", "public_token", "request_token", "enctoken",
+    "checksum", "api_secret", "password", "totp",
+])
+REDACTED = "<REDACTED>"
+
+
+class CassetteMiss(LookupError):
+    """Raised when a request being replayed was not recorded in the cassette."""
+    pass
+
+
+def _request_key(method: str, url: str, params: Any = None) -> RequestKey:
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query += parse_qsl(urlencode(params, doseq=True), keep_blank_values=True)
+    # Redacted here rather than in `record` so that replayed requests match the recorded ones.
+    return (method.upper(), parts.path, tuple(sorted(_redact_pairs(query))))
+
+
+def _redact_pairs(pairs: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    return [(k, REDACTED if k in SENSITIVE_FIELDS else v) for k, v in pairs]
+
+
+def _redact_json(data: Any) -> Any:
+    if isinstance(data, dict):
+        return dict((k, REDACTED if k in SENSITIVE_FIELDS and v is not None else _redact_json(v))
+                    for k, v in data.items())
+    if isinstance(data, list):
+        return [_redact_json(v) for v in data]
+    return data
+
+
+def _redact_body(body: Any) -> Any:
+    """Body with the values of `SENSITIVE_FIELDS` redacted. A JSON or form body without any is returned as is."""
+    if body is None:
+        return None
+    if isinstance(body, (dict, list, tuple)):
+        body = urlencode(body, doseq=True)
+    try:
+        text = body if isinstance(body, str) else bytes(body).decode("utf-8")
+    except UnicodeDecodeError:
+        return body
+
+    if text.lstrip()[:1] in ("{", "["):
+        try:
+            data = codec.loads(text)
+        except ValueError:
+            return body
+        redacted = _redact_json(data)
+        return codec.dumps(redacted) if redacted != data else body
+
+    pairs = parse_qsl(text, keep_blank_values=True)
+    if any(k in SENSITIVE_FIELDS for k, _ in pairs):
+        return urlencode(_redact_pairs(pairs))
+    return body
+
+
+def _encode_body(body: Any) -> Dict[str, Any]:
+    if body is None:
+        return {"body": None}
+    if isinstance(body, (dict, list, tuple)):
+        body = urlencode(body, doseq=True)
+    if isinstance(body, str):
+        return {"body": body}
+
+    body = bytes(body)
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body": base64.b64encode(body).decode("ascii"), "encoding": "base64"}
+
+
+def _decode_body(data: Dict[str, Any]) -> bytes:
+    body = data.get("body")
+    if body is None:
+        return b""
+    if data.get("encoding") == "base64":
+        return base64.b64decode(body)
+    return body.encode("utf-8")
+
+
+class Cassette(object):
+    """
+    A list of recorded request/response interactions, optionally backed by a JSON file.
+
+    When replaying, interactions for the same request are served in the order they were
+    recorded, and the last one is repeated once they run out. This lets one cassette
+    drive any number of requests, eg: for load tests.
+
+    - `path` of the cassette file. It is loaded if it exists and written by `save()`.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.interactions = []  # type: List[Dict[str, Any]]
+        self._lock = threading.Lock()
+        self._queues = None  # type: Optional[Dict[RequestKey, Deque[Dict[str, Any]]]]
+        self._last = {}  # type: Dict[RequestKey, Dict[str, Any]]
+
+        if path:
+            try:
+                with open(path, "r") as f:
+                    self.interactions = codec.loads(f.read())["interactions"]
+            except (IOError, OSError):
+                pass
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.save()
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write the cassette to `path` or to the path it was created with."""
+        path = path or self.path
+        if not path:
+            raise ValueError("No path to save the cassette to")
+
+        with self._lock:
+            data = codec.dumps({"interactions": self.interactions})
+        with open(path, "w") as f:
+            f.write(data)
+
+    def record(
+        self, method: str, url: str, params: Any, body: Any, status: int, headers: Any, content: bytes
+    ) -> None:
+        """Add an interaction to the cassette, with credentials redacted."""
+        method, path, query = _request_key(method, url, params)
+        request = {"method": method, "path": path, "query": [list(q) for q in query]}
+        request.update(_encode_body(_redact_body(body)))
+
+        response = {
+            "status": status,
+            "headers": dict((k, headers[k]) for k in _RECORDED_HEADERS if headers.get(k) is not None),
+        }
+        response.update(_encode_body(_redact_body(content)))
+
+        with self._lock:
+            self.interactions.append({"request": request, "response": response})
+            self._queues = None
+
+    def play(self, method: str, url: str, params: Any = None) -> Dict[str, Any]:
+        """Return the recorded response for a request. Raises `CassetteMiss` if there is none."""
+        key = _request_key(method, url, params)
+
+        with self._lock:
+            if self._queues is None:
+                self._queues = defaultdict(deque)
+                for interaction in self.interactions:
+                    request = interaction["request"]
+                    recorded = (request["method"], request["path"], tuple(tuple(q) for q in request["query"]))
+                    self._queues[recorded].append(interaction["response"])
+
+            queue = self._queues.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            elif key not in self._last:
+                raise CassetteMiss("No recorded response for {} {}".format(key[0], url))
+
+            return self._last[key]
+
+
+def _pool_options(adapter: BaseAdapter) -> Dict[str, Any]:
+    """`HTTPAdapter` kwargs with the pool settings of `adapter`, none unless it's an `HTTPAdapter`."""
+    if not isinstance(adapter, HTTPAdapter):
+        return {}
+    return {
+        "pool_connections": adapter._pool_connections,
+        "pool_maxsize": adapter._pool_maxsize,
+        "max_retries": adapter.max_retries,
+        "pool_block": adapter._pool_block,
+    }
+
+
+class RecordingAdapter(HTTPAdapter):
+    """`requests` transport adapter which sends requests over the network and records them."""
+
+    def __init__(self, cassette: Cassette, **kwargs: Any) -> None:
+        super(RecordingAdapter, self).__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:  # type: ignore
+        response = super(RecordingAdapter, self).send(request, **kwargs)
+        self.cassette.record(
+            request.method or "GET", request.url or "", None, request.body,
+            response.status_code, response.headers, response.content)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """`requests` transport adapter which serves responses from a cassette without any network I/O."""
+
+    def __init__(self, cassette: Cassette) -> None:
+        super(ReplayAdapter, self).__init__()
+        self.cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:  # type: ignore
+        recorded = self.cassette.play(request.method or "GET", request.url or "")
+
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = _decode_body(recorded)
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class _ReplayResponse(object):
+    """Minimal stand-in for `aiohttp.ClientResponse` backed by a recorded response."""
+
+    def __init__(self, recorded: Dict[str, Any]) -> None:
+        from multidict import CIMultiDict
+
+        self.status = recorded["status"]
+        self.headers = CIMultiDict(recorded["headers"])
+        self._body = _decode_body(recorded)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        return self._body.decode(encoding)
+
+    def release(self) -> None:
+        pass
+
+
+class _ReplayRequestContext(object):
+    def __init__(self, cassette: Cassette, method: str, url: str, params: Any) -> None:
+        self.cassette = cassette
+        self.method = method
+        self.url = url
+        self.params = params
+
+    async def __aenter__(self) -> _ReplayResponse:
+        return _ReplayResponse(self.cassette.play(self.method, self.url, self.params))
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        pass
+
+
+class _RecordingRequestContext(object):
+    def __init__(self, session: Any, cassette: Cassette, method: str, url: str, kwargs: Dict[str, Any]) -> None:
+        self.session = session
+        self.cassette = cassette
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self.response = None  # type: Any
+
+    async def __aenter__(self) -> Any:
+        self.response = await self.session.request(self.method, self.url, **self.kwargs)
+        content = await self.response.read()
+        self.cassette.record(
+            self.method, self.url, self.kwargs.get("params"), self.kwargs.get("data"),
+            self.response.status, self.response.headers, content)
+        return self.response
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.response.release()
+
+
+class AsyncReplaySession(object):
+    """Drop-in replacement for the `aiohttp.ClientSession` of `AsyncKiteConnect` which replays a cassette."""
+
+    def __init__(self, cassette: Cassette, session: Any = None) -> None:
+        self.cassette = cassette
+        self.closed = False
+        # Session being replaced. It is only kept to be closed along with this one.
+        self._session = session
+
+    def request(self, method: str, url: str, params: Any = None, **kwargs: Any) -> _ReplayRequestContext:
+        return _ReplayRequestContext(self.cassette, method, url, params)
+
+    async def close(self) -> None:
+        self.closed = True
+        if self._session is not None:
+            await self._session.close()
+
+
+class AsyncRecordingSession(object):
+    """
+    Wraps an `aiohttp.ClientSession` and records every request made through it.
+
+    - `session` to wrap, or a callable returning one. It's called on the first request,
+    so that the session is created in the event loop the requests are made from.
+    """
+
+    def __init__(self, session: Any, cassette: Cassette) -> None:
+        self._session = session
+        self.cassette = cassette
+
+    @property
+    def session(self) -> Any:
+        if callable(self._session):
+            self._session = self._session()
+        return self._session
+
+    @property
+    def closed(self) -> bool:
+        return not callable(self._session) and self._session.closed
+
+    def request(self, method: str, url: str, **kwargs: Any) -> _RecordingRequestContext:
+        return _RecordingRequestContext(self.session, self.cassette, method, url, kwargs)
+
+    async def close(self) -> None:
+        if not callable(self._session):
+            await self._session.close()
+
+
+def use_cassette(client: Any, cassette: Cassette, record: bool = False) -> None:
+    """
+    Route all requests of a `KiteConnect` or `AsyncKiteConnect` client through `cassette`.
+
+    - `record` sends requests to the API and records them. Otherwise requests are
+    replayed from the cassette and never reach the network.
+    """
+    if hasattr(client, "reqsession"):
+        replay = ReplayAdapter(cassette)
+        for prefix in ("https://", "http://"):
+            # Recording keeps the pool settings of the adapter it replaces, eg: from the client's `pool`.
+            adapter = RecordingAdapter(
+                cassette, **_pool_options(client.reqsession.get_adapter(prefix))) if record else replay
+            client.reqsession.mount(prefix, adapter)
+    elif record:
+        # `client.session` needs a running event loop, the session is created on the first request instead.
+        session = getattr(client, "_session", None)
+        if session is None or session.closed:
+            session = client._new_session
+        client.session = AsyncRecordingSession(session, cassette)
+    else:
+        # Only an already open session needs closing, replaying doesn't need one.
+        client.session = AsyncReplaySession(cassette, session=getattr(client, "_session", None))
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+    bulk.py
+
+    Helpers shared by the sync and async clients for bulk order operations.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PLACE = "place"
+MODIFY = "modify"
+CANCEL = "cancel"
+
+# Parameters accepted by `cancel_order`. Cancel items are usually rows of the
+# orderbook, so everything else is dropped.
+_CANCEL_PARAMS = ("variety", "order_id", "parent_order_id")
+
+# A single operation: (op, index of the item in its input list, params).
+BulkOp = Tuple[str, int, Dict[str, Any]]
+
+
+def bulk_batches(
+    place: Iterable[Dict[str, Any]] = (),
+    modify: Iterable[Dict[str, Any]] = (),
+    cancel: Iterable[Dict[str, Any]] = (),
+    prioritize_cancels: bool = True,
+) -> Tuple[Dict[str, List[Dict[str, Any]]], List[List[BulkOp]]]:
+    """
+    Group bulk operations into batches which are run one after another.
+
+    Returns `(items, batches)` where `items` maps each op to its list of params
+    and `batches` is a list of lists of operations. Operations in a batch are run
+    concurrently. With `prioritize_cancels` all cancels run to completion first
+    (freeing margin and avoiding self trades) before modifications and new orders.
+    """
+    items = {
+        CANCEL: [dict((k, v) for k, v in item.items() if k in _CANCEL_PARAMS) for item in cancel],
+        MODIFY: [dict(item) for item in modify],
+        PLACE: [dict(item) for item in place],
+    }
+
+    ops = {op: [(op, idx, params) for idx, params in enumerate(items[op])] for op in items}
+    if prioritize_cancels:
+        batches = [ops[CANCEL], ops[MODIFY] + ops[PLACE]]
+    else:
+        batches = [ops[CANCEL] + ops[MODIFY] + ops[PLACE]]
+
+    return items, [batch for batch in batches if batch]
+
+
+def bulk_result(op: str, params: Dict[str, Any], order_id: Optional[str] = None,
+                error: Optional[BaseException] = None) -> Dict[str, Any]:
+    """
+    Result of a single bulk operation.
+
+    - `op` is one of `place`, `modify` or `cancel`
+    - `params` are the params the operation was called with
+    - `order_id` is the order id returned by the API, None on failure
+    - `error` is the exception raised by the operation, None on success
+    """
+    return {
+        "op": op,
+        "params": params,
+        "status": "error" if error is not None else "success",
+        "order_id": order_id,
+        "error": error,
+    }
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+    codec.py
+
+    Pluggable JSON codec used on the REST request path.
+
+    The fastest available backend is picked at import time, in the order
+    `orjson`, `ujson` and finally the standard library `json` module.
+    Callers should always go through the module attributes (`codec.loads`,
+    `codec.dumps`) so that `set_backend()` takes effect everywhere.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import json
+import logging
+from typing import Any, Callable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Backends in order of preference.
+BACKENDS = ("orjson", "ujson", "json")
+
+# Name of the active backend.
+backend = "json"
+
+
+def _stdlib_loads(data: Any) -> Any:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode("utf-8")
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj)
+
+
+# Functions of the active backend, replaced by `set_backend()`.
+# `loads` decodes a JSON document from `str` or `bytes`, raising ValueError on invalid input.
+# `dumps` encodes an object as a compact JSON string.
+loads = _stdlib_loads  # type: Callable[[Any], Any]
+dumps = _stdlib_dumps  # type: Callable[[Any], str]
+
+
+def _load_backend(name: str) -> Tuple[Callable[[Any], Any], Callable[[Any], str]]:
+    """Return `(loads, dumps)` for the named backend, raising ImportError if it is missing."""
+    if name == "orjson":
+        import orjson
+
+        def _orjson_loads(data: Any) -> Any:
+            if isinstance(data, memoryview):
+                data = bytes(data)
+            return orjson.loads(data)
+
+        def _orjson_dumps(obj: Any) -> str:
+            return orjson.dumps(obj).decode("utf-8")
+
+        return _orjson_loads, _orjson_dumps
+    elif name == "ujson":
+        import ujson
+
+        def _ujson_loads(data: Any) -> Any:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                data = bytes(data).decode("utf-8")
+            return ujson.loads(data)
+
+        def _ujson_dumps(obj: Any) -> str:
+            return ujson.dumps(obj, ensure_ascii=False)
+
+        return _ujson_loads, _ujson_dumps
+    elif name == "json":
+        return _stdlib_loads, _stdlib_dumps
+
+    raise ValueError("Unknown JSON backend `{}`. Supported backends are {}".format(name, ", ".join(BACKENDS)))
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    """
+    Select the JSON backend used for decoding responses and encoding request bodies.
+
+    - `name` is one of `orjson`, `ujson` or `json`. If None, the fastest installed
+    backend is picked.
+
+    Returns the name of the backend that is now active.
+    """
+    global backend, loads, dumps
+
+    candidates = [name] if name else list(BACKENDS)
+    for candidate in candidates:
+        try:
+            loads, dumps = _load_backend(candidate)
+        except ImportError:
+            if name:
+                raise
+            continue
+
+        backend = candidate
+        log.debug("Using `{}` for JSON encoding and decoding.".format(backend))
+        return backend
+
+    # Unreachable since stdlib json is always importable.
+    return backend
+
+
+set_backend()
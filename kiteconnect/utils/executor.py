@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+    executor.py
+
+    Bounded thread pool used by the sync client to run API calls concurrently.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class CallExecutor(object):
+    """
+    Thread pool which is created on first use and safe to share between threads.
+
+    - `max_workers` is either a number or a callable returning it, evaluated when
+    the pool is created. The client sizes it to its HTTP connection pool so that
+    every worker gets a connection.
+
+    Calls submitted from one of the pool's own workers run inline in the calling
+    thread, eg: a spread order placed through `submit`. Otherwise a nested call
+    waiting for a free worker could deadlock a saturated pool.
+    """
+
+    def __init__(self, max_workers: Any, thread_name_prefix: str = "kiteconnect") -> None:
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def max_workers(self) -> int:
+        """Number of worker threads."""
+        return self._max_workers() if callable(self._max_workers) else self._max_workers
+
+    def in_worker(self) -> bool:
+        """Whether the calling thread is one of the pool's workers."""
+        return getattr(self._local, "worker", False)
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> "Future[Any]":
+        """Schedule `func(*args, **kwargs)` and return a `concurrent.futures.Future`."""
+        if self.in_worker():
+            future = Future()  # type: Future[Any]
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+
+        return self._get_executor().submit(func, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers. A later `submit` starts a new pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            # A worker can't wait for itself.
+            executor.shutdown(wait=wait and not self.in_worker())
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self._thread_name_prefix,
+                    initializer=self._mark_worker,
+                )
+            return self._executor
+
+    def _mark_worker(self) -> None:
+        self._local.worker = True
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+    lru.py
+
+    Size bounded in-memory LRU cache with per entry expiry.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache(object):
+    """
+    Least recently used cache bounded by the total size of its values.
+
+        #!python
+        cache = LRUCache(max_bytes=64 * 1024 * 1024, sizeof=lambda df: df.memory_usage().sum())
+        cache.put(key, df, ttl=60)
+        df = cache.get(key)
+
+    - `max_bytes` total size of the values kept. The least recently used entries are
+    evicted to make room, a value larger than it isn't cached at all.
+    - `sizeof` function returning the size of a value in bytes.
+    - `ttl` default seconds an entry stays valid, None for no expiry.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # key -> (value, size, expiry)
+        self._entries = OrderedDict()  # type: OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._expired(entry)
+
+    @staticmethod
+    def _expired(entry: Tuple[Any, int, Optional[float]]) -> bool:
+        return entry[2] is not None and entry[2] <= time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value of `key`, or `default` if it isn't cached or has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache `value` for `ttl` seconds, or the cache's default `ttl`."""
+        size = self.sizeof(value)
+        ttl = self.ttl if ttl is None else ttl
+        expiry = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            while self._entries and self.bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (value, size, expiry)
+            self.bytes += size
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def invalidate(self, match: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Remove the entries whose key `match` returns True for, or all of them. Returns the count removed."""
+        with self._lock:
+            keys = [key for key in self._entries if match is None or match(key)]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss, eviction and expiry counts and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = self.expirations = 0
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+    monitor.py
+
+    Event loop lag monitor, to spot code blocking the asyncio event loop.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import time
+import asyncio
+from typing import Any, List, Optional
+
+
+class LoopLagMonitor(object):
+    """
+    Measures how late the event loop wakes up a coroutine sleeping for `interval` seconds.
+
+    Any lag means some callback held the loop, eg: parsing a large response, and every
+    other coroutine, order placement included, was delayed by as much.
+
+        #!python
+        async with LoopLagMonitor() as monitor:
+            await kite.instruments()
+        print(monitor.max_lag, monitor.percentile(99))
+
+    - `interval` between samples in seconds.
+    - `max_samples` most recent samples kept for the statistics.
+    """
+
+    def __init__(self, interval: float = 0.01, max_samples: int = 10000) -> None:
+        self.interval = interval
+        self.max_samples = max_samples
+        self.samples = []  # type: List[float]
+        self.max_lag = 0.0
+        self._task = None  # type: Optional[asyncio.Task]
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self.start()
+        # Let the first sample be scheduled before the monitored code runs.
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        await self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start sampling in the running event loop."""
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling. The collected statistics are kept."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def reset(self) -> None:
+        """Clear the collected statistics."""
+        self.samples = []
+        self.max_lag = 0.0
+
+    @property
+    def mean_lag(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Lag in seconds under which `p` percent of the samples fall."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100.0))]
+
+    def stats(self) -> dict:
+        """Summary of the samples in milliseconds."""
+        return {
+            "samples": len(self.samples),
+            "mean_ms": self.mean_lag * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": self.max_lag * 1000,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self._record(max(time.perf_counter() - expected, 0.0))
+
+    def _record(self, lag: float) -> None:
+        self.samples.append(lag)
+        if len(self.samples) > self.max_samples:
+            del self.samples[:len(self.samples) - self.max_samples]
+        self.max_lag = max(self.max_lag, lag)
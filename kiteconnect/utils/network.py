@@ -1,32 +1,309 @@
 import time
+import random
 import logging
+import inspect
+import datetime
+import threading
 from functools import wraps
+from typing import Any, Awaitable, Callable, Iterator, Optional, Tuple, Type, Union
 
 logger = logging.getLogger(__name__)
 
-def retry(exceptions, tries=3, delay=1, backoff=2, logger=logger):
+ExceptionTypes = Tuple[Type[BaseException], ...]
+
+# Timezone of the naive timestamps in API responses, eg: `order_timestamp`.
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
+
+def exchange_now() -> datetime.datetime:
+    """
+    Current time as a naive IST datetime, comparable with response timestamps. Truncated to the
+    second like them, so an order placed within the current second compares as not earlier.
+    """
+    return datetime.datetime.now(IST).replace(tzinfo=None, microsecond=0)
+
+
+class RetryPolicy(object):
+    """
+    Retry policy for a single API call.
+
+    A policy retries the call on transient network errors with jittered
+    exponential backoff, and never starts an attempt once its `deadline` has
+    passed. An attempt which has started runs with its full timeout, so a
+    request isn't cut short after it may have been processed.
+
+    Non idempotent calls (`idempotent=False`, eg: placing an order) are never
+    blindly retried since a timed out request may already have reached the
+    exchange. They are retried only when
+
+    - the error proves the request was never sent (`unsent_exceptions`, eg: a connect timeout), or
+    - a `dedup` check is supplied and reports that the earlier attempt did not go through.
+
+    Args:
+        tries: Total number of attempts including the first one.
+        delay: Initial delay between attempts in seconds.
+        backoff: Multiplier for the delay between attempts.
+        max_delay: Upper bound for a single delay in seconds. None for no bound.
+        jitter: If True, each delay is drawn uniformly from `[0, delay]` ("full jitter").
+        deadline: Time budget in seconds for starting attempts of the call, including waits on a rate
+            limiter and sleeps between retries. None disables it.
+        idempotent: Whether the call is safe to send more than once.
+        dedup_by_tag: For non idempotent order calls, look up an existing order with the same
+            `tag` before retrying, and return it instead of placing the order again.
+    """
+
+    def __init__(
+        self,
+        tries: int = 3,
+        delay: float = 0.5,
+        backoff: float = 2,
+        max_delay: Optional[float] = 4,
+        jitter: bool = True,
+        deadline: Optional[float] = None,
+        idempotent: bool = True,
+        dedup_by_tag: bool = False,
+    ) -> None:
+        if tries < 1:
+            raise ValueError("`tries` should be at least 1")
+
+        self.tries = tries
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+        self.idempotent = idempotent
+        self.dedup_by_tag = dedup_by_tag
+
+    def __repr__(self) -> str:
+        return ("RetryPolicy(tries={tries}, delay={delay}, backoff={backoff}, max_delay={max_delay}, "
+                "jitter={jitter}, deadline={deadline}, idempotent={idempotent}, dedup_by_tag={dedup_by_tag})").format(
+                    **self.__dict__)
+
+    def delays(self) -> Iterator[float]:
+        """Yield the sleep interval before each retry."""
+        delay = self.delay
+        for _ in range(self.tries - 1):
+            capped = min(delay, self.max_delay) if self.max_delay is not None else delay
+            yield random.uniform(0, capped) if self.jitter else capped
+            delay *= self.backoff
+
+    def _remaining(self, started: float) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - (time.monotonic() - started)
+
+    def _should_retry(self, e: BaseException, unsent_exceptions: ExceptionTypes, has_dedup: bool) -> bool:
+        if self.idempotent or has_dedup:
+            return True
+        return bool(unsent_exceptions) and isinstance(e, unsent_exceptions)
+
+    def _next_delay(self, delays: Iterator[float], started: float) -> Optional[float]:
+        """Return the next sleep interval or None if no retries or time budget are left."""
+        delay = next(delays, None)
+        if delay is None:
+            return None
+
+        remaining = self._remaining(started)
+        if remaining is not None and remaining <= delay:
+            return None
+
+        return delay
+
+    def call(
+        self,
+        func: Callable[[Optional[float]], Any],
+        exceptions: ExceptionTypes,
+        unsent_exceptions: ExceptionTypes = (),
+        dedup: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Call `func` under this policy, blocking the calling thread between attempts.
+
+        - `func` is called with the remaining time budget in seconds (or None). It should
+        raise without sending the request once the budget is used up, eg: by waiting on a rate
+        limiter, rather than send it with a shortened timeout.
+        - `exceptions` are the transient errors to retry on.
+        - `unsent_exceptions` are errors which guarantee the request never left the client.
+        - `dedup` is called before retrying a non idempotent call. If it returns a value
+        other than None, that value is returned instead of sending the request again.
+        """
+        started = time.monotonic()
+        delays = self.delays()
+
+        while True:
+            try:
+                return func(self._remaining(started))
+            except exceptions as e:
+                if not self._should_retry(e, unsent_exceptions, dedup is not None):
+                    raise
+
+                delay = self._next_delay(delays, started)
+                if delay is None:
+                    raise
+
+                logger.warning("{}, Retrying in {:.2f} seconds...".format(str(e), delay))
+                time.sleep(delay)
+
+                if dedup is not None and not isinstance(e, unsent_exceptions):
+                    existing = self._check_dedup(dedup, e)
+                    if existing is not None:
+                        logger.warning("Request already processed by an earlier attempt, skipping retry.")
+                        return existing
+
+    async def acall(
+        self,
+        func: Callable[[Optional[float]], Awaitable[Any]],
+        exceptions: ExceptionTypes,
+        unsent_exceptions: ExceptionTypes = (),
+        dedup: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Asyncio version of `call()`. Sleeps between attempts without blocking the event loop.
+
+        `func` is a coroutine function and `dedup` may be a plain or a coroutine function.
+        """
+        started = time.monotonic()
+        delays = self.delays()
+
+        while True:
+            try:
+                return await func(self._remaining(started))
+            except exceptions as e:
+                if not self._should_retry(e, unsent_exceptions, dedup is not None):
+                    raise
+
+                delay = self._next_delay(delays, started)
+                if delay is None:
+                    raise
+
+                logger.warning("{}, Retrying in {:.2f} seconds...".format(str(e), delay))
+                # Imported here to keep asyncio out of `import kiteconnect`, it's loaded already when this runs.
+                import asyncio
+                await asyncio.sleep(delay)
+
+                if dedup is not None and not isinstance(e, unsent_exceptions):
+                    existing = self._check_dedup(dedup, e)
+                    if inspect.isawaitable(existing):
+                        try:
+                            existing = await existing
+                        except Exception:
+                            logger.exception("Dedup check failed, not retrying.")
+                            raise e
+                    if existing is not None:
+                        logger.warning("Request already processed by an earlier attempt, skipping retry.")
+                        return existing
+
+    def _check_dedup(self, dedup: Callable[[], Any], e: BaseException) -> Any:
+        try:
+            existing = dedup()
+        except Exception:
+            # If we can't tell whether the earlier attempt went through, resending is unsafe.
+            logger.exception("Dedup check failed, not retrying.")
+            raise e
+
+        return existing
+
+
+def retry(
+    exceptions: Union[Type[BaseException], ExceptionTypes], tries: int = 3, delay: float = 1, backoff: float = 2,
+    logger: logging.Logger = logger,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """
     Retry calling the decorated function using an exponential backoff.
 
+    Kept for compatibility, it calls the function under a `RetryPolicy` without jitter or a
+    bound on the delays. Retries are logged by this module's logger.
+
     Args:
         exceptions: The exception(s) to catch and retry on.
-        tries: Number of times to try (not including the first attempt).
+        tries: Total number of attempts including the first one.
         delay: Initial delay between retries in seconds.
         backoff: Multiplier for the delay between retries.
-        logger: Logger to use for logging retry attempts.
+        logger: Unused, kept for compatibility.
     """
-    def deco_retry(f):
+    policy = RetryPolicy(tries=tries, delay=delay, backoff=backoff, max_delay=None, jitter=False)
+    if not isinstance(exceptions, tuple):
+        exceptions = (exceptions,)
+
+    def deco_retry(f: Callable[..., Any]) -> Callable[..., Any]:
         @wraps(f)
-        def f_retry(*args, **kwargs):
-            mtries, mdelay = tries, delay
-            while mtries > 1:
-                try:
-                    return f(*args, **kwargs)
-                except exceptions as e:
-                    logger.warning(f"{str(e)}, Retrying in {mdelay} seconds...")
-                    time.sleep(mdelay)
-                    mtries -= 1
-                    mdelay *= backoff
-            return f(*args, **kwargs) # Last attempt
+        def f_retry(*args: Any, **kwargs: Any) -> Any:
+            return policy.call(lambda remaining: f(*args, **kwargs), exceptions)
         return f_retry
     return deco_retry
+
+
+class RateLimiter(object):
+    """
+    Thread safe token bucket rate limiter.
+
+    Allows `rate` calls per `per` seconds on average with bursts of up to `burst`
+    calls. Callers reserve a token under a lock and then sleep outside of it, so
+    waiting callers are served roughly in arrival order and the limiter can be
+    shared between threads and an event loop.
+
+    Args:
+        rate: Number of calls allowed per `per` seconds.
+        per: Length of the window in seconds.
+        burst: Maximum number of calls allowed back to back. Defaults to `rate`.
+    """
+
+    def __init__(self, rate: float, per: float = 1.0, burst: Optional[float] = None) -> None:
+        if rate <= 0 or per <= 0:
+            raise ValueError("`rate` and `per` should be positive")
+
+        self.rate = float(rate) / per
+        self.burst = float(burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return "RateLimiter(rate={}/s, burst={})".format(self.rate, self.burst)
+
+    def _reserve(self) -> float:
+        """Take a token and return the time in seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now, without waiting. Returns False otherwise."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> float:
+        """Block the calling thread until a call is allowed. Returns the time waited."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Wait without blocking the event loop until a call is allowed. Returns the time waited."""
+        import asyncio
+
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+# Policy for idempotent calls: reads, cancels, modifications.
+DEFAULT_RETRY_POLICY = RetryPolicy(tries=3, delay=0.5, backoff=2, max_delay=2, deadline=10)
+
+# Policy for calls which must never be sent twice unless it is provably safe.
+NON_IDEMPOTENT_RETRY_POLICY = RetryPolicy(tries=3, delay=0.5, backoff=2, max_delay=2, deadline=10, idempotent=False)
+
+# Policy which disables retries completely.
+NO_RETRY_POLICY = RetryPolicy(tries=1)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+    parsing.py
+
+    Parsers for the large instruments and historical data responses, shared by the
+    sync and async clients.
+
+    They are plain module level functions so that `AsyncKiteConnect` can run them in
+    a thread or process pool executor off the event loop.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import csv
+from typing import Any, Dict, List
+
+import dateutil.parser
+from six import StringIO, PY2
+
+
+def _decode(data: Any) -> Any:
+    # decode to string for Python 3
+    if not PY2 and type(data) == bytes:
+        return data.decode("utf-8").strip()
+    return data
+
+
+def parse_instruments(data: Any) -> List[Dict[str, Any]]:
+    """Parse the instruments CSV dump."""
+    records = []
+    reader = csv.DictReader(StringIO(_decode(data)))
+
+    for row in reader:
+        row["instrument_token"] = int(row["instrument_token"])
+        row["last_price"] = float(row["last_price"])
+        row["strike"] = float(row["strike"])
+        row["tick_size"] = float(row["tick_size"])
+        row["lot_size"] = int(row["lot_size"])
+
+        # Parse date
+        if len(row["expiry"]) == 10:
+            row["expiry"] = dateutil.parser.parse(row["expiry"]).date()
+
+        records.append(row)
+
+    return records
+
+
+def parse_mf_instruments(data: Any) -> List[Dict[str, Any]]:
+    """Parse the mutual fund instruments CSV dump."""
+    records = []
+    reader = csv.DictReader(StringIO(_decode(data)))
+
+    for row in reader:
+        row["minimum_purchase_amount"] = float(row["minimum_purchase_amount"])
+        row["purchase_amount_multiplier"] = float(row["purchase_amount_multiplier"])
+        row["minimum_additional_purchase_amount"] = float(row["minimum_additional_purchase_amount"])
+        row["minimum_redemption_quantity"] = float(row["minimum_redemption_quantity"])
+        row["redemption_quantity_multiplier"] = float(row["redemption_quantity_multiplier"])
+        row["purchase_allowed"] = bool(int(row["purchase_allowed"]))
+        row["redemption_allowed"] = bool(int(row["redemption_allowed"]))
+        row["last_price"] = float(row["last_price"])
+
+        # Parse date
+        if len(row["last_price_date"]) == 10:
+            row["last_price_date"] = dateutil.parser.parse(row["last_price_date"]).date()
+
+        records.append(row)
+
+    return records
+
+
+def format_historical(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert the candles of a historical data response to records with field names."""
+    records = []
+    for d in data["candles"]:
+        record = {
+            "date": dateutil.parser.parse(d[0]),
+            "open": d[1],
+            "high": d[2],
+            "low": d[3],
+            "close": d[4],
+            "volume": d[5],
+        }
+        if len(d) == 7:
+            record["oi"] = d[6]
+        records.append(record)
+
+    return records
+
+
+def row_count(data: Any) -> int:
+    """Approximate number of rows in a response, used to decide whether to parse it off the event loop."""
+    if isinstance(data, bytes):
+        return data.count(b"\n")
+    if isinstance(data, str):
+        return data.count("\n")
+    if isinstance(data, dict):
+        return len(data.get("candles") or ())
+    return len(data or ())
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+    spread.py
+
+    Helpers shared by the sync and async clients for placing multi-leg spread orders.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import kiteconnect.exceptions as ex
+
+
+class SpreadOrderResult(list):
+    """
+    List of order ids for each leg of a spread, in the order the legs were given.
+
+    It behaves exactly like the plain list returned earlier and additionally carries
+    per-leg timings in `timings`. Each timing is a dict with the keys
+
+    - `leg` index of the leg in the input
+    - `phase` index of the phase the leg was placed in
+    - `order_id` order id of the leg
+    - `started` and `finished` offsets in seconds from the start of the spread
+    - `elapsed` round trip time of the leg in seconds
+    """
+
+    def __init__(self, order_ids: Sequence[str] = (), timings: Optional[List[Dict[str, Any]]] = None) -> None:
+        super(SpreadOrderResult, self).__init__(order_ids)
+        self.timings = timings or []
+
+    @property
+    def skew(self) -> float:
+        """Time in seconds between the first and the last leg reaching the exchange."""
+        if not self.timings:
+            return 0.0
+        finished = [t["finished"] for t in self.timings]
+        return max(finished) - min(finished)
+
+
+def spread_phases(
+    legs: Sequence[Dict[str, Any]],
+    concurrent: bool = False,
+    phases: Optional[Sequence[Sequence[int]]] = None,
+    hedge_first: bool = False,
+) -> List[List[int]]:
+    """
+    Return the leg indices grouped into phases. Legs within a phase are placed together
+    and a phase starts only after every leg of the previous phase is placed.
+
+    - `concurrent` places all legs in a single phase.
+    - `phases` is an explicit list of lists of leg indices, eg: `[[1, 3], [0, 2]]`.
+    - `hedge_first` places all BUY legs in the first phase and the SELL legs in the
+    second one, so that the hedges are in place before the margin heavy short legs.
+
+    With none of these set, every leg is its own phase, ie. legs are placed sequentially.
+    """
+    n = len(legs)
+
+    if phases is not None:
+        seen = sorted(i for phase in phases for i in phase)
+        if seen != list(range(n)):
+            raise ex.InputException("`phases` should contain every leg index exactly once")
+        return [list(phase) for phase in phases if phase]
+
+    if hedge_first:
+        buys = [i for i, leg in enumerate(legs) if leg.get("transaction_type") == "BUY"]
+        sells = [i for i, leg in enumerate(legs) if leg.get("transaction_type") != "BUY"]
+        return [phase for phase in (buys, sells) if phase]
+
+    if concurrent:
+        return [list(range(n))] if n else []
+
+    return [[i] for i in range(n)]
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+    sqlite.py
+
+    Shared SQLite store with long lived connections and batched writes.
+
+    :copyright: (c) 2021 by Zerodha Technology.
+    :license: see LICENSE for details.
+"""
+import atexit
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+# Statements compiled and kept per connection. Stores use a handful of constant SQL strings,
+# so every statement after the first is executed from sqlite3's prepared statement cache.
+STATEMENT_CACHE_SIZE = 256
+
+
+class SQLiteStore(object):
+    """
+    A SQLite database shared by all the code using the same file.
+
+    - Each thread gets one connection, opened on first use. It's closed once the thread has
+    ended, by the flusher or when another thread connects, and the rest by `close`.
+    - Connections use WAL journal mode, so readers don't block the writer, with
+    `synchronous=NORMAL`, which syncs on checkpoints instead of on every commit.
+    - `schema` statements are run once, when the store is created or by `apply_schema`.
+    - `write` queues rows which a background thread inserts with `executemany`, one
+    transaction per batch. Reads through `query` flush the queue first, so they see every
+    row written before them.
+    - A batch with a row the database rejects, eg: for a constraint, is written row by row so
+    the others are committed. The rejected rows are kept in `failed` and the first error is
+    raised by the next `flush`, `query`, `execute` or `close`.
+
+        #!python
+        store = SQLiteStore("trades.db", schema=["CREATE TABLE IF NOT EXISTS t (a, b)"])
+        store.write("INSERT INTO t (a, b) VALUES (?, ?)", (1, 2))
+        rows = store.query("SELECT a, b FROM t")
+
+    - `batch_size` rows in the queue wake the flusher up before `flush_interval` seconds.
+    - `busy_timeout` seconds to wait on a database locked by another process.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        schema: Sequence[str] = (),
+        batch_size: int = 1000,
+        flush_interval: float = 0.5,
+        busy_timeout: float = 5.0,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.busy_timeout = busy_timeout
+
+        self._local = threading.local()
+        # Connection of each thread, closed once the thread has ended.
+        self._connections = {}  # type: Dict[threading.Thread, sqlite3.Connection]
+        self._schema = set()  # type: Set[str]
+        self._pending = []  # type: List[Tuple[str, Sequence[Any]]]
+        # Rows the database rejected, and the error to raise for them.
+        self.failed = []  # type: List[Tuple[str, Sequence[Any]]]
+        self._error = None  # type: Optional[sqlite3.Error]
+        self._pending_lock = threading.Lock()
+        # Held while a batch is written, so `flush` returns only once the rows are committed.
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher = None  # type: Optional[threading.Thread]
+        self._closed = False
+
+        self.apply_schema(schema)
+
+    def apply_schema(self, schema: Sequence[str]) -> None:
+        """Run the `schema` statements which weren't run on the store yet."""
+        statements = [statement for statement in schema if statement not in self._schema]
+        if not statements:
+            return
+        with self.transaction() as conn:
+            for statement in statements:
+                conn.execute(statement)
+        self._schema.update(statements)
+
+    # ----------------------------------------------------------------
+    # Connections
+    # ----------------------------------------------------------------
+    def connection(self) -> sqlite3.Connection:
+        """Connection of the calling thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, cached_statements=STATEMENT_CACHE_SIZE,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._pending_lock:
+                self._connections[threading.current_thread()] = conn
+            self._close_dead_connections()
+        return conn
+
+    def _close_dead_connections(self) -> None:
+        """Close the connections of threads which have ended."""
+        with self._pending_lock:
+            dead = [thread for thread in self._connections if not thread.is_alive()]
+            connections = [self._connections.pop(thread) for thread in dead]
+        for conn in connections:
+            conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Connection of the calling thread in a transaction, committed on exit or rolled back on error."""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Run a read after flushing the queued writes."""
+        self.flush()
+        return self.connection().execute(sql, params)
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Run and commit a write right away, after the queued ones."""
+        self.flush()
+        with self.transaction() as conn:
+            return conn.execute(sql, params)
+
+    # ----------------------------------------------------------------
+    # Batched writes
+    # ----------------------------------------------------------------
+    def write(self, sql: str, params: Sequence[Any]) -> None:
+        """Queue a row to be written by the background flusher."""
+        self.write_many(sql, [params])
+
+    def write_many(self, sql: str, rows: Sequence[Sequence[Any]]) -> None:
+        """Queue rows to be written by the background flusher."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot write to a closed store.")
+
+        with self._pending_lock:
+            self._pending.extend((sql, params) for params in rows)
+            pending = len(self._pending)
+            self._start_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        """
+        Write the queued rows and wait until they are committed. Raises the error of any rows
+        the database rejected since the last call, see `failed`.
+        """
+        self._write_pending()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _write_pending(self) -> None:
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+
+            # Consecutive rows of the same statement go in one `executemany`.
+            batches = []  # type: List[Tuple[str, List[Sequence[Any]]]]
+            for sql, params in pending:
+                if batches and batches[-1][0] == sql:
+                    batches[-1][1].append(params)
+                else:
+                    batches.append((sql, [params]))
+
+            try:
+                with self.transaction() as conn:
+                    for sql, rows in batches:
+                        conn.executemany(sql, rows)
+            except sqlite3.IntegrityError:
+                # Rolled back, write the rows one by one to commit all but the rejected ones.
+                self._write_rows(pending)
+            except sqlite3.Error as e:
+                # Eg: the database is locked. Queued again, ahead of rows written since.
+                with self._pending_lock:
+                    self._pending[:0] = pending
+                self._error = self._error or e
+
+    def _write_rows(self, rows: List[Tuple[str, Sequence[Any]]]) -> None:
+        conn = self.connection()
+        with conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            for sql, params in rows:
+                conn.execute("SAVEPOINT row")
+                try:
+                    conn.execute(sql, params)
+                except sqlite3.IntegrityError as e:
+                    conn.execute("ROLLBACK TO row")
+                    self.failed.append((sql, params))
+                    self._error = self._error or e
+                conn.execute("RELEASE row")
+
+    @property
+    def pending(self) -> int:
+        """Number of queued rows not written yet."""
+        return len(self._pending)
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._run_flusher, name="SQLiteStore-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            # Errors are kept for the next `flush` to raise in the writer's thread.
+            error = self._error
+            self._write_pending()
+            if self._error is not None and self._error is not error:
+                log.error("Error writing to {}: {}".format(self.path, self._error))
+            self._close_dead_connections()
+
+    def close(self) -> None:
+        """Write the queued rows, stop the flusher and close every connection."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            self._wakeup.set()
+            if self._flusher is not None and self._flusher is not threading.current_thread():
+                self._flusher.join()
+
+            with self._pending_lock:
+                connections, self._connections = self._connections, {}
+            for conn in connections.values():
+                conn.close()
+            self._local = threading.local()
+
+
+_stores = {}  # type: Dict[str, SQLiteStore]
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str, schema: Sequence[str] = ()) -> SQLiteStore:
+    """Shared store of the database at `path`, created on first use. `schema` statements not run on it yet are."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None or store._closed:
+            store = _stores[path] = SQLiteStore(path, schema)
+        else:
+            store.apply_schema(schema)
+        return store
+
+
+def close_stores() -> None:
+    """Flush and close all the shared stores."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        try:
+            store.close()
+        except sqlite3.Error as e:
+            log.error("Error closing {}: {}".format(store.path, e))
+
+
+atexit.register(close_stores)
@@ -0,0 +1,154 @@
+"""
+Rolling windows of many instruments in one preallocated array.
+
+Samples are kept in a tokens x 2 * window x fields float64 array. Each sample is written twice,
+at its slot and at the slot plus `window`, so the last N samples of an instrument are always a
+contiguous slice whatever the position of its head: appends are O(1) and reads are views,
+without copying. Memory is `capacity * 2 * window * len(fields) * 8` bytes however many samples
+pass through.
+
+    #!python
+    windows = WindowStore(50, ("high", "low", "close"))
+    windows.append(256265, bar)               # A dict with the fields, or a sequence in their order
+    close = windows.last(256265, 20, "close")  # View of the last 20 closes, oldest first
+    tokens, closes = windows.matrix("close")   # Instruments x window, for `kiteconnect.matrix_indicators`
+"""
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+DEFAULT_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class WindowStore(object):
+    """
+    The last `window` samples of `fields` for every instrument.
+
+    :param window: Samples kept per instrument.
+    :param fields: Names of the values of a sample (default: open, high, low, close and volume).
+    :param capacity: Instruments the array is allocated for. It doubles when an instrument is added to a full store.
+    """
+
+    def __init__(self, window: int, fields: Sequence[str] = DEFAULT_FIELDS, capacity: int = 1024) -> None:
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.fields = tuple(fields)
+        self._field_index = dict((name, i) for i, name in enumerate(self.fields))
+        self._rows = {}  # type: Dict[int, int]
+        self._tokens = []  # type: List[int]
+        # Tokens x 2 * window x fields, see `_allocate`.
+        self.data = np.empty((0, 2 * window, len(self.fields)))  # type: np.ndarray
+        self._allocate(max(capacity, 1))
+
+    def _allocate(self, capacity: int) -> None:
+        data = np.full((capacity, 2 * self.window, len(self.fields)), np.nan)
+        if self._tokens:
+            data[:len(self._tokens)] = self.data[:len(self._tokens)]
+        else:
+            # Slot the next sample of each row is written to, and samples held by each row, up to
+            # `window`. Lists rather than arrays, which are slower to index one item at a time.
+            self.heads = []  # type: List[int]
+            self.counts = []  # type: List[int]
+        self.data = data
+
+    @property
+    def capacity(self) -> int:
+        return len(self.data)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    @property
+    def tokens(self) -> List[int]:
+        """Instruments in the order of the rows of `matrix`."""
+        return list(self._tokens)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def __contains__(self, instrument_token: int) -> bool:
+        return instrument_token in self._rows
+
+    def row(self, instrument_token: int) -> int:
+        """Row of an instrument, added if it's new."""
+        row = self._rows.get(instrument_token)
+        if row is None:
+            row = len(self._tokens)
+            if row == self.capacity:
+                self._allocate(2 * self.capacity)
+            self._rows[instrument_token] = row
+            self._tokens.append(instrument_token)
+            self.heads.append(0)
+            self.counts.append(0)
+        return row
+
+    def append(self, instrument_token: int, sample: Union[Mapping[str, float], Sequence[float]]) -> None:
+        """Add a sample of an instrument, a mapping with the fields or a sequence of values in their order."""
+        row = self.row(instrument_token)
+        if isinstance(sample, Mapping):
+            sample = [sample[name] for name in self.fields]
+        head = self.heads[row]
+        # Both copies at once, `head` and `head + window` being the only slots of the slice.
+        self.data[row, head::self.window] = sample
+        self.heads[row] = head + 1 if head + 1 < self.window else 0
+        if self.counts[row] < self.window:
+            self.counts[row] += 1
+
+    def append_many(self, instrument_tokens: Sequence[int], samples: Any) -> None:
+        """
+        Add a sample to each of several instruments at once.
+
+        :param instrument_tokens: The instruments, each at most once.
+        :param samples: Instruments x fields array of values.
+        """
+        rows = np.fromiter((self.row(token) for token in instrument_tokens), dtype=np.int64,
+                           count=len(instrument_tokens))
+        samples = np.asarray(samples, dtype=float)
+        heads = np.array(self.heads)[rows]
+        self.data[rows, heads] = samples
+        self.data[rows, heads + self.window] = samples
+        for row, head in zip(rows.tolist(), ((heads + 1) % self.window).tolist()):
+            self.heads[row] = head
+            if self.counts[row] < self.window:
+                self.counts[row] += 1
+
+    def count(self, instrument_token: int) -> int:
+        """Samples held of an instrument, up to `window`."""
+        row = self._rows.get(instrument_token)
+        return 0 if row is None else self.counts[row]
+
+    def last(self, instrument_token: int, n: Optional[int] = None, field: Optional[str] = None) -> np.ndarray:
+        """
+        View of the last `n` samples of an instrument, oldest first, fewer if it has fewer.
+
+        :param n: Samples to return (default: all held).
+        :param field: A field to return, else n x fields.
+        """
+        row = self._rows.get(instrument_token)
+        held = 0 if row is None else self.counts[row]
+        n = held if n is None else min(n, held)
+        if row is None:
+            samples = np.empty((0, len(self.fields)))
+        else:
+            end = self.heads[row] + self.window
+            samples = self.data[row, end - n:end]
+        return samples if field is None else samples[:, self._field_index[field]]
+
+    def matrix(self, field: str, n: Optional[int] = None) -> Tuple[List[int], np.ndarray]:
+        """
+        The last `n` values of a field of every instrument, NaN padded on the left where an
+        instrument has fewer. Unlike `last`, the values are gathered into a new array.
+
+        :param field: The field to return.
+        :param n: Samples to return (default: `window`).
+        :return: The instruments and an instruments x n matrix, oldest sample first.
+        """
+        n = self.window if n is None else min(n, self.window)
+        rows = len(self._tokens)
+        ends = np.array(self.heads, dtype=np.int64) + self.window
+        positions = ends[:, np.newaxis] - n + np.arange(n)
+        values = self.data[np.arange(rows)[:, np.newaxis], positions, self._field_index[field]]
+        values[np.arange(n) < n - np.array(self.counts, dtype=np.int64)[:, np.newaxis]] = np.nan
+        return self.tokens, values
@@ -53,6 +53,7 @@ setup(
     setup_requires=["pytest-runner"],
     extras_require={
         "doc": ["pdoc"],
+        "fastjson": ["orjson"],
         ':sys_platform=="win32"': ["pywin32"]
     }
 )
@@ -37,3 +37,314 @@ async def test_async_ticker_connect(monkeypatch):
     ticker = AsyncKiteTicker('key', 'token', root='ws://example.com')
     await ticker.connect()
     assert called['url'].startswith('ws://example.com')
+
+
+@pytest.mark.asyncio
+async def test_async_get_is_retried(akiteconnect, monkeypatch):
+    import asyncio
+    from kiteconnect.utils.network import RetryPolicy
+
+    calls = []
+
+    async def fake_request(route, method, **kwargs):
+        calls.append(kwargs["timeout"])
+        if len(calls) == 1:
+            raise asyncio.TimeoutError()
+        return utils.get_json_response("portfolio.holdings")["data"]
+
+    monkeypatch.setattr(akiteconnect, "_request", fake_request)
+    akiteconnect.set_retry_policy("default", RetryPolicy(tries=3, delay=0, jitter=False, deadline=5))
+    holdings = await akiteconnect.holdings()
+    assert isinstance(holdings, list)
+    assert len(calls) == 2
+    # The deadline bounds the retries, not the timeout of an attempt.
+    assert calls == [akiteconnect.timeout] * 2
+
+
+@pytest.mark.asyncio
+async def test_async_place_order_not_retried(akiteconnect, monkeypatch):
+    import asyncio
+
+    calls = []
+
+    async def fake_request(route, method, **kwargs):
+        calls.append(route)
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(akiteconnect, "_request", fake_request)
+    with pytest.raises(asyncio.TimeoutError):
+        await akiteconnect.place_order(variety="regular", exchange="NSE", tradingsymbol="INFY",
+                                       transaction_type="BUY", quantity=1, product="CNC",
+                                       order_type="MARKET", tag="t1")
+    assert calls == ["order.place"]
+
+
+@pytest.mark.asyncio
+async def test_async_place_spread_order_concurrent(akiteconnect, monkeypatch):
+    import asyncio
+    import kiteconnect.exceptions as ex
+
+    in_flight = []
+    cancelled = []
+
+    async def place_order(**leg):
+        in_flight.append(leg["tradingsymbol"])
+        await asyncio.sleep(0)
+        # All legs should be in flight before any of them completes.
+        assert len(in_flight) == 3
+        if leg["tradingsymbol"] == "C":
+            raise ex.OrderException("rejected")
+        return "id-" + leg["tradingsymbol"]
+
+    async def cancel_order(variety, order_id):
+        cancelled.append(order_id)
+
+    monkeypatch.setattr(akiteconnect, "place_order", place_order)
+    monkeypatch.setattr(akiteconnect, "cancel_order", cancel_order)
+
+    legs = [{"variety": "regular", "tradingsymbol": s, "transaction_type": "BUY"} for s in ("A", "B", "C")]
+    with pytest.raises(ex.OrderException):
+        await akiteconnect.place_spread_order(legs, concurrent=True)
+    assert sorted(cancelled) == ["id-A", "id-B"]
+
+    in_flight.clear()
+    order_ids = await akiteconnect.place_spread_order(legs[:2] + [dict(legs[0], tradingsymbol="D")], concurrent=True)
+    assert order_ids == ["id-A", "id-B", "id-D"]
+    assert len(order_ids.timings) == 3
+
+
+@pytest.mark.asyncio
+async def test_async_bulk_orders(akiteconnect, monkeypatch):
+    import asyncio
+    import kiteconnect.exceptions as ex
+
+    calls = []
+    in_flight = {"now": 0, "max": 0}
+
+    async def place_order(**params):
+        calls.append(("place", params["tradingsymbol"]))
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0)
+        in_flight["now"] -= 1
+        if params["tradingsymbol"] == "BAD":
+            raise ex.InputException("bad symbol")
+        return "id-" + params["tradingsymbol"]
+
+    async def cancel_order(variety, order_id, parent_order_id=None):
+        calls.append(("cancel", order_id))
+        return order_id
+
+    monkeypatch.setattr(akiteconnect, "place_order", place_order)
+    monkeypatch.setattr(akiteconnect, "cancel_order", cancel_order)
+
+    places = [{"tradingsymbol": s} for s in ("A", "BAD", "C", "D")]
+    results = await akiteconnect.bulk_orders(
+        place=places, cancel=[{"variety": "regular", "order_id": "9"}], max_workers=2)
+
+    assert calls[0] == ("cancel", "9")
+    assert [r["order_id"] for r in results["place"]] == ["id-A", None, "id-C", "id-D"]
+    assert results["place"][1]["status"] == "error"
+    assert in_flight["max"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_record_and_replay(tmp_path):
+    from kiteconnect import AsyncKiteConnect
+    from kiteconnect.mock_server import MockKiteServer
+    from kiteconnect.transport import Cassette, use_cassette
+
+    path = str(tmp_path / "cassette.json")
+    with MockKiteServer(utils.responses_dir) as server:
+        with Cassette(path) as cassette:
+            kite = AsyncKiteConnect(api_key="<API-KEY>", access_token="<ACCESS-TOKEN>", root=server.root)
+            use_cassette(kite, cassette, record=True)
+            holdings = await kite.holdings()
+            await kite.close()
+
+    kite = AsyncKiteConnect(api_key="<API-KEY>", access_token="<ACCESS-TOKEN>", root="http://replay.invalid")
+    use_cassette(kite, Cassette(path))
+    assert await kite.holdings() == holdings
+    await kite.close()
+
+
+def test_async_record_without_running_loop(tmp_path):
+    import asyncio
+    from kiteconnect import AsyncKiteConnect
+    from kiteconnect.mock_server import MockKiteServer
+    from kiteconnect.transport import Cassette, use_cassette
+
+    path = str(tmp_path / "cassette.json")
+    with MockKiteServer(utils.responses_dir) as server:
+        with Cassette(path) as cassette:
+            kite = AsyncKiteConnect(api_key="<API-KEY>", access_token="<ACCESS-TOKEN>", root=server.root)
+            # The recording session is only created once a request is made in a loop.
+            use_cassette(kite, cassette, record=True)
+            assert not kite.session.closed
+
+            async def fetch():
+                holdings = await kite.holdings()
+                await kite.close()
+                return holdings
+
+            assert asyncio.run(fetch())
+    assert len(Cassette(path)) == 1
+
+
+def test_async_session_of_another_running_loop_is_closed():
+    import asyncio
+    import threading
+    from kiteconnect import AsyncKiteConnect
+    from kiteconnect.mock_server import MockKiteServer
+
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    try:
+        with MockKiteServer(utils.responses_dir) as server:
+            kite = AsyncKiteConnect(api_key="<API-KEY>", access_token="<ACCESS-TOKEN>", root=server.root)
+
+            async def fetch():
+                await kite.profile()
+                return kite.session
+
+            first = asyncio.run_coroutine_threadsafe(fetch(), other).result(5)
+            second = asyncio.run(fetch())
+            assert second is not first
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01), other).result(5)
+            assert first.closed
+            asyncio.run(kite.close())
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join()
+        other.close()
+
+
+def test_async_session_is_lazy_and_loop_bound(caplog):
+    import asyncio
+    from kiteconnect import AsyncKiteConnect
+    from kiteconnect.mock_server import MockKiteServer
+
+    with MockKiteServer(utils.responses_dir) as server:
+        # No event loop is running yet.
+        kite = AsyncKiteConnect(api_key="<API-KEY>", access_token="<ACCESS-TOKEN>", root=server.root)
+        assert kite._session is None
+
+        async def fetch():
+            profile = await kite.profile()
+            return profile, kite.session
+
+        # Every `asyncio.run` has its own loop and gets its own session.
+        profile, first = asyncio.run(fetch())
+        _, second = asyncio.run(fetch())
+        assert profile["user_id"]
+        assert first is not second
+        # The first loop ended with its session open, which can only be warned about.
+        assert "no longer running" in caplog.text
+
+        asyncio.run(kite.close())
+        assert kite._session is None
+
+
+@pytest.mark.asyncio
+async def test_async_pool_and_timeout_options():
+    import aiohttp
+    from kiteconnect import AsyncKiteConnect
+
+    kite = AsyncKiteConnect(api_key="<API-KEY>", pool={"limit": 5, "pool_maxsize": 2, "ttl_dns_cache": 60},
+                            timeout=aiohttp.ClientTimeout(total=5, sock_connect=1))
+    assert kite.pool == dict(AsyncKiteConnect._default_pool, limit=5, limit_per_host=2, ttl_dns_cache=60)
+    assert kite.session.connector.limit == 5
+    assert kite.session.connector.limit_per_host == 2
+    assert kite.session.timeout.sock_connect == 1
+
+    assert kite.timeout == 5
+    assert kite._client_timeout(2).total == 2
+    assert kite._client_timeout(2).sock_connect == 1
+    await kite.close()
+
+    assert AsyncKiteConnect(api_key="<API-KEY>", timeout=3).client_timeout.total == 3
+
+
+@pytest.mark.asyncio
+async def test_async_shared_connector():
+    from kiteconnect import AsyncKiteConnect
+    from kiteconnect.mock_server import MockKiteServer
+
+    connector = AsyncKiteConnect.create_connector({"limit": 10})
+    with MockKiteServer(utils.responses_dir) as server:
+        kites = [AsyncKiteConnect(api_key="<API-KEY>", access_token="<ACCESS-TOKEN>", root=server.root,
+                                  connector=connector) for _ in range(3)]
+        for kite in kites:
+            assert await kite.holdings()
+            assert kite.session.connector is connector
+            await kite.close()
+
+    assert not connector.closed
+    await connector.close()
+
+
+@pytest.mark.asyncio
+async def test_async_historical_data_is_parsed(akiteconnect, monkeypatch):
+    import datetime
+
+    async def fake_get(*args, **kwargs):
+        return utils.get_json_response("market.historical")["data"]
+    monkeypatch.setattr(akiteconnect, "_get", fake_get)
+
+    candles = await akiteconnect.historical_data(256265, "2024-01-01 09:15:00", "2024-01-01 15:30:00", "minute")
+    assert isinstance(candles, list)
+    assert isinstance(candles[0]["date"], datetime.datetime)
+
+
+@pytest.mark.asyncio
+async def test_async_large_responses_are_parsed_in_executor(akiteconnect, monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from kiteconnect.utils import parsing
+
+    body = utils.get_response("market.instruments")
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+
+    async def fake_get(*args, **kwargs):
+        return body
+    monkeypatch.setattr(akiteconnect, "_get", fake_get)
+
+    threads = []
+    parse = parsing.parse_instruments
+
+    def parse_instruments(data):
+        threads.append(threading.current_thread().name)
+        return parse(data)
+
+    monkeypatch.setattr("kiteconnect.async_connect.parse_instruments", parse_instruments)
+    inline = await akiteconnect.instruments()
+    assert threads == [threading.current_thread().name]
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="parser") as executor:
+        akiteconnect.parse_executor = executor
+        akiteconnect.parse_offload_rows = 2
+        assert await akiteconnect.instruments() == inline
+    assert threads[1].startswith("parser")
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor():
+    import time
+    import asyncio
+    from kiteconnect.utils.monitor import LoopLagMonitor
+
+    async with LoopLagMonitor(interval=0.001) as monitor:
+        await asyncio.sleep(0.01)
+        time.sleep(0.05)  # Blocks the loop.
+        await asyncio.sleep(0.01)
+
+    assert not monitor.running
+    assert monitor.samples
+    assert monitor.max_lag >= 0.04
+    assert monitor.stats()["max_ms"] == monitor.max_lag * 1000
+    assert monitor.percentile(0) <= monitor.mean_lag <= monitor.max_lag
+
+    monitor.reset()
+    assert monitor.stats()["samples"] == 0
@@ -0,0 +1,16 @@
+# coding: utf-8
+"""
+Micro-benchmarks for the client's hot paths.
+
+Run with `python -m tests.benchmarks --help`. The suite is not collected by pytest,
+`tests/unit/test_benchmarks.py` only smoke tests it with tiny inputs.
+
+`baseline.json` holds the results of the full suite. Benchmarks of code which existed
+before the performance work were run before it, so changes to the hot paths should show
+their gain with `python -m tests.benchmarks -k <name> --compare tests/benchmarks/baseline.json`.
+New code is benchmarked next to the code it replaced, eg: `journal.insert.100` and
+`journal.insert.connect_per_trade.100`, and `--compare` catches its regressions.
+
+`python -m tests.benchmarks.loop_lag` shows the event loop lag while `AsyncKiteConnect`
+parses large responses inline, in threads and in a process pool.
+"""
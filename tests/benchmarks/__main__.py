@@ -0,0 +1,51 @@
+# coding: utf-8
+"""
+Run the benchmark suite.
+
+    python -m tests.benchmarks                              # run everything
+    python -m tests.benchmarks -k ticker -k historical      # run matching benchmarks
+    python -m tests.benchmarks --save baseline.json         # save a baseline
+    python -m tests.benchmarks --compare baseline.json      # compare with a baseline
+"""
+import sys
+import argparse
+
+from tests.benchmarks import harness
+from tests.benchmarks import suite  # noqa: F401 Registers the benchmarks.
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks", description="Kite Connect benchmarks")
+    parser.add_argument("-k", dest="names", action="append", help="run benchmarks whose name contains this")
+    parser.add_argument("--scale", type=float, default=1.0, help="input size multiplier, eg: 0.1 for a quick run")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark, the best is kept")
+    parser.add_argument("--save", metavar="PATH", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results with a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="slowdown flagged as a regression")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in harness.BENCHMARKS:
+            print(name)
+        return 0
+
+    results = harness.run(args.names, scale=args.scale, min_time=args.min_time, repeat=args.repeat)
+
+    if args.save:
+        harness.save(results, args.save, scale=args.scale)
+
+    if args.compare:
+        baseline = harness.load(args.compare)
+        if baseline.get("scale") != args.scale:
+            print("Warning: baseline was run with --scale {}".format(baseline.get("scale")))
+        print("")
+        if harness.compare(results, baseline, tolerance=args.tolerance):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+# coding: utf-8
+"""Deterministic generators of realistic inputs for the benchmarks."""
+import json
+import random
+import struct
+import datetime
+
+# Segment ids as in `KiteTicker.EXCHANGE_MAP`.
+NSE = 1
+NFO = 2
+INDICES = 9
+
+# Packet sizes sent by the ticker for each mode.
+PACKET_SIZES = {
+    8: "ltp",
+    28: "index quote",
+    32: "index full",
+    44: "quote",
+    184: "full",
+}
+
+# Minute candles in an NSE session, 09:15 to 15:29.
+SESSION_MINUTES = 375
+
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
+
+def _token(i, segment):
+    return ((100000 + i) << 8) | segment
+
+
+def _packet(rng, token, size, now):
+    price = rng.randint(1000, 500000)
+    if size == 8:
+        return struct.pack(">II", token, price)
+
+    if size in (28, 32):
+        packet = struct.pack(">IIIIIII", token, price, price + 500, price - 500, price - 100, price - 200,
+                             rng.randint(-1000, 1000) & 0xffffffff)
+        if size == 32:
+            packet += struct.pack(">I", now)
+        return packet
+
+    packet = struct.pack(
+        ">IIIIIIIIIII", token, price, rng.randint(1, 500), price - 50, rng.randint(10 ** 4, 10 ** 7),
+        rng.randint(10 ** 3, 10 ** 6), rng.randint(10 ** 3, 10 ** 6), price - 100, price + 500, price - 500, price - 200)
+    if size == 184:
+        packet += struct.pack(">IIIII", now - 1, rng.randint(0, 10 ** 6), rng.randint(0, 10 ** 6),
+                              rng.randint(0, 10 ** 6), now)
+        for level in range(10):
+            # Five bids below and five offers above the last price.
+            offset = -(level + 1) * 5 if level < 5 else (level - 4) * 5
+            packet += struct.pack(">IIHxx", rng.randint(1, 10 ** 4), price + offset, rng.randint(1, 50))
+    return packet
+
+
+def ticker_frame(n_tokens, packet_size, seed=1):
+    """
+    Binary websocket frame with `n_tokens` packets of `packet_size` bytes.
+    Index packets (28 and 32 bytes) use index tokens, the rest NSE and NFO tokens.
+    """
+    if packet_size not in PACKET_SIZES:
+        raise ValueError("Unknown packet size {}".format(packet_size))
+
+    rng = random.Random(seed)
+    now = int(datetime.datetime(2024, 1, 1, 10, 0).timestamp())
+    frame = [struct.pack(">H", n_tokens)]
+    for i in range(n_tokens):
+        segment = INDICES if packet_size in (28, 32) else (NSE if i % 2 else NFO)
+        packet = _packet(rng, _token(i, segment), packet_size, now)
+        frame.append(struct.pack(">H", len(packet)))
+        frame.append(packet)
+    return b"".join(frame)
+
+
+def instruments_csv(n_rows=100000, seed=1):
+    """Instruments dump with a realistic mix of equities, futures and options, like `/instruments`."""
+    rng = random.Random(seed)
+    expiries = [datetime.date(2024, 1, 25) + datetime.timedelta(days=7 * w) for w in range(12)]
+    lines = ["instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,"
+             "instrument_type,segment,exchange"]
+
+    for i in range(n_rows):
+        kind = rng.random()
+        token = _token(i, NSE if kind < 0.3 else NFO)
+        name = "SYMBOL{}".format(i % 2000)
+        if kind < 0.3:
+            lines.append("{},{},{},{},0.0,,0.0,0.05,1,EQ,NSE,NSE".format(token, token >> 8, name, name))
+        elif kind < 0.4:
+            expiry = rng.choice(expiries)
+            lines.append("{},{},{}{}FUT,{},0.0,{},0.0,0.05,50,FUT,NFO-FUT,NFO".format(
+                token, token >> 8, name, expiry.strftime("%y%b").upper(), name, expiry.isoformat()))
+        else:
+            expiry = rng.choice(expiries)
+            strike = rng.randint(20, 400) * 50
+            option = "CE" if kind < 0.7 else "PE"
+            lines.append("{},{},{}{}{}{},{},0.0,{},{}.0,0.05,50,{},NFO-OPT,NFO".format(
+                token, token >> 8, name, expiry.strftime("%y%b").upper(), strike, option, name,
+                expiry.isoformat(), strike, option))
+
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def minute_candles(days=250, oi=False, seed=1):
+    """`historical_data` response payload (the `data` field) with `days` sessions of minute candles."""
+    rng = random.Random(seed)
+    candles = []
+    price = 1500.0
+    day = datetime.datetime(2023, 1, 2, 9, 15, tzinfo=IST)
+
+    while len(candles) < days * SESSION_MINUTES:
+        if day.weekday() < 5:
+            for minute in range(SESSION_MINUTES):
+                ts = day + datetime.timedelta(minutes=minute)
+                o = price
+                c = max(1.0, o + rng.gauss(0, 1.5))
+                h = max(o, c) + abs(rng.gauss(0, 0.5))
+                l = min(o, c) - abs(rng.gauss(0, 0.5))
+                candle = [ts.strftime("%Y-%m-%dT%H:%M:%S%z"), round(o, 2), round(h, 2), round(l, 2), round(c, 2),
+                          rng.randint(100, 50000)]
+                if oi:
+                    candle.append(rng.randint(10 ** 5, 10 ** 6))
+                candles.append(candle)
+                price = c
+        day += datetime.timedelta(days=1)
+
+    return {"candles": candles}
+
+
+def quote_response(n_instruments=1000, seed=1):
+    """`quote` response payload (the `data` field) for `n_instruments` instruments in full mode."""
+    rng = random.Random(seed)
+    data = {}
+    for i in range(n_instruments):
+        price = round(rng.uniform(10, 5000), 2)
+        depth = {
+            side: [{"price": round(price + (j if side == "sell" else -j) * 0.05, 2),
+                    "quantity": rng.randint(1, 5000), "orders": rng.randint(1, 30)} for j in range(5)]
+            for side in ("buy", "sell")
+        }
+        data["NSE:SYMBOL{}".format(i)] = {
+            "instrument_token": _token(i, NSE),
+            "timestamp": "2024-01-01 10:00:00",
+            "last_trade_time": "2024-01-01 09:59:59",
+            "last_price": price,
+            "last_quantity": rng.randint(1, 500),
+            "buy_quantity": rng.randint(10 ** 3, 10 ** 6),
+            "sell_quantity": rng.randint(10 ** 3, 10 ** 6),
+            "volume": rng.randint(10 ** 4, 10 ** 7),
+            "average_price": price,
+            "oi": 0,
+            "oi_day_high": 0,
+            "oi_day_low": 0,
+            "net_change": 0,
+            "lower_circuit_limit": round(price * 0.8, 2),
+            "upper_circuit_limit": round(price * 1.2, 2),
+            "ohlc": {"open": price, "high": price, "low": price, "close": price},
+            "depth": depth,
+        }
+    return data
+
+
+def response_body(data):
+    """Wrap a payload in the API envelope and encode it like the server does."""
+    return json.dumps({"status": "success", "data": data}).encode("utf-8")
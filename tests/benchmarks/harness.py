@@ -0,0 +1,138 @@
+# coding: utf-8
+"""Minimal benchmark harness: timing with timeit, allocations with tracemalloc, JSON baselines."""
+import gc
+import json
+import sys
+import timeit
+import platform
+import tracemalloc
+from collections import OrderedDict
+
+# Registered benchmarks by name, in registration order.
+BENCHMARKS = OrderedDict()
+
+
+class Benchmark(object):
+    """
+    A benchmark is a `setup(scale)` function returning the arguments and a `func` called with them.
+    `scale` shrinks the inputs for quick runs (1.0 is the full size).
+    """
+
+    def __init__(self, name, func, setup, group=None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.group = group or name.split(".")[0]
+
+
+def benchmark(name, setup, group=None):
+    """Decorator registering a benchmark."""
+    def deco(func):
+        BENCHMARKS[name] = Benchmark(name, func, setup, group)
+        return func
+    return deco
+
+
+def measure(bench, scale=1.0, min_time=0.2, repeat=5):
+    """
+    Run a benchmark and return its result.
+
+    - `ops_per_sec` from the best of `repeat` timing runs of at least `min_time` seconds each.
+    - `peak_kib` peak memory allocated during a single call.
+    - `allocated_kib` and `blocks` still allocated after a single call (the result and leaks).
+    """
+    args = bench.setup(scale)
+
+    def call():
+        return bench.func(*args)
+
+    # Warm up caches and lazy imports.
+    call()
+
+    timer = timeit.Timer(call)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 10 ** 6:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+    best = min([elapsed] + timer.repeat(repeat=repeat - 1, number=number)) if repeat > 1 else elapsed
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = call()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    stats = after.compare_to(before, "filename")
+    return OrderedDict([
+        ("ops_per_sec", number / best),
+        ("mean_ms", best / number * 1000),
+        ("peak_kib", peak / 1024.0),
+        ("allocated_kib", sum(s.size_diff for s in stats) / 1024.0),
+        ("blocks", sum(s.count_diff for s in stats)),
+    ])
+
+
+def run(names=None, scale=1.0, min_time=0.2, repeat=5, out=sys.stdout):
+    """Run the selected benchmarks (all by default) and return `{name: result}`."""
+    results = OrderedDict()
+    for name, bench in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+
+        results[name] = measure(bench, scale=scale, min_time=min_time, repeat=repeat)
+        if out is not None:
+            r = results[name]
+            out.write("{:<48} {:>14,.1f} ops/s {:>12.3f} ms {:>12,.1f} KiB peak {:>10,} blocks\n".format(
+                name, r["ops_per_sec"], r["mean_ms"], r["peak_kib"], r["blocks"]))
+            out.flush()
+    return results
+
+
+def save(results, path, scale=1.0):
+    """Save results as a baseline."""
+    doc = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scale": scale,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=0.1, out=sys.stdout):
+    """
+    Compare results with a baseline. Returns the names of benchmarks which got slower
+    by more than `tolerance` (a fraction of the baseline ops/sec).
+    """
+    regressions = []
+    base = baseline["results"]
+    for name, r in results.items():
+        if name not in base:
+            continue
+
+        ratio = r["ops_per_sec"] / base[name]["ops_per_sec"]
+        mem = r["peak_kib"] - base[name]["peak_kib"]
+        flag = ""
+        if ratio < 1 - tolerance:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif ratio > 1 + tolerance:
+            flag = "faster"
+
+        if out is not None:
+            out.write("{:<48} {:>8.2f}x {:>+12,.1f} KiB peak  {}\n".format(name, ratio, mem, flag))
+    return regressions
@@ -0,0 +1,67 @@
+# coding: utf-8
+"""
+Event loop lag while `AsyncKiteConnect` parses large responses.
+
+    python -m tests.benchmarks.loop_lag
+    python -m tests.benchmarks.loop_lag --scale 0.1
+
+Parses an instruments dump and a year of minute candles on the event loop, in the
+default thread pool and in a process pool, and prints the lag seen by the loop.
+"""
+import sys
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from kiteconnect import AsyncKiteConnect
+from kiteconnect.utils.monitor import LoopLagMonitor
+from kiteconnect.utils.parsing import parse_instruments, format_historical
+
+from tests.benchmarks import generators
+
+
+async def measure(kite, parser, data):
+    """Parse `data` once and return (seconds taken, lag stats)."""
+    async with LoopLagMonitor(interval=0.005) as monitor:
+        started = time.perf_counter()
+        await kite._parse(parser, data)
+        elapsed = time.perf_counter() - started
+        # One more sample after the parse returns.
+        await asyncio.sleep(0.01)
+    return elapsed, monitor.stats()
+
+
+async def run(scale, out):
+    payloads = [
+        ("instruments.100k", parse_instruments, generators.instruments_csv(max(1, int(100000 * scale)))),
+        ("historical.minute.1y", format_historical, generators.minute_candles(days=max(1, int(250 * scale)))),
+    ]
+
+    with ProcessPoolExecutor(max_workers=1) as processes:
+        modes = [
+            ("inline", AsyncKiteConnect(api_key="benchmark", parse_offload_rows=None)),
+            ("threads", AsyncKiteConnect(api_key="benchmark")),
+            ("processes", AsyncKiteConnect(api_key="benchmark", parse_executor=processes)),
+        ]
+        # Start the pool's worker before timing.
+        await asyncio.get_running_loop().run_in_executor(processes, len, "")
+
+        for name, parser, data in payloads:
+            for mode, kite in modes:
+                elapsed, stats = await measure(kite, parser, data)
+                out.write("{:<24} {:<10} {:>10.1f} ms parse {:>10.1f} ms max lag {:>10.1f} ms p99 lag\n".format(
+                    name, mode, elapsed * 1000, stats["max_ms"], stats["p99_ms"]))
+                out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks.loop_lag", description=__doc__.split("\n")[1])
+    parser.add_argument("--scale", type=float, default=1.0, help="input size multiplier, eg: 0.1 for a quick run")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.scale, sys.stdout))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
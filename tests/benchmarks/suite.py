@@ -0,0 +1,637 @@
+# coding: utf-8
+"""
+Benchmarks of the client's parsing hot paths, the JSON codec, the technical indicators,
+the candle cache and trade journal, the realtime data path and the package import time.
+
+Features which replaced code are benchmarked next to what they replaced, eg:
+`cache.get.minute.1y` and `cache.read_json.minute.1y`, the JSON cache it replaced.
+
+Importing this module registers the benchmarks with the harness.
+"""
+import io
+import os
+import sys
+import json
+import sqlite3
+import asyncio
+import datetime
+import tempfile
+import itertools
+import subprocess
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from kiteconnect import KiteConnect, KiteTicker
+from kiteconnect.utils import codec
+from kiteconnect.utils.lru import LRUCache
+from kiteconnect.utils.sqlite import SQLiteStore
+from kiteconnect import technical_indicators as ti
+from kiteconnect import streaming_indicators as si
+from kiteconnect import matrix_indicators as mi
+from kiteconnect import indicator_pipeline as ip
+from kiteconnect import trade_journal
+from kiteconnect.bars import BarBuilder
+from kiteconnect.data_cache import CandleStore
+from kiteconnect.resample import resample
+from kiteconnect.window_store import WindowStore
+from kiteconnect.realtime_data import RealtimeMarketDataProcessor
+from kiteconnect.backtesting.core import run_backtest
+
+from tests.benchmarks import generators
+from tests.benchmarks.harness import benchmark
+
+# Max instruments a single websocket connection can subscribe to.
+MAX_TOKENS = 3000
+
+# Instruments of the F&O universe a client streams, over the three websocket connections allowed.
+FNO_TOKENS = 3 * MAX_TOKENS
+
+_kite = KiteConnect(api_key="benchmark")
+_ticker = KiteTicker(api_key="benchmark", access_token="benchmark")
+
+
+def _scaled(n, scale):
+    return max(1, int(n * scale))
+
+
+_tmp = []
+
+
+def _tmpdir():
+    """New directory for the files of a benchmark, deleted on exit."""
+    if not _tmp:
+        _tmp.append(tempfile.TemporaryDirectory(prefix="kite-benchmarks-"))
+    return tempfile.mkdtemp(dir=_tmp[0].name)
+
+
+# ----------------------------------------------------------------
+# Ticker
+# ----------------------------------------------------------------
+def _register_ticker(packet_size, n_tokens):
+    name = "ticker.parse_binary.{}b.{}".format(packet_size, n_tokens)
+
+    def setup(scale):
+        return (generators.ticker_frame(_scaled(n_tokens, scale), packet_size),)
+
+    benchmark(name, setup, group="ticker")(_ticker._parse_binary)
+
+
+for _size in sorted(generators.PACKET_SIZES):
+    for _n in (1, 100, MAX_TOKENS):
+        _register_ticker(_size, _n)
+
+
+# ----------------------------------------------------------------
+# REST response parsing
+# ----------------------------------------------------------------
+def _instruments(scale):
+    return (generators.instruments_csv(_scaled(100000, scale)),)
+
+
+@benchmark("rest.parse_instruments.100k", _instruments)
+def parse_instruments(body):
+    return _kite._parse_instruments(body)
+
+
+def _year_of_minute_candles(scale):
+    return (generators.minute_candles(days=_scaled(250, scale)),)
+
+
+@benchmark("rest.format_historical.minute.1y", _year_of_minute_candles)
+def format_historical(data):
+    return _kite._format_historical(data)
+
+
+def _quotes(scale):
+    return (generators.quote_response(_scaled(1000, scale)),)
+
+
+@benchmark("rest.format_response.quote.1000", _quotes)
+def format_quote(data):
+    # Same post processing as `KiteConnect.quote()`. Copied since it converts timestamps in place.
+    data = {key: dict(value) for key, value in data.items()}
+    return {key: _kite._format_response(data[key]) for key in data}
+
+
+# ----------------------------------------------------------------
+# JSON codec
+# ----------------------------------------------------------------
+def _historical_body(scale):
+    return (generators.response_body(generators.minute_candles(days=_scaled(250, scale))),)
+
+
+def _quote_body(scale):
+    return (generators.response_body(generators.quote_response(_scaled(1000, scale))),)
+
+
+@benchmark("codec.loads.historical.1y", _historical_body)
+def codec_loads_historical(body):
+    return codec.loads(body)
+
+
+@benchmark("codec.loads.quote.1000", _quote_body)
+def codec_loads_quote(body):
+    return codec.loads(body)
+
+
+@benchmark("codec.stdlib_json.loads.quote.1000", _quote_body)
+def stdlib_loads_quote(body):
+    return json.loads(body)
+
+
+# ----------------------------------------------------------------
+# Technical indicators
+# ----------------------------------------------------------------
+def _candles_df(scale):
+    records = _kite._format_historical(generators.minute_candles(days=_scaled(250, scale)))
+    return pd.DataFrame(records)
+
+
+def _close_series(scale):
+    return (_candles_df(scale)["close"],)
+
+
+def _ohlc_df(scale):
+    return (_candles_df(scale),)
+
+
+def _tick_window(scale):
+    # Window kept by `RealtimeMarketDataProcessor`, recomputed on every tick.
+    return (deque(_candles_df(0.01)["close"].tolist()[-26:], maxlen=26),)
+
+
+@benchmark("indicators.sma.1y", _close_series)
+def sma_year(close):
+    return ti.calculate_sma(close, 20)
+
+
+@benchmark("indicators.rsi.1y", _close_series)
+def rsi_year(close):
+    return ti.calculate_rsi(close, 14)
+
+
+@benchmark("indicators.macd.1y", _ohlc_df)
+def macd_year(df):
+    return ti.calculate_macd(df)
+
+
+@benchmark("indicators.bollinger.1y", _ohlc_df)
+def bollinger_year(df):
+    return ti.calculate_bollinger_bands(df)
+
+
+@benchmark("indicators.stochastic.1y", _ohlc_df)
+def stochastic_year(df):
+    return ti.calculate_stochastic_oscillator(df)
+
+
+@benchmark("indicators.atr.1y", _ohlc_df)
+def atr_year(df):
+    return ti.calculate_atr(df)
+
+
+@benchmark("indicators.sma.per_tick", _tick_window)
+def sma_tick(window):
+    return ti.calculate_sma(window, 20)
+
+
+@benchmark("indicators.rsi.per_tick", _tick_window)
+def rsi_tick(window):
+    return ti.calculate_rsi(window, 14)
+
+
+def _streaming(scale):
+    indicators = [si.SMA(20), si.RSI(14), si.MACD(), si.BollingerBands()]
+    candle_indicators = [si.StochasticOscillator(), si.ATR()]
+    for price in _candles_df(0.01)["close"].tolist()[-26:]:
+        for indicator in indicators:
+            indicator.update(price)
+        for indicator in candle_indicators:
+            indicator.update(price + 1, price - 1, price)
+    return (indicators, candle_indicators)
+
+
+@benchmark("indicators.streaming.per_tick", _streaming)
+def streaming_tick(indicators, candle_indicators):
+    # All six indicators, against `indicators.*.per_tick` recomputing one over the window.
+    for indicator in indicators:
+        indicator.update(100.0)
+    for indicator in candle_indicators:
+        indicator.update(101.0, 99.0, 100.0)
+
+
+# ----------------------------------------------------------------
+# Backtesting
+# ----------------------------------------------------------------
+def _minute_records(scale):
+    return (_candles_df(scale).to_dict("records"),)
+
+
+def _last_close_strategy(historical_data):
+    # Reads the current bar only, so the run measures the engine's cost per bar.
+    return [] if historical_data[-1]["close"] > 0 else [{"action": "BUY"}]
+
+
+@benchmark("backtest.run_backtest.minute.1y", _minute_records)
+def backtest_year(records):
+    return run_backtest(records, _last_close_strategy)
+
+
+# ----------------------------------------------------------------
+# Candle cache
+# ----------------------------------------------------------------
+TOKEN = 256265
+
+
+class _FakeKite(object):
+    """`historical_data` answering from a generated payload, parsed like a response."""
+
+    def __init__(self, payload):
+        self.candles = payload["candles"]
+        self.dates = [candle[0][:19] for candle in self.candles]
+
+    def historical_data(self, instrument_token, from_date, to_date, interval, continuous=False, oi=False):
+        lo = bisect_left(self.dates, from_date.strftime("%Y-%m-%dT%H:%M:%S"))
+        hi = bisect_right(self.dates, to_date.strftime("%Y-%m-%dT%H:%M:%S"))
+        return _kite._format_historical({"candles": self.candles[lo:hi]})
+
+
+def _candle_store(records):
+    root = _tmpdir()
+    store = CandleStore(os.path.join(root, "cache.db"), os.path.join(root, "candles"), memory=LRUCache(2 ** 30))
+    store.put(TOKEN, "minute", records, records[0]["date"], records[-1]["date"])
+    return store
+
+
+def _cached_year(scale):
+    records = _kite._format_historical(generators.minute_candles(days=_scaled(250, scale)))
+    return (_candle_store(records), records[0]["date"], records[-1]["date"])
+
+
+def _fetched_year(scale):
+    store, from_date, to_date = _cached_year(scale)
+    store.fetch(None, TOKEN, from_date, to_date, "minute")
+    return (store, from_date, to_date)
+
+
+def _json_cache(scale):
+    conn = sqlite3.connect(os.path.join(_tmpdir(), "cache.db"))
+    conn.execute("CREATE TABLE historical_data (instrument_token INTEGER, interval TEXT, data TEXT, "
+                 "PRIMARY KEY (instrument_token, interval))")
+    conn.execute("INSERT INTO historical_data VALUES (?, ?, ?)",
+                 (TOKEN, "minute", _candles_df(scale).set_index("date").to_json(orient="records")))
+    conn.commit()
+    return (conn,)
+
+
+@benchmark("cache.files.read.minute.1y", _cached_year)
+def cache_files_read(store, from_date, to_date):
+    return store.files.read(TOKEN, "minute", int(from_date.timestamp()), int(to_date.timestamp()))
+
+
+@benchmark("cache.get.minute.1y", _cached_year)
+def cache_get(store, from_date, to_date):
+    return store.get(TOKEN, "minute", from_date, to_date)
+
+
+@benchmark("cache.fetch.memory_hit.minute.1y", _fetched_year)
+def cache_memory_hit(store, from_date, to_date):
+    return store.fetch(None, TOKEN, from_date, to_date, "minute")
+
+
+@benchmark("cache.read_json.minute.1y", _json_cache)
+def cache_read_json(conn):
+    # The cache `CandleStore` replaced, a JSON document per range fetched.
+    data = conn.execute("SELECT data FROM historical_data WHERE instrument_token = ? AND interval = ?",
+                        (TOKEN, "minute")).fetchone()[0]
+    return pd.read_json(io.StringIO(data))
+
+
+def _year_and_a_day(scale):
+    payload = generators.minute_candles(days=_scaled(250, scale) + 1)
+    records = _kite._format_historical(payload)
+    cached = records[:-generators.SESSION_MINUTES]
+    return _candle_store(cached), _FakeKite(payload), records[0]["date"], cached[-1]["date"], records[-1]["date"]
+
+
+def _extend(scale):
+    store, kite, from_date, cached_until, to_date = _year_and_a_day(scale)
+    return (store, kite, from_date, int(cached_until.timestamp()), to_date)
+
+
+def _refetch(scale):
+    _, kite, from_date, _, to_date = _year_and_a_day(scale)
+    return (_json_cache(scale)[0], kite, from_date, to_date)
+
+
+@benchmark("cache.fetch.extend_1d.minute.1y", _extend)
+def cache_extend(store, kite, from_date, cached_until, to_date):
+    # A year cached, the next day is fetched. The day is then forgotten so that each call fetches it.
+    df = store.fetch(kite, TOKEN, from_date, to_date, "minute")
+    store.db.execute("UPDATE candle_coverage SET to_ts = ? WHERE instrument_token = ?", (cached_until, TOKEN))
+    store.memory.invalidate()
+    return df
+
+
+@benchmark("cache.refetch_json.minute.1y", _refetch)
+def cache_refetch_json(conn, kite, from_date, to_date):
+    # The JSON cache missed any range not fetched as a whole before, so the year was fetched again.
+    df = pd.DataFrame(kite.historical_data(TOKEN, from_date, to_date, "minute")).set_index("date")
+    conn.execute("INSERT OR REPLACE INTO historical_data VALUES (?, ?, ?)",
+                 (TOKEN, "minute", df.to_json(orient="records")))
+    conn.commit()
+    return df
+
+
+# ----------------------------------------------------------------
+# Resampling
+# ----------------------------------------------------------------
+def _minute_columns(scale):
+    store, from_date, to_date = _cached_year(scale)
+    return (store.columns(TOKEN, "minute", from_date, to_date),)
+
+
+def _minute_frame(scale):
+    return (_candles_df(scale).set_index("date"),)
+
+
+@benchmark("resample.minute.1y.15minute", _minute_columns)
+def resample_year(columns):
+    return resample(columns, "15minute")
+
+
+@benchmark("resample.pandas.minute.1y.15minute", _minute_frame)
+def pandas_resample_year(df):
+    # Buckets anchored at 09:15 like `resample`.
+    return df.resample("15min", origin="start_day", offset="15min").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}).dropna()
+
+
+# ----------------------------------------------------------------
+# Trade journal
+# ----------------------------------------------------------------
+_trade_ids = itertools.count()
+
+
+def _trades(n):
+    """`n` trades with ids not journaled before, as rows of `trade_journal.INSERT_TRADE`."""
+    rows = []
+    for _ in range(n):
+        i = next(_trade_ids)
+        trade = {"order_id": "o{}".format(i), "trade_id": "t{}".format(i), "tradingsymbol": "INFY",
+                 "exchange": "NSE", "transaction_type": "BUY", "quantity": 1, "price": 1500.0,
+                 "trade_time": "2024-01-01 10:00:00", "pnl": 0.0, "strategy_tag": "benchmark"}
+        rows.append(tuple(trade.get(column) for column in trade_journal.TRADE_COLUMNS))
+    return rows
+
+
+def _journal(scale):
+    return (SQLiteStore(os.path.join(_tmpdir(), "trades.db"), trade_journal.SCHEMA), _scaled(100, scale))
+
+
+def _journal_file(scale):
+    path = os.path.join(_tmpdir(), "trades.db")
+    conn = sqlite3.connect(path)
+    for statement in trade_journal.SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+    return (path, _scaled(100, scale))
+
+
+@benchmark("journal.insert.100", _journal)
+def journal_insert(store, n):
+    # A trade at a time as they are made, committed by one flush.
+    for row in _trades(n):
+        store.write(trade_journal.INSERT_TRADE, row)
+    store.flush()
+
+
+@benchmark("journal.insert.connect_per_trade.100", _journal_file)
+def journal_insert_per_trade(path, n):
+    # The journal before `SQLiteStore`, a connection and a commit per trade.
+    for row in _trades(n):
+        conn = sqlite3.connect(path)
+        conn.execute(trade_journal.INSERT_TRADE, row)
+        conn.commit()
+        conn.close()
+
+
+# ----------------------------------------------------------------
+# Realtime
+# ----------------------------------------------------------------
+# Ticks of a bar in progress.
+_SESSION_TIME = datetime.datetime(2024, 1, 1, 10, 0, tzinfo=generators.IST)
+
+
+def _ticks(n_tokens):
+    ticks = _ticker._parse_binary(generators.ticker_frame(n_tokens, 184))
+    for tick in ticks:
+        tick["exchange_timestamp"] = _SESSION_TIME
+    return ticks
+
+
+def _bar_builder(scale):
+    builder = BarBuilder(["minute", "5minute", "15minute"])
+    ticks = _ticks(_scaled(MAX_TOKENS, scale))
+    builder.update_many(ticks)
+    return (builder, ticks)
+
+
+@benchmark("bars.update_many.3000", _bar_builder)
+def bars_update(builder, ticks):
+    # A tick of each instrument into its bars of three intervals.
+    return builder.update_many(ticks)
+
+
+def _register_processor(n_tokens):
+    name = "realtime.process_ticks.{}".format(n_tokens)
+
+    def setup(scale):
+        ticks = _ticks(_scaled(n_tokens, scale))
+        processor = RealtimeMarketDataProcessor(alert_callback=len)
+        loop = asyncio.new_event_loop()
+        # Past the warmup, so that signals are evaluated.
+        for _ in range(processor.warmup):
+            loop.run_until_complete(processor.process_ticks(ticks))
+        return (loop, processor, ticks)
+
+    def process_ticks(loop, processor, ticks):
+        loop.run_until_complete(processor.process_ticks(ticks))
+
+    benchmark(name, setup, group="realtime")(process_ticks)
+
+
+# A tick of every instrument. The F&O universe keeps up on one core at 1 op/s or more.
+for _n in (500, FNO_TOKENS):
+    _register_processor(_n)
+
+
+def _processors(scale):
+    ticks = _ticks(_scaled(500, scale))
+    processors = [RealtimeMarketDataProcessor(tick["instrument_token"], alert_callback=len) for tick in ticks]
+    loop = asyncio.new_event_loop()
+    for processor, tick in zip(processors, ticks):
+        for _ in range(processor.warmup):
+            loop.run_until_complete(processor.process_tick(tick))
+    return (loop, processors, ticks)
+
+
+@benchmark("realtime.process_ticks.per_instrument.500", _processors)
+def per_instrument_processors(loop, processors, ticks):
+    # A processor per instrument as before, each seeing every tick.
+    async def run():
+        for processor in processors:
+            await processor.process_ticks(ticks)
+    loop.run_until_complete(run())
+
+
+# ----------------------------------------------------------------
+# Rolling windows
+# ----------------------------------------------------------------
+def _window_bars(scale):
+    rng = np.random.default_rng(1)
+    close = rng.uniform(100, 5000, _scaled(MAX_TOKENS, scale))
+    samples = np.column_stack([close, close + 1, close - 1, close, rng.integers(100, 50000, len(close))])
+    bars = [dict(zip(("open", "high", "low", "close", "volume"), sample)) for sample in samples.tolist()]
+    return list(range(len(bars))), bars, samples
+
+
+def _windows(scale):
+    tokens, bars, samples = _window_bars(scale)
+    windows = WindowStore(26, capacity=len(tokens))
+    for _ in range(windows.window):
+        windows.append_many(tokens, samples)
+    return (windows, tokens, bars, samples)
+
+
+def _deques(scale):
+    # `RealtimeMarketDataProcessor.data_history` of each instrument before `WindowStore`.
+    tokens, bars, _ = _window_bars(scale)
+    history = dict((token, deque([dict(bar) for _ in range(26)], maxlen=26)) for token, bar in zip(tokens, bars))
+    return (history, tokens, bars)
+
+
+@benchmark("window.append.3000", _windows)
+def window_append(windows, tokens, bars, samples):
+    for token, bar in zip(tokens, bars):
+        windows.append(token, bar)
+
+
+@benchmark("window.append_many.3000", _windows)
+def window_append_many(windows, tokens, bars, samples):
+    windows.append_many(tokens, samples)
+
+
+@benchmark("window.matrix.3000", _windows)
+def window_matrix(windows, tokens, bars, samples):
+    return windows.matrix("close")
+
+
+@benchmark("window.deque.append.3000", _deques)
+def deque_append(history, tokens, bars):
+    for token, bar in zip(tokens, bars):
+        history[token].append(dict(bar))
+
+
+@benchmark("window.deque.matrix.3000", _deques)
+def deque_matrix(history, tokens, bars):
+    return np.array([[bar["close"] for bar in window] for window in history.values()])
+
+
+# ----------------------------------------------------------------
+# Indicators of many instruments
+# ----------------------------------------------------------------
+def _universe(scale):
+    # A session of minute candles of 500 instruments.
+    rng = np.random.default_rng(1)
+    close = 1000 + np.cumsum(rng.normal(0, 1.5, (_scaled(500, scale), generators.SESSION_MINUTES)), axis=1)
+    spread = np.abs(rng.normal(0, 0.5, close.shape))
+    return (close + spread, close - spread, close)
+
+
+def _universe_frames(scale):
+    return ([pd.DataFrame({"high": h, "low": l, "close": c}) for h, l, c in zip(*_universe(scale))],)
+
+
+@benchmark("matrix.all.500x1d", _universe)
+def matrix_all(high, low, close):
+    return [mi.sma(close, 20), mi.rsi(close, 14), mi.macd(close), mi.bollinger_bands(close),
+            mi.stochastic_oscillator(high, low, close), mi.atr(high, low, close)]
+
+
+@benchmark("matrix.loop.all.500x1d", _universe_frames)
+def matrix_loop(frames):
+    # The full series functions, an instrument at a time.
+    return [[ti.sma_series(df["close"], 20), ti.rsi_series(df["close"], 14), ti.macd_series(df),
+             ti.bollinger_bands_series(df), ti.stochastic_oscillator_series(df), ti.atr_series(df)]
+            for df in frames]
+
+
+# ----------------------------------------------------------------
+# Indicator pipeline
+# ----------------------------------------------------------------
+def _pipeline():
+    close, high, low = ip.column("close"), ip.column("high"), ip.column("low")
+    return ip.Pipeline(dict(
+        sma=ip.sma(close, 20),
+        rsi=ip.rsi(close, 14),
+        atr=ip.atr(high, low, close, 14),
+        **ip.macd(close),
+        **ip.bollinger_bands(close, 20),
+        **ip.stochastic_oscillator(high, low, close),
+    ))
+
+
+def _pipeline_year(scale):
+    return (_pipeline(), _candles_df(scale))
+
+
+def _pipeline_stream(scale):
+    stream = _pipeline().stream()
+    for bar in _candles_df(0.01)[["high", "low", "close"]].to_dict("records")[-26:]:
+        stream.update(bar)
+    return (stream, {"high": 101.0, "low": 99.0, "close": 100.0})
+
+
+@benchmark("pipeline.run.1y", _pipeline_year)
+def pipeline_year(pipeline, df):
+    return pipeline.run(df)
+
+
+@benchmark("indicators.series.all.1y", _ohlc_df)
+def series_year(df):
+    # The outputs of `pipeline.run.1y`, an indicator at a time.
+    return [ti.sma_series(df["close"], 20), ti.rsi_series(df["close"], 14), ti.atr_series(df), ti.macd_series(df),
+            ti.bollinger_bands_series(df), ti.stochastic_oscillator_series(df)]
+
+
+@benchmark("pipeline.stream.per_tick", _pipeline_stream)
+def pipeline_tick(stream, bar):
+    # Against `indicators.streaming.per_tick`, the same indicators updated one by one.
+    return stream.update(bar)
+
+
+# ----------------------------------------------------------------
+# Import time
+# ----------------------------------------------------------------
+# Each run starts a fresh interpreter, `import.python` is the interpreter startup alone.
+_IMPORTS = {
+    "import.python": "pass",
+    "import.kiteconnect": "from kiteconnect import KiteConnect",
+    "import.kiteconnect.all": "import kiteconnect; [getattr(kiteconnect, n) for n in kiteconnect.__all__]",
+}
+
+
+def _register_import(name, code):
+    def setup(scale):
+        return ([sys.executable, "-c", code],)
+
+    benchmark(name, setup, group="import")(subprocess.check_call)
+
+
+for _name, _code in _IMPORTS.items():
+    _register_import(_name, _code)
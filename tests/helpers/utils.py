@@ -60,6 +60,10 @@ def full_path(rel_path):
     )
 
 
+# Directory of the mock responses, eg: for `MockKiteServer`.
+responses_dir = full_path(responses_path["base"])
+
+
 def get_response(key):
     """Get mock response based on route."""
     path = full_path(responses_path["base"] + responses_path[key])
@@ -0,0 +1,147 @@
+# coding: utf-8
+"""Tests for the event-driven backtest engine and the `run_backtest` compatibility shim."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kiteconnect import backtesting
+from kiteconnect.backtesting.core import run_backtest
+from kiteconnect.backtesting.engine import BacktestEngine, Bars, SimulatedBroker, Strategy
+from kiteconnect.technical_indicators import sma_series
+
+
+@pytest.fixture(scope="module")
+def candles():
+    rng = np.random.default_rng(2)
+    close = 100 + rng.standard_normal(300).cumsum()
+    return [{"date": i, "open": c, "high": c + 1, "low": c - 1, "close": c, "volume": 10} for i, c in enumerate(close)]
+
+
+def crossover(historical_data):
+    # A strategy written for the slicing `run_backtest`.
+    if len(historical_data) < 21:
+        return []
+    closes = [d["close"] for d in historical_data[-21:]]
+    short, long_ = sum(closes[-5:]) / 5, sum(closes[-20:]) / 20
+    prev_short, prev_long = sum(closes[-6:-1]) / 5, sum(closes[-21:-1]) / 20
+    action = None
+    if short > long_ and prev_short <= prev_long:
+        action = "BUY"
+    elif short < long_ and prev_short >= prev_long:
+        action = "SELL"
+    return [{"date": historical_data[-1]["date"], "action": action, "price": historical_data[-1]["close"],
+             "quantity": 1}] if action else []
+
+
+class Crossover(Strategy):
+    def on_start(self, bars):
+        self.short = sma_series(bars.columns["close"], 5).to_numpy()
+        self.long = sma_series(bars.columns["close"], 20).to_numpy()
+
+    def on_bar(self, cursor, broker):
+        i = cursor.index
+        if i < 20:
+            return
+        if self.short[i] > self.long[i] and self.short[i - 1] <= self.long[i - 1]:
+            broker.buy()
+        elif self.short[i] < self.long[i] and self.short[i - 1] >= self.long[i - 1]:
+            broker.sell()
+
+
+def test_callable_strategy_sees_every_prefix(candles):
+    seen = []
+
+    def strategy(historical_data):
+        seen.append((len(historical_data), historical_data[-1]["date"], list(historical_data)[0]["date"]))
+        return []
+
+    assert run_backtest(candles[:5], strategy) == []
+    assert seen == [(n, n - 1, 0) for n in range(1, 6)]
+    assert backtesting.run_backtest is run_backtest
+
+
+def test_prefix_matches_slicing(candles):
+    def strategy(historical_data):
+        n = len(historical_data)
+        expected = candles[:n]
+        assert historical_data[-3:] == expected[-3:] and historical_data[::7] == expected[::7]
+        assert historical_data[0] is expected[0] and historical_data[-1] is expected[-1]
+        with pytest.raises(IndexError):
+            historical_data[n]
+        return []
+
+    run_backtest(candles[:30], strategy)
+
+
+def test_event_strategy_matches_callable_strategy(candles):
+    trades = run_backtest(candles, crossover)
+    assert trades
+    assert BacktestEngine(candles, Crossover()).run() == trades
+    assert BacktestEngine(pd.DataFrame(candles), Crossover()).run() == trades
+
+
+def test_cursor_columns_are_read_only_views(candles):
+    bars = Bars(candles)
+
+    class Check(Strategy):
+        def on_bar(self, cursor, broker):
+            closes = cursor["close"]
+            assert len(closes) == len(cursor) == cursor.index + 1
+            assert np.shares_memory(closes, bars.columns["close"])
+            assert cursor.value("close") == closes[-1] == cursor.bar["close"]
+            assert cursor.value("close", cursor.index + 1) is None
+            with pytest.raises(ValueError):
+                closes[0] = 0
+
+    BacktestEngine(bars, Check()).run()
+
+
+def test_simulated_broker(candles):
+    broker = SimulatedBroker(initial_capital=1000.0, commission=1.0)
+
+    class BuyThenSell(Strategy):
+        def on_bar(self, cursor, broker):
+            if cursor.index == 0:
+                broker.buy(2)
+            elif cursor.index == 1:
+                broker.sell(1, price=50.0)
+
+    trades = BacktestEngine(candles[:3], BuyThenSell(), broker).run()
+    assert [(t["date"], t["action"], t["price"], t["quantity"]) for t in trades] == [
+        (0, "BUY", candles[0]["close"], 2), (1, "SELL", 50.0, 1)]
+    assert broker.position == 1
+    assert broker.cash == pytest.approx(1000.0 - 2 * candles[0]["close"] + 50.0 - 2.0)
+    assert broker.equity() == pytest.approx(broker.cash + candles[2]["close"])
+    with pytest.raises(ValueError):
+        broker.submit("HOLD")
+    with pytest.raises(RuntimeError):
+        SimulatedBroker().buy()
+
+
+def test_callable_strategy_trades_are_kept_as_returned(candles):
+    # Legacy trades may lack fields the broker's accounting needs, or use other actions.
+    def strategy(historical_data):
+        n = len(historical_data)
+        if n == 1:
+            return [{"date": 0, "action": "BUY", "price": None}]
+        if n == 2:
+            return [{"date": 1, "action": "EXIT", "price": 1.0, "quantity": 1}]
+        return []
+
+    engine = BacktestEngine(candles[:3], strategy)
+    assert engine.run() == [{"date": 0, "action": "BUY", "price": None},
+                            {"date": 1, "action": "EXIT", "price": 1.0, "quantity": 1}]
+    assert engine.broker.position == 0
+    assert engine.broker.cash == engine.broker.initial_capital
+
+
+def test_bars_columns_of_records_with_missing_fields():
+    records = [{"date": 0, "close": 1.0, "oi": 5}, {"date": 1, "close": 2.0}]
+    bars = Bars(records)
+    assert not bars.columns.arrays
+    assert list(bars.columns) == ["date", "close", "oi"]
+    assert list(bars.columns["close"]) == [1.0, 2.0]
+    assert list(bars.columns["oi"]) == [5, None]
+    assert list(bars.columns.arrays) == ["close", "oi"]
+    with pytest.raises(KeyError):
+        bars.columns["volume"]
@@ -0,0 +1,69 @@
+# coding: utf-8
+"""Tests for building bars from ticks."""
+import datetime
+
+from kiteconnect.bars import BarBuilder
+
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
+
+def at(hour, minute, second=0, day=2):
+    return datetime.datetime(2024, 1, day, hour, minute, second, tzinfo=IST)
+
+
+def tick(when, price, volume, token=1):
+    return {"instrument_token": token, "last_price": price, "volume_traded": volume, "exchange_timestamp": when}
+
+
+def test_builds_bars_of_several_intervals():
+    closed = []
+    builder = BarBuilder(["minute", "5minute"], on_bar=closed.append)
+    builder.update_many([
+        tick(at(9, 15, 1), 100, 1000),
+        tick(at(9, 15, 30), 102, 1010),
+        tick(at(9, 15, 59), 99, 1015),
+        tick(at(9, 16, 0), 101, 1030, token=2),
+        tick(at(9, 16, 10), 101, 1030),
+    ])
+
+    assert [(b.interval, b.date) for b in closed] == [("minute", at(9, 15))]
+    bar = closed[0]
+    # Volume of the first tick was traded before it.
+    assert (bar.open, bar.high, bar.low, bar.close, bar.volume, bar.ticks) == (100, 102, 99, 99, 15, 3)
+
+    five = builder.current(1, "5minute")
+    assert (five.open, five.high, five.low, five.close, five.volume) == (100, 102, 99, 101, 30)
+
+    # A tick of a bar already closed.
+    builder.update(tick(at(9, 15, 58), 150, 1012))
+    assert builder.late == 1 and builder.current(1, "minute").high == 101
+
+    builder.update(tick(at(9, 20, 0), 103, 1100))
+    assert [(b.interval, b.date) for b in closed[1:]] == [("minute", at(9, 16)), ("5minute", at(9, 15))]
+    assert closed[-1].volume == 30
+
+
+def test_bars_close_on_timer_and_are_saved():
+    class Store(object):
+        def __init__(self):
+            self.added = []
+
+        def add(self, token, interval, candles):
+            self.added.append((token, interval, candles))
+
+    store = Store()
+    builder = BarBuilder(["minute", "60minute"], store=store, save_interval=0, grace=1)
+    builder.update(tick(at(15, 10), 100, 10))
+    builder.update(tick(at(15, 29, 50), 101, 20))
+
+    assert builder.close_due(at(15, 30).timestamp()) == []
+    closed = builder.close_due(at(15, 30, 1).timestamp())
+    # The last hourly bar ends with the session.
+    assert sorted((b.interval, b.date) for b in closed) == [("60minute", at(15, 15)), ("minute", at(15, 29))]
+    saved = sorted((interval, candle["date"]) for _, interval, candles in store.added for candle in candles)
+    assert saved == [("60minute", at(14, 15)), ("60minute", at(15, 15)), ("minute", at(15, 10)), ("minute", at(15, 29))]
+
+    # Bars which span the session close end with it.
+    builder.update(tick(at(15, 45), 100, 30))
+    assert builder.current(1, "60minute") is None
+    assert builder.current(1, "minute").date == at(15, 45)
@@ -0,0 +1,51 @@
+# coding: utf-8
+"""Smoke tests for the benchmark suite, run with tiny inputs."""
+import io
+
+from kiteconnect import KiteTicker
+
+from tests.benchmarks import generators, harness
+from tests.benchmarks import suite  # noqa: F401
+
+
+def test_ticker_frames_parse():
+    ticker = KiteTicker("<API-KEY>", "<ACCESS-TOKEN>")
+    for size in generators.PACKET_SIZES:
+        ticks = ticker._parse_binary(generators.ticker_frame(10, size))
+        assert len(ticks) == 10
+
+    full = ticker._parse_binary(generators.ticker_frame(1, 184))[0]
+    assert len(full["depth"]["buy"]) == 5
+    assert full["depth"]["buy"][0]["price"] < full["last_price"] < full["depth"]["sell"][0]["price"]
+
+
+def test_generated_rest_payloads_parse(kiteconnect):
+    instruments = kiteconnect._parse_instruments(generators.instruments_csv(100))
+    assert len(instruments) == 100
+    assert {i["instrument_type"] for i in instruments} == {"EQ", "FUT", "CE", "PE"}
+
+    candles = kiteconnect._format_historical(generators.minute_candles(days=2))
+    assert len(candles) == 2 * generators.SESSION_MINUTES
+    assert candles[0]["date"].hour == 9 and candles[0]["date"].minute == 15
+
+
+def test_every_benchmark_runs():
+    # Import benchmarks start interpreters, `test_imports` covers them.
+    for bench in harness.BENCHMARKS.values():
+        if bench.group != "import":
+            bench.func(*bench.setup(0.001))
+
+
+def test_run_save_and_compare(tmp_path):
+    results = harness.run([".8b.100", "codec.loads"], scale=0.001, min_time=0, repeat=1, out=None)
+    assert list(results) == ["ticker.parse_binary.8b.100", "codec.loads.historical.1y", "codec.loads.quote.1000"]
+    assert all(r["ops_per_sec"] > 0 for r in results.values())
+
+    path = str(tmp_path / "baseline.json")
+    harness.save(results, path, scale=0.001)
+    baseline = harness.load(path)
+
+    slower = dict((name, dict(r, ops_per_sec=r["ops_per_sec"] / 2)) for name, r in results.items())
+    out = io.StringIO()
+    assert harness.compare(results, baseline, out=out) == []
+    assert set(harness.compare(slower, baseline, out=out)) == set(results)
@@ -0,0 +1,130 @@
+# coding: utf-8
+"""Tests for bulk order operations and the order rate limiter."""
+import json
+import time
+import threading
+import responses
+
+import kiteconnect.exceptions as ex
+from kiteconnect.advanced_orders import cancel_all_orders
+from kiteconnect.utils.network import RateLimiter
+
+import utils
+
+
+def _url(kite, route, **url_args):
+    return "{0}{1}".format(kite.root, kite._routes[route].format(**url_args))
+
+
+def _place_callback(request):
+    params = dict(p.split("=") for p in request.body.split("&"))
+    if params["tradingsymbol"] == "BAD":
+        return (400, {}, json.dumps({"status": "error", "error_type": "InputException", "message": "bad symbol"}))
+    return (200, {}, json.dumps({"status": "success", "data": {"order_id": "id-" + params["tradingsymbol"]}}))
+
+
+def _orders(kite, *symbols):
+    return [{
+        "variety": kite.VARIETY_REGULAR,
+        "exchange": "NSE",
+        "tradingsymbol": symbol,
+        "transaction_type": "BUY",
+        "quantity": 1,
+        "product": kite.PRODUCT_CNC,
+        "order_type": kite.ORDER_TYPE_MARKET,
+    } for symbol in symbols]
+
+
+def test_rate_limiter_bursts_then_throttles():
+    limiter = RateLimiter(rate=20, burst=5)
+    started = time.monotonic()
+    waits = [limiter.acquire() for _ in range(10)]
+
+    assert waits[:5] == [0] * 5
+    assert all(w > 0 for w in waits[5:])
+    # 5 calls over the burst at 20/s take at least 0.25s.
+    assert time.monotonic() - started >= 0.24
+
+
+def test_rate_limiter_shared_between_threads():
+    limiter = RateLimiter(rate=50, burst=1)
+    stamps = []
+    lock = threading.Lock()
+
+    def worker():
+        limiter.acquire()
+        with lock:
+            stamps.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stamps.sort()
+    assert stamps[-1] - stamps[0] >= 5 / 50.0 - 0.01
+
+
+@responses.activate
+def test_place_orders_reports_per_item_results(kiteconnect):
+    responses.add_callback(
+        responses.POST, _url(kiteconnect, "order.place", variety=kiteconnect.VARIETY_REGULAR),
+        callback=_place_callback, content_type="application/json"
+    )
+
+    results = kiteconnect.place_orders(_orders(kiteconnect, "INFY", "BAD", "TCS"), max_workers=3)
+
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert [r["order_id"] for r in results] == ["id-INFY", None, "id-TCS"]
+    assert isinstance(results[1]["error"], ex.InputException)
+    assert results[1]["params"]["tradingsymbol"] == "BAD"
+
+
+@responses.activate
+def test_bulk_orders_prioritizes_cancels(kiteconnect):
+    responses.add_callback(
+        responses.POST, _url(kiteconnect, "order.place", variety=kiteconnect.VARIETY_REGULAR),
+        callback=_place_callback, content_type="application/json"
+    )
+    for order_id in ("1", "2"):
+        responses.add(
+            responses.DELETE, _url(kiteconnect, "order.cancel", variety=kiteconnect.VARIETY_REGULAR, order_id=order_id),
+            body=json.dumps({"status": "success", "data": {"order_id": order_id}}), content_type="application/json"
+        )
+
+    cancels = [{"variety": kiteconnect.VARIETY_REGULAR, "order_id": oid, "status": "OPEN"} for oid in ("1", "2")]
+    results = kiteconnect.bulk_orders(place=_orders(kiteconnect, "INFY", "TCS"), cancel=cancels)
+
+    assert [r["order_id"] for r in results["cancel"]] == ["1", "2"]
+    assert [r["order_id"] for r in results["place"]] == ["id-INFY", "id-TCS"]
+    assert results["modify"] == []
+    # Orderbook fields which cancel_order doesn't accept are dropped.
+    assert results["cancel"][0]["params"] == {"variety": kiteconnect.VARIETY_REGULAR, "order_id": "1"}
+    assert [c.request.method for c in responses.calls] == ["DELETE", "DELETE", "POST", "POST"]
+
+
+@responses.activate
+def test_cancel_all_orders_uses_bulk_cancel(kiteconnect):
+    orders = utils.get_json_response("orders")
+    for order in orders["data"]:
+        order["status"] = "OPEN"
+    orders["data"][0]["status"] = "PENDING"
+    orders["data"][1]["status"] = "PENDING"
+    pending = [orders["data"][0], orders["data"][1]]
+
+    responses.add(responses.GET, _url(kiteconnect, "orders"), body=json.dumps(orders), content_type="application/json")
+    responses.add(
+        responses.DELETE,
+        _url(kiteconnect, "order.cancel", variety=pending[0]["variety"], order_id=pending[0]["order_id"]),
+        body=json.dumps({"status": "success", "data": {"order_id": pending[0]["order_id"]}}),
+        content_type="application/json"
+    )
+    responses.add(
+        responses.DELETE,
+        _url(kiteconnect, "order.cancel", variety=pending[1]["variety"], order_id=pending[1]["order_id"]),
+        body=json.dumps({"status": "error", "error_type": "OrderException", "message": "already filled"}),
+        content_type="application/json", status=400
+    )
+
+    assert cancel_all_orders(kiteconnect) == [pending[0]["order_id"]]
@@ -0,0 +1,104 @@
+# coding: utf-8
+"""Tests for the columnar candle files."""
+import datetime
+import os
+import threading
+
+import numpy as np
+
+from kiteconnect.candle_files import IST, OI_MISSING, CandleFiles
+
+
+def ts(*args):
+    return int(datetime.datetime(*args, tzinfo=IST).timestamp())
+
+
+def candles(timestamps, close, oi=None):
+    n = len(timestamps)
+    return {
+        "timestamp": timestamps, "open": close, "high": close, "low": close, "close": close,
+        "volume": [1] * n, "oi": oi if oi is not None else [OI_MISSING] * n,
+    }
+
+
+def test_write_merges_and_partitions_by_month(tmp_path):
+    files = CandleFiles(str(tmp_path))
+    first = [ts(2024, 1, 31, 15, 29), ts(2024, 2, 1, 9, 15)]
+    files.write(1, "minute", candles(first, [1.0, 2.0], [10, 20]))
+    assert sorted(os.listdir(str(tmp_path / "1" / "minute"))) == ["2024-01", "2024-02"]
+
+    # Unsorted and duplicated input, the last duplicate wins and missing oi keeps the stored one.
+    files.write(1, "minute", candles([ts(2024, 2, 1, 9, 16), ts(2024, 2, 1, 9, 15), ts(2024, 2, 1, 9, 15)],
+                                     [4.0, 0.0, 3.0]))
+
+    columns = files.read(1, "minute", first[0], ts(2024, 2, 1, 9, 16))
+    assert list(columns["timestamp"]) == first + [ts(2024, 2, 1, 9, 16)]
+    assert list(columns["close"]) == [1.0, 3.0, 4.0]
+    assert list(columns["oi"]) == [10, 20, OI_MISSING]
+
+    # The current version and the one it replaced are kept, besides the pointer and the lock.
+    partition = str(tmp_path / "1" / "minute" / "2024-02")
+    assert len(os.listdir(partition)) == 4
+    files.write(1, "minute", candles([ts(2024, 2, 1, 9, 17)], [5.0]))
+    assert len(os.listdir(partition)) == 4
+
+
+def test_read_is_memory_mapped_and_bounded(tmp_path):
+    files = CandleFiles(str(tmp_path))
+    timestamps = [ts(2024, 3, 1, 9, 15) + 60 * i for i in range(10)]
+    files.write(7, "day", candles(timestamps, [float(i) for i in range(10)]))
+
+    columns = files.read(7, "day", timestamps[2], timestamps[4])
+    assert isinstance(columns["close"], np.memmap)
+    assert list(columns["close"]) == [2.0, 3.0, 4.0]
+
+    assert len(files.read(7, "day", ts(2023, 1, 1), ts(2023, 12, 31))["timestamp"]) == 0
+    files.delete(7, ["day"])
+    assert len(files.read(7, "day", timestamps[0], timestamps[-1])["timestamp"]) == 0
+
+
+def test_concurrent_writers_do_not_lose_candles(tmp_path):
+    # Separate instances, like writers in separate processes, only share the partition lock.
+    start = ts(2024, 5, 2, 9, 15)
+
+    def write(offset):
+        files = CandleFiles(str(tmp_path))
+        for i in range(20):
+            files.write(3, "minute", candles([start + 60 * (2 * i + offset)], [float(offset)]))
+
+    threads = [threading.Thread(target=write, args=(offset,)) for offset in (0, 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    columns = CandleFiles(str(tmp_path)).read(3, "minute", start, start + 60 * 40)
+    assert list(columns["timestamp"]) == [start + 60 * i for i in range(40)]
+
+
+def test_appends_do_not_rewrite_the_partition(tmp_path):
+    files = CandleFiles(str(tmp_path))
+    start = ts(2024, 4, 1, 9, 15)
+    files.write(5, "minute", candles([start + 60 * i for i in range(100)], [1.0] * 100))
+    partition = str(tmp_path / "5" / "minute" / "2024-04")
+    with open(os.path.join(partition, "CURRENT")) as f:
+        base = f.read().split()
+
+    for i in range(100, 164):
+        files.write(5, "minute", candles([start + 60 * i], [2.0]))
+
+    with open(os.path.join(partition, "CURRENT")) as f:
+        segments = f.read().split()
+    # The first 100 candles were written once, the 64 appended since merged into a segment of their own.
+    assert segments[0] == base[0]
+    assert [len(np.load(os.path.join(partition, s, "timestamp.npy"))) for s in segments] == [100, 64]
+
+    files.write(5, "minute", candles([start + 60 * 164, start + 60 * 165], [3.0, 3.0]))
+    columns = files.read(5, "minute", start, start + 60 * 200)
+    assert list(columns["timestamp"]) == [start + 60 * i for i in range(166)]
+    assert list(columns["close"][[0, 100, 165]]) == [1.0, 2.0, 3.0]
+
+    # An overlapping write merges the segments it overlaps.
+    files.write(5, "minute", candles([start + 60 * 150], [4.0]))
+    columns = files.read(5, "minute", start, start + 60 * 200)
+    assert len(columns["timestamp"]) == 166 and columns["close"][150] == 4.0
@@ -0,0 +1,88 @@
+# coding: utf-8
+"""Tests for the pluggable JSON codec."""
+import json
+import pytest
+import responses
+
+import kiteconnect.exceptions as ex
+from kiteconnect.utils import codec
+
+import utils
+
+
+@pytest.fixture()
+def restore_backend():
+    """Restore the active codec backend after a test switches it."""
+    active = codec.backend
+    yield
+    codec.set_backend(active)
+
+
+def _available_backends():
+    available = []
+    for name in codec.BACKENDS:
+        try:
+            codec._load_backend(name)
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+@pytest.mark.parametrize("name", _available_backends())
+def test_codec_roundtrip(name, restore_backend):
+    """Every installed backend decodes str and bytes and encodes to str."""
+    assert codec.set_backend(name) == name
+    doc = {"status": "success", "data": {"symbol": "NIFTY 50", "ltp": 19234.55, "qty": [1, 2]}}
+
+    encoded = codec.dumps(doc)
+    assert isinstance(encoded, str)
+    assert json.loads(encoded) == doc
+    assert codec.loads(encoded) == doc
+    assert codec.loads(encoded.encode("utf-8")) == doc
+
+    with pytest.raises(ValueError):
+        codec.loads(b"{a:b}")
+
+
+def test_codec_default_prefers_fast_backend(restore_backend):
+    """With no name the first installed backend in preference order is used."""
+    assert codec.set_backend() == _available_backends()[0]
+
+
+def test_codec_unknown_backend(restore_backend):
+    with pytest.raises(ValueError):
+        codec.set_backend("simplejson-ish")
+
+
+@responses.activate
+@pytest.mark.parametrize("name", _available_backends())
+def test_json_body_encoded_with_codec(kiteconnect, name, restore_backend):
+    """`is_json` posts are encoded by the codec and responses decoded by it."""
+    codec.set_backend(name)
+    responses.add(
+        responses.POST,
+        "{0}{1}".format(kiteconnect.root, kiteconnect._routes["order.margins"]),
+        body=utils.get_response("order.margins"),
+        content_type="application/json"
+    )
+    params = [{"exchange": "NSE", "tradingsymbol": "INFY", "transaction_type": "BUY", "quantity": 2}]
+
+    margin_detail = kiteconnect.order_margins(params)
+
+    request = responses.calls[0].request
+    assert request.headers["Content-Type"] == "application/json"
+    assert json.loads(request.body) == params
+    assert margin_detail[0]["type"] == "equity"
+
+
+@responses.activate
+def test_invalid_json_raises_data_exception(kiteconnect):
+    responses.add(
+        responses.GET,
+        "{0}{1}".format(kiteconnect.root, kiteconnect._routes["portfolio.positions"]),
+        body="{a:b}",
+        content_type="application/json"
+    )
+    with pytest.raises(ex.DataException):
+        kiteconnect.positions()
@@ -582,3 +582,146 @@ def test_place_spread_order_failure_with_cancel(kiteconnect):
             kiteconnect.place_spread_order(legs)
         co.assert_called_once_with(kiteconnect.VARIETY_REGULAR, "111")
 
+
+def _spread_legs(kiteconnect, *transaction_types):
+    return [{
+        "variety": kiteconnect.VARIETY_REGULAR,
+        "exchange": "NFO",
+        "tradingsymbol": "NIFTY{}".format(idx),
+        "transaction_type": transaction_type,
+        "quantity": 50,
+        "product": kiteconnect.PRODUCT_NRML,
+        "order_type": kiteconnect.ORDER_TYPE_MARKET,
+    } for idx, transaction_type in enumerate(transaction_types)]
+
+
+def test_spread_phases():
+    from kiteconnect.utils.spread import spread_phases
+
+    legs = [{"transaction_type": t} for t in ("SELL", "BUY", "SELL", "BUY")]
+    assert spread_phases(legs) == [[0], [1], [2], [3]]
+    assert spread_phases(legs, concurrent=True) == [[0, 1, 2, 3]]
+    assert spread_phases(legs, hedge_first=True) == [[1, 3], [0, 2]]
+    assert spread_phases(legs, phases=[[3], [0, 1, 2]]) == [[3], [0, 1, 2]]
+
+    with pytest.raises(ex.InputException):
+        spread_phases(legs, phases=[[0, 1], [1, 2]])
+
+
+def test_place_spread_order_concurrent(kiteconnect):
+    import threading
+    legs = _spread_legs(kiteconnect, "BUY", "SELL", "SELL")
+    barrier = threading.Barrier(len(legs), timeout=5)
+
+    def place_order(**leg):
+        # Every leg has to be in flight at the same time for the barrier to release.
+        barrier.wait()
+        return "id-" + leg["tradingsymbol"]
+
+    with patch.object(kiteconnect, "place_order", side_effect=place_order):
+        order_ids = kiteconnect.place_spread_order(legs, concurrent=True)
+
+    assert order_ids == ["id-NIFTY0", "id-NIFTY1", "id-NIFTY2"]
+    assert [t["leg"] for t in order_ids.timings] == [0, 1, 2]
+    assert all(t["phase"] == 0 for t in order_ids.timings)
+    assert order_ids.skew >= 0
+
+
+def test_place_spread_order_hedge_first(kiteconnect):
+    legs = _spread_legs(kiteconnect, "SELL", "BUY", "SELL", "BUY")
+
+    with patch.object(kiteconnect, "place_order", side_effect=lambda **leg: leg["tradingsymbol"]) as po:
+        order_ids = kiteconnect.place_spread_order(legs, hedge_first=True)
+
+    assert order_ids == ["NIFTY0", "NIFTY1", "NIFTY2", "NIFTY3"]
+    placed = [c.kwargs["tradingsymbol"] for c in po.call_args_list]
+    assert set(placed[:2]) == {"NIFTY1", "NIFTY3"}
+    assert {t["leg"]: t["phase"] for t in order_ids.timings} == {0: 1, 1: 0, 2: 1, 3: 0}
+
+
+def test_place_spread_order_concurrent_failure_cancels_placed_legs(kiteconnect):
+    legs = _spread_legs(kiteconnect, "BUY", "SELL", "BUY")
+
+    def place_order(**leg):
+        if leg["tradingsymbol"] == "NIFTY1":
+            raise ex.OrderException("margin exceeded")
+        return "id-" + leg["tradingsymbol"]
+
+    with patch.object(kiteconnect, "place_order", side_effect=place_order), \
+            patch.object(kiteconnect, "cancel_order") as co:
+        with pytest.raises(ex.OrderException):
+            kiteconnect.place_spread_order(legs, concurrent=True)
+
+    assert sorted(c.args for c in co.call_args_list) == [
+        (kiteconnect.VARIETY_REGULAR, "id-NIFTY0"),
+        (kiteconnect.VARIETY_REGULAR, "id-NIFTY2"),
+    ]
+
+
+
+@responses.activate
+def test_gather(kiteconnect):
+    for route in ("portfolio.positions", "portfolio.holdings", "user.profile"):
+        responses.add(
+            responses.GET,
+            "{0}{1}".format(kiteconnect.root, kiteconnect._routes[route]),
+            body=utils.get_response(route),
+            content_type="application/json"
+        )
+
+    holdings = kiteconnect.submit("holdings")
+    positions, profile, holdings = kiteconnect.gather("positions", ("profile",), holdings)
+
+    assert "net" in positions
+    assert "user_id" in profile
+    assert type(holdings) == list
+
+
+def test_gather_runs_calls_concurrently(kiteconnect):
+    import threading
+    barrier = threading.Barrier(3, timeout=5)
+
+    def call(value):
+        barrier.wait()
+        return value
+
+    assert kiteconnect.gather((call, 1), (call, 2), (call, 3)) == [1, 2, 3]
+    assert kiteconnect.executor.max_workers == 10
+    kiteconnect.close()
+
+
+def test_gather_errors(kiteconnect):
+    from concurrent.futures import TimeoutError
+    import threading
+
+    def fail():
+        raise ex.NetworkException("Too many requests", code=429)
+
+    with pytest.raises(ex.NetworkException):
+        kiteconnect.gather((fail,), (lambda: 1,))
+
+    error, value = kiteconnect.gather((fail,), (lambda: 1,), return_exceptions=True)
+    assert isinstance(error, ex.NetworkException) and value == 1
+
+    release = threading.Event()
+    with pytest.raises(TimeoutError):
+        kiteconnect.gather((release.wait, 5), timeout=0.05)
+    release.set()
+
+
+def test_executor_pool_size():
+    from kiteconnect import KiteConnect
+
+    kite = KiteConnect(api_key="<API-KEY>", pool={"pool_connections": 2, "pool_maxsize": 4})
+    assert kite.executor.max_workers == 4
+    assert kite.gather((len, "abc")) == [3]
+    kite.close()
+
+
+def test_submit_from_a_worker_runs_inline(kiteconnect):
+    # Every worker submitting and waiting for a nested call must not deadlock the pool.
+    def nested(value):
+        return kiteconnect.submit(lambda: value).result(timeout=5)
+
+    calls = [(nested, i) for i in range(kiteconnect.executor.max_workers * 2)]
+    assert kiteconnect.gather(*calls, timeout=5) == list(range(len(calls)))
@@ -0,0 +1,177 @@
+# coding: utf-8
+"""Tests for the range aware historical candle cache."""
+import datetime
+
+import numpy as np
+import pytest
+
+from kiteconnect import data_cache
+from kiteconnect.data_cache import IST, CandleStore, merge_ranges, subtract_ranges
+from kiteconnect.utils.lru import LRUCache
+
+
+class FakeKite(object):
+    """`historical_data` returning a minute candle for every minute of 09:15 to 15:29 in the range."""
+
+    def __init__(self):
+        self.calls = []
+
+    def historical_data(self, instrument_token, from_date, to_date, interval, continuous=False, oi=False):
+        self.calls.append((from_date, to_date))
+        candles = []
+        ts = from_date.replace(tzinfo=IST)
+        if ts.second:
+            ts += datetime.timedelta(seconds=60 - ts.second)
+        end = to_date.replace(tzinfo=IST)
+        while ts <= end:
+            if ts.weekday() < 5 and datetime.time(9, 15) <= ts.time() <= datetime.time(15, 29):
+                price = 100 + ts.minute
+                candle = {"date": ts, "open": price, "high": price + 1, "low": price - 1, "close": price,
+                          "volume": 10}
+                if oi:
+                    candle["oi"] = 500
+                candles.append(candle)
+            ts += datetime.timedelta(minutes=1)
+        return candles
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return CandleStore(str(tmp_path / "cache.db"), str(tmp_path / "candles"), memory=LRUCache(1024 * 1024))
+
+
+def test_ranges():
+    assert merge_ranges([(5, 10), (0, 3), (4, 4), (20, 30), (25, 26)]) == [(0, 10), (20, 30)]
+    assert subtract_ranges(0, 100, [(10, 20), (30, 40)]) == [(0, 9), (21, 29), (41, 100)]
+    assert subtract_ranges(15, 35, [(10, 20), (30, 40)]) == [(21, 29)]
+    assert subtract_ranges(12, 18, [(10, 20)]) == []
+
+
+def test_fetch_only_missing_ranges(store):
+    kite = FakeKite()
+    day = datetime.datetime(2024, 1, 2)
+
+    df = store.fetch(kite, 1, day.replace(hour=9, minute=15), day.replace(hour=12), "minute")
+    assert len(kite.calls) == 1
+    assert len(df) == 166
+    assert df.index[0] == datetime.datetime(2024, 1, 2, 9, 15, tzinfo=IST)
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+
+    # Fully cached.
+    cached = store.fetch(kite, 1, day.replace(hour=10), day.replace(hour=11), "minute")
+    assert len(kite.calls) == 1
+    assert len(cached) == 61
+
+    # Extending the range fetches only the new part.
+    df = store.fetch(kite, 1, day.replace(hour=9, minute=15), day.replace(hour=15, minute=29), "minute")
+    assert kite.calls[1] == (day.replace(hour=12, second=1), day.replace(hour=15, minute=29))
+    assert len(df) == 375
+    assert df.index.is_monotonic_increasing and df.index.is_unique
+
+
+def test_fetch_splits_by_request_limit(store):
+    kite = FakeKite()
+    store.fetch(kite, 1, datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 1) + datetime.timedelta(days=70),
+                "day")
+    assert len(kite.calls) == 1
+
+    chunks = store._chunks(datetime.datetime(2024, 1, 1, tzinfo=IST), datetime.datetime(2024, 4, 1, tzinfo=IST),
+                           "minute")
+    assert len(chunks) == 2
+    assert chunks[0][1] + datetime.timedelta(seconds=1) == chunks[1][0]
+
+
+def test_unfinished_candle_is_fetched_again(store):
+    now = datetime.datetime.now(IST).replace(second=0, microsecond=0)
+    start = now - datetime.timedelta(minutes=10)
+
+    store.put(1, "minute", [], start, now, complete_until=now)
+    assert store.missing(1, "minute", start, now) == [(now, now)]
+
+
+def test_oi_and_continuous_are_cached_separately(store):
+    kite = FakeKite()
+    start, end = datetime.datetime(2024, 1, 2, 9, 15), datetime.datetime(2024, 1, 2, 9, 30)
+
+    store.fetch(kite, 1, start, end, "minute")
+    df = store.fetch(kite, 1, start, end, "minute", oi=True)
+    assert len(kite.calls) == 2
+    assert (df["oi"] == 500).all()
+
+    store.fetch(kite, 1, start, end, "minute")
+    assert len(kite.calls) == 2
+
+    store.fetch(kite, 1, start, end, "minute", continuous=True)
+    assert len(kite.calls) == 3
+
+    store.clear(1, "minute")
+    assert store.coverage(1, "minute") == []
+    assert store.coverage(1, "minute", continuous=True) == []
+
+
+def test_save_and_load_historical_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_cache, "CACHE_DB", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(data_cache, "CACHE_DIR", str(tmp_path / "candles"))
+    start, end = datetime.datetime(2024, 1, 2, 9, 15), datetime.datetime(2024, 1, 2, 9, 30)
+    df = CandleStore(data_cache.CACHE_DB, data_cache.CACHE_DIR).fetch(FakeKite(), 1, start, end, "minute")
+
+    data_cache.save_historical_data(2, "minute", start, end, df)
+    loaded = data_cache.load_historical_data(2, "minute", start, end)
+    assert loaded.equals(df)
+    assert data_cache.load_historical_data(2, "minute", start, end + datetime.timedelta(minutes=1)) is None
+
+
+def test_candles_are_memory_mapped_across_months(store):
+    kite = FakeKite()
+    start, end = datetime.datetime(2024, 1, 31, 15, 0), datetime.datetime(2024, 2, 1, 9, 30)
+    df = store.fetch(kite, 1, start, end, "minute")
+    assert len(df) == 30 + 16
+    assert df.index[-1] == datetime.datetime(2024, 2, 1, 9, 30, tzinfo=IST)
+
+    columns = store.columns(1, "minute", datetime.datetime(2024, 2, 1), end)
+    assert isinstance(columns["close"], np.memmap)
+    assert list(columns["close"]) == list(df["close"][-16:])
+
+    store.clear(1)
+    assert store.get(1, "minute", start, end).empty
+
+
+def test_repeated_fetches_are_served_from_memory(store):
+    kite = FakeKite()
+    start, end = datetime.datetime(2024, 1, 2, 9, 15), datetime.datetime(2024, 1, 2, 9, 30)
+
+    df = store.fetch(kite, 1, start, end, "minute")
+    df["close"] = 0
+    again = store.fetch(kite, 1, start, end, "minute")
+    assert len(kite.calls) == 1
+    assert (again["close"] > 0).all()
+    assert store.memory.stats()["hits"] == 1
+
+    store.clear(1, "minute")
+    store.fetch(kite, 1, start, end, "minute")
+    assert len(kite.calls) == 2
+
+
+def test_higher_timeframes_are_built_from_cached_minutes(store):
+    kite = FakeKite()
+    day = datetime.datetime(2024, 1, 2)
+    store.fetch(kite, 1, day.replace(hour=9, minute=15), day.replace(hour=15, minute=29), "minute")
+
+    df = store.fetch(kite, 1, day.replace(hour=9, minute=20), day.replace(hour=15, minute=29), "15minute")
+    assert len(kite.calls) == 1
+    assert df.index[0] == datetime.datetime(2024, 1, 2, 9, 30, tzinfo=IST)
+    assert df.index[-1] == datetime.datetime(2024, 1, 2, 15, 15, tzinfo=IST)
+    first = df.iloc[0]
+    assert (first["open"], first["high"], first["low"], first["close"], first["volume"]) == (130, 145, 129, 144, 150)
+
+    # Not all the minutes of the last hour are cached.
+    store.fetch(kite, 1, day.replace(hour=9, minute=15), day.replace(hour=15, minute=29), "60minute")
+    assert len(kite.calls) == 1
+    # Day candles are only built from minutes when asked for.
+    store.fetch(kite, 1, day.replace(hour=9, minute=15), day.replace(hour=15, minute=30), "day", from_minute=["day"])
+    assert len(kite.calls) == 1
+    store.fetch(kite, 1, day, day + datetime.timedelta(days=1), "day", from_minute=["day"])
+    assert len(kite.calls) == 2
+    store.clear(1, "day")
+    store.fetch(kite, 1, day.replace(hour=9, minute=15), day.replace(hour=15, minute=30), "day")
+    assert len(kite.calls) == 3
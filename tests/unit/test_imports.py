@@ -0,0 +1,38 @@
+# coding: utf-8
+"""Tests for the lazily imported public names of the package."""
+import sys
+import subprocess
+
+import pytest
+
+import kiteconnect
+
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "mplfinance", "sklearn", "twisted", "autobahn", "aiohttp", "asyncio")
+
+
+def test_core_client_import_is_light():
+    code = "import sys; from kiteconnect import KiteConnect; print(' '.join(sorted(sys.modules)))"
+    modules = set(subprocess.check_output([sys.executable, "-c", code]).decode("utf-8").split())
+
+    assert [m for m in HEAVY_MODULES if m in modules] == []
+    assert "kiteconnect.ticker" not in modules
+
+
+@pytest.mark.parametrize("name", kiteconnect.__all__)
+def test_public_names_resolve(name):
+    assert getattr(kiteconnect, name) is not None
+    assert name in dir(kiteconnect)
+
+
+def test_lazy_names_are_the_module_objects():
+    from kiteconnect.ticker import KiteTicker
+    from kiteconnect.notifications.telegram import send_telegram_message
+
+    assert kiteconnect.KiteTicker is KiteTicker
+    assert kiteconnect.send_telegram_message is send_telegram_message
+    assert "KiteTicker" in vars(kiteconnect)
+
+
+def test_unknown_name():
+    with pytest.raises(AttributeError):
+        kiteconnect.NotAName
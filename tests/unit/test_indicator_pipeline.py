@@ -0,0 +1,80 @@
+# coding: utf-8
+"""Tests for the indicator pipeline's shared nodes and its batch and streaming results."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kiteconnect import technical_indicators as ti
+from kiteconnect.indicator_pipeline import (Pipeline, atr, bollinger_bands, column, ema, ewm, macd, rsi, sma,
+                                            stochastic_oscillator)
+
+close, high, low = column("close"), column("high"), column("low")
+
+
+@pytest.fixture(scope="module")
+def candles():
+    rng = np.random.default_rng(11)
+    price = 100 + rng.standard_normal(150).cumsum()
+    return pd.DataFrame({"high": price + rng.random(150), "low": price - rng.random(150), "close": price})
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return Pipeline(dict(
+        sma20=sma(close, 20),
+        ema12=ema(close, 12),
+        rsi=rsi(close, 14),
+        atr=atr(high, low, close, 14),
+        **dict(bollinger_bands(close, 20), **macd(close), **stochastic_oscillator(high, low, close))
+    ))
+
+
+def expected(df):
+    result = {
+        "sma20": ti.sma_series(df["close"], 20),
+        "ema12": df["close"].ewm(span=12, adjust=False).mean(),
+        "rsi": ti.rsi_series(df["close"], 14),
+        "atr": ti.atr_series(df),
+    }
+    for series in (ti.macd_series(df), ti.bollinger_bands_series(df), ti.stochastic_oscillator_series(df)):
+        result.update(series)
+    return result
+
+
+def test_shared_nodes_are_computed_once(pipeline):
+    # SMA and the middle band, the MACD's fast EMA and `ema12`, and the previous close of RSI and ATR.
+    keys = [node.key for node in pipeline.nodes]
+    assert len(keys) == len(set(keys))
+    assert sum(node.op == "rolling_mean" and node.params == (20,) for node in pipeline.nodes) == 1
+    assert sum(node.op == "ewm" and node.params[1] == 12 for node in pipeline.nodes) == 1
+    assert sum(node.op == "shift" for node in pipeline.nodes) == 1
+    assert sorted(pipeline.columns) == ["close", "high", "low"]
+    assert sma(close, 20).key == bollinger_bands(close, 20)["Middle_Band"].key
+
+
+def test_batch_matches_technical_indicators(pipeline, candles):
+    result = pipeline.run(candles)
+    for name, series in expected(candles).items():
+        pd.testing.assert_series_equal(result[name], series, check_names=False)
+
+
+def test_streaming_matches_batch(pipeline, candles):
+    stream = pipeline.stream()
+    rows = [stream.update(bar) for bar in candles.to_dict("records")]
+    for name, series in expected(candles).items():
+        np.testing.assert_allclose([row[name] for row in rows], series.to_numpy(), rtol=1e-9, atol=1e-9,
+                                   err_msg=name)
+
+
+def test_constants_and_arithmetic(candles):
+    spread = Pipeline({"spread": (high - low) / 2, "one": 1.0})
+    result = spread.run(candles)
+    pd.testing.assert_series_equal(result["spread"], (candles["high"] - candles["low"]) / 2, check_names=False)
+    assert (result["one"] == 1.0).all()
+    assert spread.stream().update({"high": 3, "low": 1, "close": 2}) == {"spread": 1.0, "one": 1.0}
+
+
+def test_ewm_takes_one_of_com_and_span():
+    for kwargs in ({}, {"com": 1, "span": 3}, {"com": -1}, {"span": 0.5}):
+        with pytest.raises(ValueError):
+            ewm(close, **kwargs)
@@ -0,0 +1,36 @@
+# coding: utf-8
+"""Tests for the size bounded LRU cache."""
+import time
+
+from kiteconnect.utils.lru import LRUCache
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    assert cache.get("a") == "xxxx"
+
+    cache.put("c", "xxxx")
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert cache.bytes == 8
+
+    # Too large to cache at all.
+    cache.put("d", "x" * 11)
+    assert "d" not in cache and len(cache) == 2
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["evictions"], stats["entries"]) == (1, 1, 2)
+
+
+def test_entries_expire():
+    cache = LRUCache(max_bytes=100, sizeof=len, ttl=60)
+    cache.put("a", "x", ttl=0.01)
+    cache.put("b", "x")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.get("b") == "x"
+    assert cache.stats()["expirations"] == 1 and cache.bytes == 1
+
+    assert cache.invalidate(lambda key: key == "b") == 1
+    assert len(cache) == 0
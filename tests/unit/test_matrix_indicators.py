@@ -0,0 +1,51 @@
+# coding: utf-8
+"""Tests for the multi-instrument indicators against the per series ones."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kiteconnect import matrix_indicators as mi
+from kiteconnect import technical_indicators as ti
+
+
+@pytest.fixture(scope="module")
+def universe():
+    rng = np.random.default_rng(5)
+    close = 100 + rng.standard_normal((4, 80)).cumsum(axis=1)
+    # Listed later, and a missing candle.
+    close[1, :25] = np.nan
+    close[2, 40] = np.nan
+    return close + rng.random(close.shape), close - rng.random(close.shape), close
+
+
+def test_rows_match_per_series_indicators(universe):
+    high, low, close = universe
+    sma = mi.sma(close, 20)
+    rsi = mi.rsi(close, 14)
+    macd = mi.macd(close)
+    bands = mi.bollinger_bands(close)
+    stochastic = mi.stochastic_oscillator(high, low, close)
+    atr = mi.atr(high, low, close)
+    assert sma.shape == rsi.shape == atr.shape == close.shape
+
+    for i in range(close.shape[0]):
+        df = pd.DataFrame({"high": high[i], "low": low[i], "close": close[i]})
+        np.testing.assert_allclose(sma[i], ti.sma_series(df["close"], 20).to_numpy())
+        np.testing.assert_allclose(rsi[i], ti.rsi_series(df["close"], 14).to_numpy())
+        np.testing.assert_allclose(atr[i], ti.atr_series(df).to_numpy())
+        for result, expected in ((macd, ti.macd_series(df)), (bands, ti.bollinger_bands_series(df)),
+                                 (stochastic, ti.stochastic_oscillator_series(df))):
+            for name in expected:
+                np.testing.assert_allclose(result[name][i], expected[name].to_numpy())
+
+    np.testing.assert_allclose(mi.ema(close, 12)[0], pd.Series(close[0]).ewm(span=12, adjust=False).mean())
+
+
+def test_to_matrix_aligns_on_time():
+    a = pd.DataFrame({"close": [1.0, 2.0, 3.0]}, index=pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]))
+    b = pd.DataFrame({"close": [5.0, 6.0]}, index=pd.to_datetime(["2024-01-02", "2024-01-04"]))
+    keys, index, matrix = mi.to_matrix({256265: a, 408065: b})
+
+    assert keys == [256265, 408065]
+    assert len(index) == 4
+    np.testing.assert_array_equal(matrix, [[1, 2, 3, np.nan], [np.nan, 5, np.nan, 6]])
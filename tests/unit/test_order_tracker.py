@@ -0,0 +1,160 @@
+# coding: utf-8
+"""Tests for the websocket driven order tracker."""
+import time
+import asyncio
+import threading
+import pytest
+from concurrent.futures import TimeoutError
+from mock import MagicMock
+
+import kiteconnect.exceptions as ex
+from kiteconnect import OrderTracker
+
+
+class FakeTicker(object):
+    def __init__(self):
+        self.on_order_update = None
+        self.on_connect = None
+        self.on_close = None
+        self.on_noreconnect = None
+
+    def is_connected(self):
+        return False
+
+
+def _order(order_id, status, filled=0, **kwargs):
+    order = {"order_id": order_id, "status": status, "filled_quantity": filled, "quantity": 10}
+    order.update(kwargs)
+    return order
+
+
+@pytest.fixture()
+def tracker():
+    kite = MagicMock()
+    kite.orders.return_value = []
+    tracker = OrderTracker(kite, poll_interval=0.01, max_poll_interval=0.05)
+    ticker = FakeTicker()
+    tracker.attach(ticker)
+    ticker.on_connect(ticker, None)
+    tracker._reconciler.join()
+    yield tracker, ticker
+    tracker.close()
+
+
+def test_wait_for_resolves_on_order_update(tracker):
+    tracker, ticker = tracker
+    future = tracker.wait_for("1", "COMPLETE", timeout=5)
+
+    ticker.on_order_update(ticker, _order("1", "OPEN"))
+    assert not future.done()
+
+    ticker.on_order_update(ticker, _order("1", "COMPLETE", filled=10))
+    assert future.result(timeout=1)["filled_quantity"] == 10
+    assert tracker.get("1")["status"] == "COMPLETE"
+
+
+def test_wait_for_already_known_order(tracker):
+    tracker, ticker = tracker
+    ticker.on_order_update(ticker, _order("1", "COMPLETE", filled=10))
+    assert tracker.wait_for("1").done()
+
+
+def test_wait_for_rejected_order_raises(tracker):
+    tracker, ticker = tracker
+    future = tracker.wait_for("1", "COMPLETE")
+    ticker.on_order_update(ticker, _order("1", "REJECTED", status_message="margin exceeded"))
+
+    with pytest.raises(ex.OrderException, match="margin exceeded"):
+        future.result(timeout=1)
+
+
+def test_wait_for_timeout(tracker):
+    tracker, _ = tracker
+    with pytest.raises(TimeoutError):
+        tracker.wait_for("1", timeout=0.01).result(timeout=1)
+    assert tracker._waiters == {}
+
+
+def test_stale_updates_are_ignored(tracker):
+    tracker, ticker = tracker
+    ticker.on_order_update(ticker, _order("1", "COMPLETE", filled=10))
+    ticker.on_order_update(ticker, _order("1", "OPEN", filled=5))
+    assert tracker.get("1")["status"] == "COMPLETE"
+    assert tracker.get("1")["filled_quantity"] == 10
+
+
+def test_existing_ticker_callbacks_are_chained():
+    kite = MagicMock()
+    kite.orders.return_value = []
+    ticker = FakeTicker()
+    seen = []
+    ticker.on_order_update = lambda ws, data: seen.append(data["order_id"])
+    ticker.on_connect = lambda ws, response: seen.append("connect")
+
+    tracker = OrderTracker(kite)
+    tracker.attach(ticker)
+    ticker.on_connect(ticker, None)
+    ticker.on_order_update(ticker, _order("1", "OPEN"))
+
+    assert seen == ["connect", "1"]
+    assert tracker.get("1")["status"] == "OPEN"
+
+
+def test_reconcile_on_reconnect(tracker):
+    tracker, ticker = tracker
+    future = tracker.wait_for("1", "COMPLETE")
+    # Reconnect with the fill having happened while the stream was down.
+    tracker.kite.orders.reset_mock()
+    tracker.kite.orders.return_value = [_order("1", "COMPLETE", filled=10), _order("2", "OPEN")]
+    ticker.on_connect(ticker, None)
+
+    assert future.result(timeout=1)["status"] == "COMPLETE"
+    tracker._reconciler.join()
+    assert tracker.kite.orders.call_count == 1
+    assert tracker.get("2")["status"] == "OPEN"
+
+
+def test_polls_only_while_stream_is_down(tracker):
+    tracker, ticker = tracker
+    tracker.kite.orders.reset_mock()
+    tracker.kite.orders.return_value = [_order("1", "OPEN")]
+
+    future = tracker.wait_for("1", "COMPLETE", timeout=5)
+    time.sleep(0.05)
+    # Stream is up, nothing is polled.
+    assert tracker.kite.orders.call_count == 0
+
+    ticker.on_close(ticker, 1006, "gone")
+    tracker.kite.orders.return_value = [_order("1", "COMPLETE", filled=10)]
+    assert future.result(timeout=2)["status"] == "COMPLETE"
+    assert tracker.kite.orders.call_count >= 1
+
+
+def test_wait_for_async(tracker):
+    tracker, ticker = tracker
+
+    async def main():
+        waiter = asyncio.ensure_future(tracker.wait_for_async("1", "COMPLETE", timeout=5))
+        await asyncio.sleep(0)
+        ticker.on_order_update(ticker, _order("1", "COMPLETE", filled=10))
+        return await waiter
+
+    assert asyncio.run(main())["status"] == "COMPLETE"
+
+
+def test_reconcile_runs_off_the_ticker_thread(tracker):
+    tracker, ticker = tracker
+    threads = []
+    tracker.kite.orders.side_effect = lambda: threads.append(threading.current_thread()) or []
+    ticker.on_connect(ticker, None)
+    tracker._reconciler.join()
+    assert threads and threads[0] is not threading.current_thread()
+
+
+def test_timeout_racing_a_cancel(tracker):
+    tracker, _ = tracker
+    future = tracker.wait_for("1", timeout=5)
+    future.cancel()
+    # The timer firing after the caller cancelled doesn't raise on its thread.
+    tracker._expire("1", future, 5)
+    assert future.cancelled()
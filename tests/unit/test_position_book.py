@@ -0,0 +1,178 @@
+# coding: utf-8
+"""Tests for the incrementally maintained position book."""
+import pytest
+from mock import MagicMock
+
+from kiteconnect.portfolio import get_current_portfolio
+from kiteconnect.position_book import PositionBook
+
+import utils
+
+
+def _update(order_id, filled, average_price, transaction_type="BUY", symbol="INFY", product="MIS"):
+    return {
+        "order_id": order_id,
+        "exchange": "NSE",
+        "tradingsymbol": symbol,
+        "instrument_token": 408065,
+        "product": product,
+        "transaction_type": transaction_type,
+        "filled_quantity": filled,
+        "average_price": average_price,
+    }
+
+
+@pytest.fixture()
+def book():
+    kite = MagicMock()
+    kite.positions.return_value = {"net": [], "day": []}
+    kite.holdings.return_value = []
+    kite.orders.return_value = []
+    book = PositionBook(kite)
+    book.snapshot()
+    return book
+
+
+def test_snapshot_uses_one_call_each():
+    kite = MagicMock()
+    kite.positions.return_value = utils.get_json_response("portfolio.positions")["data"]
+    kite.holdings.return_value = utils.get_json_response("portfolio.holdings")["data"]
+    kite.orders.return_value = utils.get_json_response("orders")["data"]
+
+    book = PositionBook(kite)
+    book.snapshot()
+
+    assert kite.positions.call_count == 1
+    assert kite.holdings.call_count == 1
+    assert kite.orders.call_count == 1
+    assert len(book.get_positions()) == len(kite.positions.return_value["net"])
+    assert len(book.get_holdings()) == len(kite.holdings.return_value)
+
+
+def test_fills_before_the_snapshot_are_not_applied_again():
+    kite = MagicMock()
+    kite.holdings.return_value = []
+    position = {"exchange": "NSE", "tradingsymbol": "INFY", "product": "MIS", "instrument_token": 408065,
+                "quantity": 10, "multiplier": 1, "average_price": 100.0, "last_price": 100.0,
+                "buy_quantity": 10, "buy_value": 1000.0, "sell_quantity": 0, "sell_value": 0.0}
+    kite.positions.return_value = {"net": [position], "day": []}
+    # Order 1 was filled 10 of 30 when the snapshot was taken.
+    kite.orders.return_value = [dict(_update("1", 10, 100.0), quantity=30)]
+
+    book = PositionBook(kite)
+    book.snapshot()
+    book.apply_order_update(_update("1", 30, 102.0))
+    assert book.get_positions()[0]["quantity"] == 30
+    assert book.get_positions()[0]["buy_value"] == pytest.approx(3060.0)
+
+    # Reconciled to 30 filled, the same update again applies nothing.
+    kite.positions.return_value = {"net": [book.get_positions()[0]], "day": []}
+    kite.orders.return_value = [dict(_update("1", 30, 102.0), quantity=30)]
+    assert book.reconcile() == []
+    assert not book.apply_order_update(_update("1", 30, 102.0))
+    assert book.get_positions()[0]["quantity"] == 30
+
+
+def test_updates_during_the_snapshot_are_replayed_on_it():
+    kite = MagicMock()
+    kite.holdings.return_value = []
+    kite.orders.return_value = [dict(_update("1", 10, 100.0), quantity=30), dict(_update("2", 0, 0.0), quantity=5)]
+    position = {"exchange": "NSE", "tradingsymbol": "INFY", "product": "MIS", "instrument_token": 408065,
+                "quantity": 10, "multiplier": 1, "average_price": 100.0, "last_price": 100.0,
+                "buy_quantity": 10, "buy_value": 1000.0, "sell_quantity": 0, "sell_value": 0.0}
+    book = PositionBook(kite)
+
+    def positions():
+        # Arrive while the snapshot is fetched: one already in the fetched orders, one not.
+        assert not book.apply_order_update(_update("1", 10, 100.0))
+        assert not book.apply_order_update(_update("2", 5, 110.0))
+        return {"net": [position], "day": []}
+
+    kite.positions.side_effect = positions
+    book.snapshot()
+    pos = book.get_positions()[0]
+    assert pos["quantity"] == 15
+    assert pos["buy_value"] == pytest.approx(1550.0)
+
+
+def test_partial_fills_are_applied_as_deltas(book):
+    book.apply_order_update(_update("1", 10, 100.0))
+    book.apply_order_update(_update("1", 30, 102.0))
+    # Repeated update with no new fill is a no-op.
+    assert not book.apply_order_update(_update("1", 30, 102.0))
+
+    pos = book.get_positions()[0]
+    assert pos["quantity"] == 30
+    assert pos["buy_quantity"] == 30
+    assert pos["average_price"] == pytest.approx(102.0)
+    assert pos["buy_value"] == pytest.approx(3060.0)
+
+
+def test_realised_pnl_and_flip(book):
+    book.apply_fill("NSE", "INFY", "MIS", "BUY", 10, 100.0, instrument_token=408065)
+    book.apply_fill("NSE", "INFY", "MIS", "SELL", 4, 110.0)
+    pos = book.positions[("NSE", "INFY", "MIS")]
+    assert pos["quantity"] == 6
+    assert pos["realised"] == pytest.approx(40.0)
+    assert pos["average_price"] == pytest.approx(100.0)
+
+    book.apply_fill("NSE", "INFY", "MIS", "SELL", 10, 90.0)
+    assert pos["quantity"] == -4
+    assert pos["realised"] == pytest.approx(40.0 - 60.0)
+    assert pos["average_price"] == pytest.approx(90.0)
+
+
+def test_mark_to_market_from_ticks(book):
+    book.apply_order_update(_update("1", 10, 100.0))
+    book.apply_order_update(_update("2", 4, 110.0, transaction_type="SELL"))
+    book.apply_ticks([{"instrument_token": 408065, "last_price": 105.0}])
+
+    pos = book.get_positions()[0]
+    # (sell_value - buy_value) + quantity * last_price
+    assert pos["pnl"] == pytest.approx(440.0 - 1000.0 + 6 * 105.0)
+    assert pos["unrealised"] == pytest.approx(30.0)
+    assert book.pnl() == pytest.approx(70.0)
+    assert book.kite.positions.call_count == 1
+
+
+def test_attach_chains_ticker_callbacks(book):
+    ticker = MagicMock()
+    previous = ticker.on_ticks
+    book.attach(ticker)
+
+    ticker.on_order_update(ticker, _update("1", 5, 100.0))
+    ticker.on_ticks(ticker, [{"instrument_token": 408065, "last_price": 101.0}])
+
+    assert book.pnl() == pytest.approx(5.0)
+    previous.assert_called_once()
+
+
+def test_reconcile_reports_drift(book):
+    book.apply_order_update(_update("1", 10, 100.0))
+    book.kite.positions.return_value = {"net": [dict(
+        _update("x", 0, 0), quantity=8, average_price=100.0, buy_quantity=8, sell_quantity=0)], "day": []}
+
+    drift = book.reconcile()
+
+    assert sorted(d["field"] for d in drift) == ["buy_quantity", "quantity"]
+    assert book.get_positions()[0]["quantity"] == 8
+
+
+def test_get_current_portfolio_from_book(book):
+    book.apply_order_update(_update("1", 10, 100.0))
+    portfolio = get_current_portfolio(book.kite, position_book=book)
+
+    assert portfolio["positions"][0]["quantity"] == 10
+    assert book.kite.ltp.call_count == 0
+
+
+def test_get_current_portfolio_fetches_positions_once():
+    kite = MagicMock()
+    kite.positions.return_value = utils.get_json_response("portfolio.positions")["data"]
+    kite.holdings.return_value = utils.get_json_response("portfolio.holdings")["data"]
+    kite.ltp.return_value = {}
+
+    portfolio = get_current_portfolio(kite)
+
+    assert kite.positions.call_count == 1
+    assert len(portfolio["positions"]) == len(kite.positions.return_value["net"])
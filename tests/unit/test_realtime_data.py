@@ -0,0 +1,80 @@
+# coding: utf-8
+"""Tests for the routing and per instrument state of the realtime processor."""
+import asyncio
+import logging
+
+import numpy as np
+import pytest
+
+from kiteconnect.realtime_data import RealtimeMarketDataProcessor
+
+
+@pytest.fixture(scope="module")
+def prices():
+    rng = np.random.default_rng(3)
+    return dict((token, 100 + rng.standard_normal(120).cumsum()) for token in (11, 12, 13))
+
+
+def ticks(prices):
+    # Interleaved, like the ticker's packets.
+    for i in range(len(prices[11])):
+        for token, closes in prices.items():
+            yield {"instrument_token": token, "last_price": float(closes[i]), "timestamp": i}
+
+
+def run(processor, ticks):
+    asyncio.run(processor.process_ticks(list(ticks)))
+
+
+def test_one_processor_matches_a_processor_per_instrument(prices):
+    alerts = []
+    processor = RealtimeMarketDataProcessor([11, 12, 13], alert_callback=alerts.append, keep_windows=True)
+    run(processor, ticks(prices))
+
+    for token in prices:
+        single_alerts = []
+        single = RealtimeMarketDataProcessor(token, alert_callback=single_alerts.append)
+        run(single, ticks(prices))
+
+        state = processor.states[token]
+        assert state.bars == single.bars == len(prices[token])
+        assert single.windows is None
+        assert processor.windows.count(token) == processor.warmup
+        np.testing.assert_array_equal(processor.windows.last(token, field="close"), prices[token][-processor.warmup:])
+        assert state.rsi.value == single.rsi.value
+        assert state.macd.value == single.macd.value
+        assert state.position == single.position
+        assert [a for a in alerts if " {}!".format(token) in a] == single_alerts
+
+
+def test_untracked_instruments_are_dropped(prices):
+    processor = RealtimeMarketDataProcessor([11])
+    run(processor, ticks(prices))
+    assert list(processor.states) == [11]
+
+    processor = RealtimeMarketDataProcessor()
+    run(processor, ticks(prices))
+    assert sorted(processor.states) == [11, 12, 13]
+    assert processor.state(99) is not None
+
+
+def test_single_instrument_attributes():
+    processor = RealtimeMarketDataProcessor(11)
+    assert processor.position == "FLAT"
+    assert processor.rsi is processor.states[11].rsi
+    with pytest.raises(AttributeError):
+        RealtimeMarketDataProcessor([11, 12]).rsi
+
+    bar = {"date": 0, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 0}
+    asyncio.run(processor.process_bar(bar))
+    assert processor.bars == 1
+    with pytest.raises(ValueError):
+        asyncio.run(RealtimeMarketDataProcessor([11, 12]).process_bar(bar))
+
+
+def test_indicator_logging_is_rate_limited(prices, caplog):
+    processor = RealtimeMarketDataProcessor([11, 12, 13], alert_callback=lambda message: None, log_interval=3600)
+    with caplog.at_level(logging.INFO, logger="kiteconnect.realtime_data"):
+        run(processor, ticks(prices))
+    logged = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Instrument:")]
+    assert sorted(m.split(",")[0] for m in logged) == ["Instrument: 11", "Instrument: 12", "Instrument: 13"]
@@ -0,0 +1,47 @@
+# coding: utf-8
+"""Tests for building higher timeframe candles from minute candles."""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from kiteconnect.resample import bucket_starts, resample, resample_dataframe
+
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+
+
+def ts(*args):
+    return int(datetime.datetime(*args, tzinfo=IST).timestamp())
+
+
+def test_buckets_are_anchored_to_the_session_open():
+    minutes = np.array([ts(2024, 1, 2, 9, 15), ts(2024, 1, 2, 10, 14), ts(2024, 1, 2, 10, 15), ts(2024, 1, 2, 15, 29)])
+    assert list(bucket_starts(minutes, "60minute")) == [
+        ts(2024, 1, 2, 9, 15), ts(2024, 1, 2, 9, 15), ts(2024, 1, 2, 10, 15), ts(2024, 1, 2, 15, 15)]
+    assert list(bucket_starts(minutes, "day")) == [ts(2024, 1, 2)] * 4
+
+
+def test_matches_pandas_resample():
+    index = pd.date_range("2024-01-02 09:15", "2024-01-02 15:29", freq="min", tz="Asia/Kolkata", name="date")
+    index = index.append(index + pd.Timedelta(days=1))
+    rng = np.random.default_rng(1)
+    close = 100 + rng.standard_normal(len(index)).cumsum()
+    df = pd.DataFrame({"open": close + 0.1, "high": close + 1, "low": close - 1, "close": close,
+                       "volume": rng.integers(1, 100, len(index))}, index=index)
+
+    for interval, rule in (("5minute", "5min"), ("60minute", "60min")):
+        expected = df.resample(rule, origin=pd.Timestamp("2024-01-01 09:15", tz="Asia/Kolkata")).agg(
+            {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}).dropna()
+        pd.testing.assert_frame_equal(resample_dataframe(df, interval), expected, check_freq=False,
+                                      check_index_type=False)
+
+    days = resample_dataframe(df, "day")
+    assert len(days) == 2 and days["volume"].sum() == df["volume"].sum()
+
+
+def test_open_interest_is_the_last_value():
+    columns = {"timestamp": np.array([ts(2024, 1, 2, 9, 15), ts(2024, 1, 2, 9, 16)]), "open": np.array([1.0, 2.0]),
+               "high": np.array([3.0, 4.0]), "low": np.array([0.5, 1.0]), "close": np.array([2.0, 3.0]),
+               "volume": np.array([5, 6]), "oi": np.array([10, 20])}
+    result = resample(columns, "3minute")
+    assert list(result["oi"]) == [20] and list(result["high"]) == [4.0] and list(result["volume"]) == [11]
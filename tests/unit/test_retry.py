@@ -0,0 +1,215 @@
+# coding: utf-8
+"""Tests for per-route retry policies."""
+import json
+import datetime
+import pytest
+import requests
+import responses
+
+from kiteconnect.utils.network import RetryPolicy, exchange_now, retry
+
+import utils
+
+FAST_POLICY = RetryPolicy(tries=3, delay=0, jitter=False, deadline=5)
+
+
+def _place_url(kite):
+    return "{0}{1}".format(kite.root, kite._routes["order.place"].format(variety=kite.VARIETY_REGULAR))
+
+
+def _order_params(kite, **kwargs):
+    params = {
+        "variety": kite.VARIETY_REGULAR,
+        "exchange": "NSE",
+        "tradingsymbol": "IOC",
+        "transaction_type": "BUY",
+        "quantity": 1,
+        "product": kite.PRODUCT_CNC,
+        "order_type": kite.ORDER_TYPE_LIMIT,
+        "price": 109.4,
+    }
+    params.update(kwargs)
+    return params
+
+
+def _orders_with_tag(tag, order_timestamp=None):
+    orders = utils.get_json_response("orders")
+    # Second order is a BUY of 1 IOC on NSE, placed by the request under test unless given.
+    if order_timestamp is None:
+        order_timestamp = exchange_now() + datetime.timedelta(seconds=5)
+    orders["data"][1]["tag"] = tag
+    orders["data"][1]["order_timestamp"] = order_timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    return json.dumps(orders)
+
+
+def test_retry_policy_delays():
+    policy = RetryPolicy(tries=4, delay=1, backoff=2, max_delay=3, jitter=False)
+    assert list(policy.delays()) == [1, 2, 3]
+
+    jittered = RetryPolicy(tries=4, delay=1, backoff=2, max_delay=3)
+    for delay, cap in zip(jittered.delays(), [1, 2, 3]):
+        assert 0 <= delay <= cap
+
+
+def test_retry_policy_deadline_bounds_retries():
+    """No retry is attempted once the next sleep would overrun the deadline."""
+    calls = []
+
+    def func(remaining):
+        calls.append(remaining)
+        raise requests.exceptions.ReadTimeout("timeout")
+
+    policy = RetryPolicy(tries=10, delay=1, jitter=False, deadline=0.5)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        policy.call(func, (requests.exceptions.Timeout,))
+
+    assert len(calls) == 1
+    assert 0 < calls[0] <= 0.5
+
+
+def test_retry_decorator_wraps_a_policy(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("kiteconnect.utils.network.time.sleep", sleeps.append)
+    calls = []
+
+    @retry(ValueError, tries=4, delay=1, backoff=3)
+    def flaky(n):
+        calls.append(n)
+        if len(calls) < 4:
+            raise ValueError("flaky")
+        return n
+
+    assert flaky(7) == 7
+    assert sleeps == [1, 3, 9]
+    assert flaky.__name__ == "flaky"
+
+    calls[:] = []
+    with pytest.raises(KeyError):
+        retry((ValueError,))(lambda: calls.append(1) or {}["missing"])()
+    assert calls == [1]
+
+
+@responses.activate
+def test_get_is_retried(kiteconnect):
+    kiteconnect.set_retry_policy("default", FAST_POLICY)
+    url = "{0}{1}".format(kiteconnect.root, kiteconnect._routes["portfolio.holdings"])
+    responses.add(responses.GET, url, body=requests.exceptions.ReadTimeout("timeout"))
+    responses.add(responses.GET, url, body=utils.get_response("portfolio.holdings"), content_type="application/json")
+
+    assert type(kiteconnect.holdings()) == list
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_place_order_not_retried_on_timeout(kiteconnect):
+    """A timed out order may already be placed, so it is never sent again by default."""
+    responses.add(responses.POST, _place_url(kiteconnect), body=requests.exceptions.ReadTimeout("timeout"))
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        kiteconnect.place_order(**_order_params(kiteconnect, tag="t1"))
+
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_place_order_retried_when_never_sent(kiteconnect):
+    responses.add(responses.POST, _place_url(kiteconnect), body=requests.exceptions.ConnectTimeout("connect"))
+    responses.add(
+        responses.POST, _place_url(kiteconnect),
+        body='{"status":"success","data":{"order_id":"111"}}', content_type="application/json"
+    )
+    kiteconnect.set_retry_policy("order.place", RetryPolicy(tries=2, delay=0, idempotent=False))
+
+    assert kiteconnect.place_order(**_order_params(kiteconnect)) == "111"
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_place_order_dedup_by_tag_finds_existing_order(kiteconnect):
+    kiteconnect.set_retry_policy("order.place", RetryPolicy(tries=3, delay=0, idempotent=False, dedup_by_tag=True))
+    responses.add(responses.POST, _place_url(kiteconnect), body=requests.exceptions.ReadTimeout("timeout"))
+    responses.add(
+        responses.GET, "{0}{1}".format(kiteconnect.root, kiteconnect._routes["orders"]),
+        body=_orders_with_tag("t1"), content_type="application/json"
+    )
+
+    assert kiteconnect.place_order(**_order_params(kiteconnect, tag="t1")) == "300000000000000"
+    assert [c.request.method for c in responses.calls] == ["POST", "GET"]
+
+
+@responses.activate
+def test_place_order_dedup_by_tag_retries_when_missing(kiteconnect):
+    kiteconnect.set_retry_policy("order.place", RetryPolicy(tries=3, delay=0, idempotent=False, dedup_by_tag=True))
+    responses.add(responses.POST, _place_url(kiteconnect), body=requests.exceptions.ReadTimeout("timeout"))
+    responses.add(
+        responses.POST, _place_url(kiteconnect),
+        body='{"status":"success","data":{"order_id":"111"}}', content_type="application/json"
+    )
+    responses.add(
+        responses.GET, "{0}{1}".format(kiteconnect.root, kiteconnect._routes["orders"]),
+        body=_orders_with_tag("other"), content_type="application/json"
+    )
+
+    assert kiteconnect.place_order(**_order_params(kiteconnect, tag="t1")) == "111"
+    assert [c.request.method for c in responses.calls] == ["POST", "GET", "POST"]
+
+
+@responses.activate
+def test_place_order_dedup_by_tag_ignores_earlier_orders(kiteconnect):
+    """An order with a reused tag placed before the first attempt is not one of its attempts."""
+    kiteconnect.set_retry_policy("order.place", RetryPolicy(tries=3, delay=0, idempotent=False, dedup_by_tag=True))
+    responses.add(responses.POST, _place_url(kiteconnect), body=requests.exceptions.ReadTimeout("timeout"))
+    responses.add(
+        responses.POST, _place_url(kiteconnect),
+        body='{"status":"success","data":{"order_id":"111"}}', content_type="application/json"
+    )
+    responses.add(
+        responses.GET, "{0}{1}".format(kiteconnect.root, kiteconnect._routes["orders"]),
+        body=_orders_with_tag("t1", exchange_now() - datetime.timedelta(minutes=5)), content_type="application/json"
+    )
+
+    assert kiteconnect.place_order(**_order_params(kiteconnect, tag="t1")) == "111"
+    assert [c.request.method for c in responses.calls] == ["POST", "GET", "POST"]
+
+
+@responses.activate
+def test_place_order_without_tag_is_not_retried_with_dedup(kiteconnect):
+    kiteconnect.set_retry_policy("order.place", RetryPolicy(tries=3, delay=0, idempotent=False, dedup_by_tag=True))
+    responses.add(responses.POST, _place_url(kiteconnect), body=requests.exceptions.ReadTimeout("timeout"))
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        kiteconnect.place_order(**_order_params(kiteconnect))
+
+    assert len(responses.calls) == 1
+
+
+def test_order_not_sent_once_rate_limit_wait_uses_the_deadline(kiteconnect, monkeypatch):
+    """An order is never sent with the rest of an exhausted budget as its timeout."""
+    import kiteconnect.exceptions as ex
+
+    sent = []
+
+    def request(route, method, **kwargs):
+        sent.append(kwargs["timeout"])
+        return {"order_id": "1"}
+
+    monkeypatch.setattr(kiteconnect, "_request", request)
+    monkeypatch.setattr(kiteconnect.order_rate_limiter, "acquire", lambda: 1.0)
+    kiteconnect.set_retry_policy("order.place", RetryPolicy(tries=3, delay=0, idempotent=False, deadline=0.5))
+
+    with pytest.raises(ex.NetworkException):
+        kiteconnect.place_order(**_order_params(kiteconnect))
+    assert sent == []
+
+    kiteconnect.set_retry_policy("order.place", RetryPolicy(tries=3, delay=0, idempotent=False, deadline=5))
+    kiteconnect.place_order(**_order_params(kiteconnect))
+    assert sent == [kiteconnect.timeout]
+
+
+def test_set_retry_policy_validation(kiteconnect):
+    with pytest.raises(TypeError):
+        kiteconnect.set_retry_policy("orders", {"tries": 3})
+
+    import kiteconnect.exceptions as ex
+    with pytest.raises(ex.InputException):
+        kiteconnect.set_retry_policy("no.such.route", FAST_POLICY)
@@ -0,0 +1,76 @@
+# coding: utf-8
+"""Tests for the streaming indicators against the DataFrame ones."""
+import asyncio
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kiteconnect import technical_indicators as ti
+from kiteconnect import streaming_indicators as si
+from kiteconnect.realtime_data import RealtimeMarketDataProcessor
+
+
+@pytest.fixture(scope="module")
+def candles():
+    rng = np.random.default_rng(7)
+    close = 100 + rng.standard_normal(300).cumsum()
+    # Flat candles make the stochastic oscillator's range zero.
+    close[50:70] = close[50]
+    return pd.DataFrame({"high": close + rng.random(300), "low": close - rng.random(300), "close": close})
+
+
+def assert_same(actual, expected):
+    if isinstance(expected, dict):
+        assert sorted(actual) == sorted(expected)
+        for key in expected:
+            assert_same(actual[key], expected[key])
+    elif math.isnan(expected):
+        assert math.isnan(actual)
+    else:
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+def test_streaming_indicators_match_dataframe_indicators(candles):
+    indicators = [
+        (si.SMA(20), lambda df: ti.calculate_sma(df["close"], 20), ("close",)),
+        (si.RSI(14), lambda df: ti.calculate_rsi(df["close"], 14), ("close",)),
+        (si.MACD(), ti.calculate_macd, ("close",)),
+        (si.BollingerBands(), ti.calculate_bollinger_bands, ("close",)),
+        (si.StochasticOscillator(), ti.calculate_stochastic_oscillator, ("high", "low", "close")),
+        (si.ATR(), ti.calculate_atr, ("high", "low", "close")),
+    ]
+    for i in range(len(candles)):
+        row = candles.iloc[i]
+        for indicator, calculate, columns in indicators:
+            value = indicator.update(*(row[c] for c in columns))
+            if i < 30 or i % 37 == 0 or 50 <= i < 75:
+                assert_same(value, calculate(candles.iloc[:i + 1]))
+
+
+def test_bollinger_bands_recover_from_nan_and_resum(candles, monkeypatch):
+    monkeypatch.setattr(si._RollingMoments, "RESUM_EVERY", 7)
+    close = candles["close"].copy()
+    close[100] = np.nan
+    df = pd.DataFrame({"close": close})
+
+    bands = si.BollingerBands()
+    for i, value in enumerate(close):
+        # NaN while the window holds the missing close, then the same as without it.
+        assert_same(bands.update(value), ti.calculate_bollinger_bands(df.iloc[:i + 1]))
+
+
+def test_processor_uses_streaming_indicators(candles):
+    alerts = []
+    processor = RealtimeMarketDataProcessor(1, alert_callback=alerts.append)
+
+    async def run():
+        for i, row in candles.iterrows():
+            await processor.process_bar({"date": i, "open": row["close"], "high": row["high"], "low": row["low"],
+                                         "close": row["close"], "volume": 0})
+
+    asyncio.run(run())
+    assert_same(processor.rsi.value, ti.calculate_rsi(candles["close"], 14))
+    assert_same(processor.sma_long.value, ti.calculate_sma(candles["close"], 20))
+    assert alerts and processor.position in ("LONG", "SHORT")
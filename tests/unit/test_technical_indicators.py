@@ -0,0 +1,55 @@
+# coding: utf-8
+"""Tests for the full series indicators."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from kiteconnect import technical_indicators as ti
+from kiteconnect.backtesting.core import run_backtest
+
+
+@pytest.fixture(scope="module")
+def candles():
+    rng = np.random.default_rng(11)
+    close = 100 + rng.standard_normal(120).cumsum()
+    return pd.DataFrame({"high": close + rng.random(120), "low": close - rng.random(120), "close": close})
+
+
+def test_series_match_latest_values_of_every_prefix(candles):
+    sma = ti.sma_series(candles["close"].tolist(), 20)
+    rsi = ti.rsi_series(candles["close"], 14)
+    macd = ti.macd_series(candles)
+    bands = ti.bollinger_bands_series(candles)
+    stochastic = ti.stochastic_oscillator_series(candles)
+    atr = ti.atr_series(candles)
+    assert len(sma) == len(rsi) == len(macd) == len(bands) == len(stochastic) == len(atr) == len(candles)
+
+    for i in (0, 13, 14, 19, 20, 60, 119):
+        prefix = candles.iloc[:i + 1]
+        np.testing.assert_equal(sma.iloc[i], ti.calculate_sma(prefix["close"], 20))
+        np.testing.assert_equal(rsi.iloc[i], ti.calculate_rsi(prefix["close"], 14))
+        np.testing.assert_equal(macd.iloc[i].to_dict(), ti.calculate_macd(prefix))
+        np.testing.assert_equal(bands.iloc[i].to_dict(), ti.calculate_bollinger_bands(prefix))
+        np.testing.assert_equal(stochastic.iloc[i].to_dict(), ti.calculate_stochastic_oscillator(prefix))
+        np.testing.assert_equal(atr.iloc[i], ti.calculate_atr(prefix))
+
+
+def test_run_backtest_prepares_strategy_once():
+    class Strategy(object):
+        prepared = 0
+
+        def prepare(self, historical_data):
+            self.prepared += 1
+            self.sma = ti.sma_series([d["close"] for d in historical_data], 2).to_numpy()
+
+        def __call__(self, historical_data):
+            i = len(historical_data) - 1
+            if self.sma[i] > historical_data[i]["close"]:
+                return [{"date": i, "action": "BUY", "price": historical_data[i]["close"], "quantity": 1}]
+            return []
+
+    strategy = Strategy()
+    data = [{"date": i, "close": close} for i, close in enumerate([1.0, 3.0, 2.0, 1.0, 5.0])]
+    trades = run_backtest(data, strategy)
+    assert strategy.prepared == 1
+    assert [t["date"] for t in trades] == [2, 3]
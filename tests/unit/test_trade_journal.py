@@ -0,0 +1,111 @@
+# coding: utf-8
+"""Tests for the trade journal and its SQLite store."""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from kiteconnect import trade_journal
+from kiteconnect.utils.sqlite import SQLiteStore, get_store
+
+
+@pytest.fixture()
+def journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(trade_journal, "DATABASE_FILE", str(tmp_path / "trades.db"))
+    trade_journal.init_db()
+    yield trade_journal
+    get_store(trade_journal.DATABASE_FILE).close()
+
+
+def trade(n, **kwargs):
+    return dict({"order_id": "o{}".format(n), "trade_id": "t{}".format(n), "tradingsymbol": "INFY",
+                 "exchange": "NSE", "transaction_type": "BUY", "quantity": 1, "price": 100.0 + n,
+                 "trade_time": "2024-01-02 09:{:02d}:00".format(15 + n), "pnl": n - 1}, **kwargs)
+
+
+def test_journal_batches_inserts(journal):
+    for n in range(3):
+        journal.insert_trade(trade(n))
+    journal.insert_trades([trade(3), trade(1, price=0.0)])
+
+    trades = journal.get_all_trades()
+    assert [t["trade_id"] for t in trades] == ["t0", "t1", "t2", "t3"]
+    # The duplicate trade was skipped rather than raising.
+    assert trades[1]["price"] == 101.0
+
+    stats = journal.analyze_trades(journal.get_trades_dataframe())
+    assert stats["total_trades"] == 4 and stats["winning_trades"] == 2
+
+
+def test_store_uses_wal_and_flushes_in_background(tmp_path):
+    store = SQLiteStore(str(tmp_path / "t.db"), schema=["CREATE TABLE t (a INTEGER)"], flush_interval=0.01)
+    assert store.query("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    store.write_many("INSERT INTO t (a) VALUES (?)", [(n,) for n in range(100)])
+    deadline = time.time() + 5
+    while store.pending and time.time() < deadline:
+        time.sleep(0.01)
+    assert store.pending == 0
+
+    # Committed, so visible to other connections.
+    other = sqlite3.connect(str(tmp_path / "t.db"))
+    assert other.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 100
+    other.close()
+
+    store.write("INSERT INTO t (a) VALUES (?)", (100,))
+    store.close()
+    other = sqlite3.connect(str(tmp_path / "t.db"))
+    assert other.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 101
+    other.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.write("INSERT INTO t (a) VALUES (?)", (1,))
+
+
+def test_journal_rejects_incomplete_trades(journal):
+    journal.insert_trade(trade(0))
+    with pytest.raises(sqlite3.IntegrityError):
+        journal.insert_trade(trade(1, price=None))
+    assert [t["trade_id"] for t in journal.get_all_trades()] == ["t0"]
+
+
+def test_rejected_rows_do_not_lose_the_batch(tmp_path):
+    store = SQLiteStore(str(tmp_path / "t.db"), schema=["CREATE TABLE t (a INTEGER NOT NULL)"], flush_interval=0.01)
+    store.write_many("INSERT INTO t (a) VALUES (?)", [(1,), (None,), (2,)])
+    deadline = time.time() + 5
+    while store.pending and time.time() < deadline:
+        time.sleep(0.01)
+
+    # The background flusher keeps the error for the next flush or read.
+    with pytest.raises(sqlite3.IntegrityError):
+        store.query("SELECT a FROM t")
+    assert [row[0] for row in store.query("SELECT a FROM t ORDER BY a")] == [1, 2]
+    assert store.failed == [("INSERT INTO t (a) VALUES (?)", (None,))]
+    store.close()
+
+
+def test_connections_of_ended_threads_are_closed(tmp_path):
+    store = SQLiteStore(str(tmp_path / "t.db"), schema=["CREATE TABLE t (a INTEGER)"], flush_interval=0.01)
+    for _ in range(5):
+        thread = threading.Thread(target=lambda: store.query("SELECT COUNT(*) FROM t").fetchone())
+        thread.start()
+        thread.join()
+        # Each new connection closes those of the threads which have ended.
+        assert len(store._connections) <= 2
+
+    # And so does the flusher.
+    store.write("INSERT INTO t (a) VALUES (?)", (1,))
+    deadline = time.time() + 5
+    while not all(thread.is_alive() for thread in list(store._connections)) and time.time() < deadline:
+        time.sleep(0.01)
+    assert all(thread.is_alive() for thread in store._connections)
+    store.close()
+
+
+def test_get_store_applies_new_schema(tmp_path):
+    path = str(tmp_path / "t.db")
+    store = get_store(path, ["CREATE TABLE IF NOT EXISTS a (x)"])
+    assert get_store(path, ["CREATE TABLE IF NOT EXISTS b (y)"]) is store
+    store.execute("INSERT INTO b (y) VALUES (1)")
+    store.close()
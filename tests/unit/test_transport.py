@@ -0,0 +1,107 @@
+# coding: utf-8
+"""Tests for the record/replay transport and the local mock server."""
+import pytest
+
+import utils
+import kiteconnect.exceptions as ex
+from kiteconnect import KiteConnect
+from kiteconnect.mock_server import MockKiteServer
+from kiteconnect.transport import Cassette, CassetteMiss, use_cassette
+
+
+@pytest.fixture()
+def server():
+    with MockKiteServer(utils.responses_dir, seed=1) as server:
+        yield server
+
+
+def _kite(root):
+    return KiteConnect(api_key="<API-KEY>", access_token="<ACCESS-TOKEN>", root=root)
+
+
+def test_mock_server_serves_routes(server):
+    kite = _kite(server.root)
+
+    assert kite.profile()["user_id"]
+    assert len(kite.holdings()) > 0
+    assert len(kite.instruments("NSE")) > 0
+    assert kite.quote(["NSE:INFY"])
+    assert kite.place_order(variety="regular", exchange="NSE", tradingsymbol="INFY", transaction_type="BUY",
+                            quantity=1, product="CNC", order_type="MARKET")
+    assert kite.cancel_order("regular", "1")
+
+    assert server.stats[("portfolio.holdings", 200)] == 1
+    assert server.stats[("order.place", 200)] == 1
+
+
+def test_mock_server_fault_injection():
+    with MockKiteServer(utils.responses_dir, error_rate=1) as server:
+        with pytest.raises(ex.GeneralException):
+            _kite(server.root).orders()
+
+    with MockKiteServer(utils.responses_dir, rate_limits={"default": 1}) as server:
+        kite = _kite(server.root)
+        kite.orders()
+        with pytest.raises(ex.NetworkException):
+            kite.orders()
+        assert server.stats[("orders", 429)] == 1
+
+
+def test_record_and_replay(server, tmp_path):
+    path = str(tmp_path / "cassette.json")
+
+    with Cassette(path) as cassette:
+        kite = _kite(server.root)
+        use_cassette(kite, cassette, record=True)
+        holdings = kite.holdings()
+        instruments = kite.instruments("NSE")
+        quote = kite.quote(["NSE:INFY", "BSE:SENSEX"])
+
+    cassette = Cassette(path)
+    assert len(cassette) == 3
+    assert all("Authorization" not in str(i) for i in cassette.interactions)
+
+    # Replays against any root without touching the network.
+    kite = _kite("http://replay.invalid")
+    use_cassette(kite, cassette)
+    assert kite.holdings() == holdings
+    assert kite.instruments("NSE") == instruments
+    assert kite.quote(["BSE:SENSEX", "NSE:INFY"]) == quote
+    # Responses are repeated once the recorded ones run out.
+    assert kite.holdings() == holdings
+
+    with pytest.raises(CassetteMiss):
+        kite.positions()
+
+
+def test_recording_keeps_the_pool_settings(tmp_path):
+    kite = KiteConnect(api_key="<API-KEY>", pool={"pool_connections": 4, "pool_maxsize": 32, "pool_block": True})
+    use_cassette(kite, Cassette(str(tmp_path / "cassette.json")), record=True)
+
+    adapter = kite.reqsession.get_adapter(kite.root)
+    assert (adapter._pool_connections, adapter._pool_maxsize, adapter._pool_block) == (4, 32, True)
+    assert kite._pool_size() == 32
+
+
+def test_record_redacts_credentials(server, tmp_path):
+    path = str(tmp_path / "cassette.json")
+
+    with Cassette(path) as cassette:
+        kite = _kite(server.root)
+        use_cassette(kite, cassette, record=True)
+        session = kite.generate_session("<REQUEST-TOKEN>", api_secret="<API-SECRET>")
+        kite.renew_access_token(session["refresh_token"], api_secret="<API-SECRET>")
+        kite.invalidate_access_token(session["access_token"])
+
+    with open(path) as f:
+        recorded = f.read()
+    for secret in ("<REQUEST-TOKEN>", "<API-SECRET>", "mock_access_token", "mock_refresh_token", "mock_public_token"):
+        assert secret not in recorded
+    # The checksum of the request token is redacted as well.
+    assert recorded.count("<REDACTED>") >= 7
+
+    # Requests with redacted query params still match on replay.
+    kite = _kite("http://replay.invalid")
+    use_cassette(kite, Cassette(path))
+    assert kite.generate_session("<OTHER-TOKEN>", api_secret="<API-SECRET>")["access_token"] == "<REDACTED>"
+    assert kite.invalidate_access_token("<OTHER-ACCESS-TOKEN>")
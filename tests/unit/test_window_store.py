@@ -0,0 +1,55 @@
+# coding: utf-8
+"""Tests for the ring buffer window store."""
+import numpy as np
+import pytest
+
+from kiteconnect.window_store import WindowStore
+
+
+def test_last_samples_are_contiguous_views():
+    windows = WindowStore(4, ("close", "volume"), capacity=2)
+    for i in range(10):
+        windows.append(1, {"close": float(i), "volume": 10.0 * i, "date": None})
+        last = windows.last(1)
+        assert last.base is windows.data and last.flags["C_CONTIGUOUS"]
+        expected = np.arange(max(0, i - 3), i + 1, dtype=float)
+        np.testing.assert_array_equal(last[:, 0], expected)
+        np.testing.assert_array_equal(windows.last(1, 2, "volume"), 10 * expected[-2:])
+    assert windows.count(1) == 4
+    assert windows.last(2).shape == (0, 2) and windows.count(2) == 0
+
+
+def test_appends_do_not_allocate():
+    windows = WindowStore(20, capacity=100)
+    data, nbytes = windows.data, windows.nbytes
+    for i in range(1000):
+        windows.append(i % 100, (1.0, 2.0, 0.5, 1.5, 100.0))
+    assert windows.data is data and windows.nbytes == nbytes == 100 * 2 * 20 * 5 * 8
+
+
+def test_capacity_grows():
+    windows = WindowStore(3, ("close",), capacity=1)
+    windows.append(7, [1.0])
+    windows.append(8, [2.0])
+    windows.append(9, [3.0])
+    assert windows.capacity == 4 and windows.tokens == [7, 8, 9] and 8 in windows
+    np.testing.assert_array_equal(windows.last(7, field="close"), [1.0])
+
+
+def test_matrix_and_append_many():
+    windows = WindowStore(3, ("close",))
+    for i in range(5):
+        windows.append_many([1, 2], [[i], [10 + i]])
+    windows.append(3, [7.0])
+    tokens, closes = windows.matrix("close")
+    assert tokens == [1, 2, 3]
+    np.testing.assert_array_equal(closes[:2], [[2, 3, 4], [12, 13, 14]])
+    np.testing.assert_array_equal(closes[2], [np.nan, np.nan, 7.0])
+    np.testing.assert_array_equal(windows.matrix("close", 1)[1][:, 0], [4, 14, 7])
+    for token in tokens:
+        np.testing.assert_array_equal(windows.last(token, field="close"), closes[tokens.index(token)][-windows.count(token):])
+
+
+def test_window_must_be_positive():
+    with pytest.raises(ValueError):
+        WindowStore(0)
@@ -5,25 +5,38 @@ from kiteconnect import KiteConnect
 from kiteconnect.backtesting.core import run_backtest
 from kiteconnect.backtesting.metrics import calculate_performance_metrics
 from kiteconnect.backtesting.visualizer import plot_equity_curve
+from kiteconnect.technical_indicators import sma_series
 
-def simple_moving_average_strategy_builder(short_window, long_window):
+class SimpleMovingAverageStrategy:
     """
-    A builder function for the simple moving average crossover strategy.
-    Returns a strategy callable that uses the given window periods.
+    Simple moving average crossover strategy.
+
+    `run_backtest` calls `prepare` with the whole history, so both SMAs are computed once per
+    run and each bar only looks them up.
     """
-    def strategy(historical_data):
-        trades = []
-        if len(historical_data) < long_window:
-            return trades
+    def __init__(self, short_window, long_window):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.sma_short = None
+        self.sma_long = None
 
+    def prepare(self, historical_data):
         closes = [d["close"] for d in historical_data]
-        sma_short = pd.Series(closes).rolling(window=short_window).mean().iloc[-1]
-        sma_long = pd.Series(closes).rolling(window=long_window).mean().iloc[-1]
+        self.sma_short = sma_series(closes, self.short_window).to_numpy()
+        self.sma_long = sma_series(closes, self.long_window).to_numpy()
 
-        prev_closes = [d["close"] for d in historical_data[:-1]]
-        if len(prev_closes) >= long_window:
-            prev_sma_short = pd.Series(prev_closes).rolling(window=short_window).mean().iloc[-1]
-            prev_sma_long = pd.Series(prev_closes).rolling(window=long_window).mean().iloc[-1]
+    def __call__(self, historical_data):
+        trades = []
+        if len(historical_data) < self.long_window:
+            return trades
+        if self.sma_short is None or len(historical_data) > len(self.sma_short):
+            self.prepare(historical_data)
+
+        i = len(historical_data) - 1
+        # Both SMAs are defined for the previous bar too.
+        if i >= self.long_window:
+            sma_short, sma_long = self.sma_short[i], self.sma_long[i]
+            prev_sma_short, prev_sma_long = self.sma_short[i - 1], self.sma_long[i - 1]
 
             if sma_short > sma_long and prev_sma_short <= prev_sma_long:
                 trades.append({
@@ -40,7 +53,13 @@ def simple_moving_average_strategy_builder(short_window, long_window):
                     "quantity": 1
                 })
         return trades
-    return strategy
+
+def simple_moving_average_strategy_builder(short_window, long_window):
+    """
+    A builder function for the simple moving average crossover strategy.
+    Returns a strategy callable that uses the given window periods.
+    """
+    return SimpleMovingAverageStrategy(short_window, long_window)
 
 def app():
     st.title("Backtesting")